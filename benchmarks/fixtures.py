@@ -0,0 +1,91 @@
+"""Synthetic, deterministic screen fixtures with known element positions"""
+import os
+from collections import namedtuple
+import cv2
+import numpy as np
+
+RESOLUTIONS = {
+    '1080p': (1920, 1080),
+    '1440p': (2560, 1440),
+    '4k': (3840, 2160),
+}
+
+# OpenCV font scales; roughly 11, 18, 26 and 44 px cap height
+FONT_SCALES = (0.5, 0.8, 1.2, 2.0)
+
+# Colors placed as patches; none of them occur in the background clutter
+PATCH_COLORS = ('#E53935', '#1E88E5', '#43A047', '#FDD835')
+
+TEMPLATE_SIZES = (24, 48, 96)
+
+# kind: 'text', 'template' or 'color'; key: the word, template file path or hex color;
+# x, y: center in screen coordinates; size: font scale, template edge or patch edge
+FixtureElement = namedtuple('FixtureElement', ['kind', 'key', 'x', 'y', 'size'])
+
+Fixture = namedtuple('Fixture', ['name', 'frame', 'elements'])
+
+
+def _clutter(rng, width, height):
+    """Desktop-like background: flat panels, window chrome and mild noise"""
+    frame = np.full((height, width, 3), 236, dtype=np.uint8)
+    for _ in range(int(width * height / 40000)):
+        x, y = int(rng.integers(0, width - 200)), int(rng.integers(0, height - 120))
+        w, h = int(rng.integers(40, 300)), int(rng.integers(20, 160))
+        shade = int(rng.integers(150, 250))
+        cv2.rectangle(frame, (x, y), (x + w, y + h), (shade, shade, shade), -1)
+    return cv2.add(frame, rng.integers(0, 6, frame.shape, dtype=np.uint8))
+
+
+def _template_image(rng, size):
+    icon = rng.integers(0, 255, (size, size, 3), dtype=np.uint8)
+    return cv2.GaussianBlur(icon, (5, 5), 0)
+
+
+def make_fixture(resolution, templates_dir, seed=0):
+    """Build one fixture frame and write its templates to `templates_dir`
+
+    Args:
+        resolution: Key of RESOLUTIONS
+        templates_dir: Directory the template PNGs are written to
+        seed: Random seed; the same seed always gives the same fixture
+
+    Returns:
+        Fixture with an RGB frame and the ground-truth elements
+    """
+    width, height = RESOLUTIONS[resolution]
+    rng = np.random.default_rng(seed)
+    frame = _clutter(rng, width, height)
+    elements = []
+
+    # Text: one word per font scale, on a white card so OCR sees clean glyphs
+    for i, scale in enumerate(FONT_SCALES):
+        word = f"Bench{i}Label"
+        thickness = max(1, int(round(scale * 2)))
+        (text_w, text_h), baseline = cv2.getTextSize(word, cv2.FONT_HERSHEY_SIMPLEX, scale, thickness)
+        x = int(width * 0.08)
+        y = int(height * (0.15 + 0.18 * i))
+        cv2.rectangle(frame, (x - 10, y - text_h - 10), (x + text_w + 10, y + baseline + 10), (255, 255, 255), -1)
+        cv2.putText(frame, word, (x, y), cv2.FONT_HERSHEY_SIMPLEX, scale, (20, 20, 20), thickness, cv2.LINE_AA)
+        elements.append(FixtureElement('text', word, x + text_w // 2, y - text_h // 2, scale))
+
+    # Templates: random icons at known positions, saved as files
+    os.makedirs(templates_dir, exist_ok=True)
+    for i, size in enumerate(TEMPLATE_SIZES):
+        icon = _template_image(rng, size)
+        x = int(width * (0.55 + 0.12 * i))
+        y = int(height * 0.3)
+        frame[y:y + size, x:x + size] = icon
+        path = os.path.join(templates_dir, f"{resolution}_icon_{size}.png")
+        cv2.imwrite(path, cv2.cvtColor(icon, cv2.COLOR_RGB2BGR))
+        elements.append(FixtureElement('template', path, x + size // 2, y + size // 2, size))
+
+    # Color patches: solid squares in the lower right area
+    patch = max(16, width // 80)
+    for i, color in enumerate(PATCH_COLORS):
+        rgb = tuple(int(color.lstrip('#')[j:j + 2], 16) for j in (0, 2, 4))
+        x = int(width * (0.55 + 0.1 * i))
+        y = int(height * 0.75)
+        cv2.rectangle(frame, (x, y), (x + patch - 1, y + patch - 1), rgb, -1)
+        elements.append(FixtureElement('color', color, x + patch // 2, y + patch // 2, patch))
+
+    return Fixture(resolution, frame, elements)
@@ -0,0 +1,253 @@
+"""Benchmark ScreenAnalyzer hot paths on synthetic fixtures, headless
+
+Usage:
+    python benchmarks/run_benchmarks.py --output results.json
+    python benchmarks/run_benchmarks.py --output new.json --compare results.json
+
+The testr package is imported from this checkout; it does not need to be installed.
+
+Frames are served through FileCapture, so no display is needed. Each finder
+is timed end to end (capture, conversion, OCR or matching, artifact writing)
+and the stages are also timed on their own. Results are written as JSON;
+with --compare, medians are compared against an earlier run and the exit
+code is 1 if any benchmark got slower than --threshold.
+"""
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+import contextlib
+import cv2
+import numpy as np
+
+# Run against this checkout without installing it
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from testr import Testr  # noqa: E402
+from testr.capture import FileCapture  # noqa: E402
+from testr.locality import LocalityCache  # noqa: E402
+from testr.snapshot import Snapshot  # noqa: E402
+from testr.color import find_color_blobs  # noqa: E402
+from fixtures import RESOLUTIONS, make_fixture  # noqa: E402
+
+try:
+    import easyocr  # noqa: F401
+    HAVE_OCR = True
+except ImportError:
+    HAVE_OCR = False
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def measure(func, runs, setup=None):
+    """Run func `runs` times (after one untimed warm-up call); returns (timings_ms, last_result)"""
+    if setup:
+        setup()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = func()
+    timings = []
+    for _ in range(runs):
+        if setup:
+            setup()
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            result = func()
+            timings.append((time.perf_counter() - start) * 1000)
+    return timings, result
+
+
+def summarize(name, resolution, case, timings, **extra):
+    return {
+        'name': name,
+        'resolution': resolution,
+        'case': case,
+        'runs': len(timings),
+        'min_ms': round(min(timings), 3),
+        'median_ms': round(statistics.median(timings), 3),
+        'mean_ms': round(statistics.mean(timings), 3),
+        'max_ms': round(max(timings), 3),
+        **extra,
+    }
+
+
+def near(position, element):
+    if not position:
+        return False
+    tolerance = max(8, element.size // 2 if element.kind != 'text' else 30)
+    return abs(position[0] - element.x) <= tolerance and abs(position[1] - element.y) <= tolerance
+
+
+def bench_resolution(automator, fixture, runs, ocr_runs, skip_ocr):
+    screen = automator.screen
+    screen.capture = FileCapture(fixture.frame)
+    results = []
+    label = fixture.name
+
+    def clear_ocr():
+        if screen.ocr_cache is not None:
+            screen.ocr_cache.clear()
+
+    def finished(position):
+        # Artifact writing is part of the finder's cost
+        screen.artifacts.flush()
+        return position
+
+    # End-to-end finders: full search, then with a warm locality cache (case suffix '_near')
+    for element, near_last in [(element, near_last) for near_last in (False, True) for element in fixture.elements]:
+        screen.locator = LocalityCache() if near_last else None
+        suffix = '_near' if near_last else ''
+        if element.kind == 'text':
+            if skip_ocr:
+                continue
+            timings, position = measure(
+                lambda: finished(screen.find_text_position(element.key, max_retries=1, retry_delay=0)),
+                ocr_runs, setup=clear_ocr)
+            case = f"font_{element.size}{suffix}"
+            name = 'find_text_position'
+        elif element.kind == 'template':
+            timings, position = measure(
+                lambda: finished(screen.find_template_position(element.key, max_retries=1, retry_delay=0)), runs)
+            case = f"icon_{element.size}{suffix}"
+            name = 'find_template_position'
+        else:
+            timings, position = measure(
+                lambda: finished(screen.find_color_position(element.key, max_retries=1, retry_delay=0)), runs)
+            case = f"{element.key}{suffix}"
+            name = 'find_color_position'
+        results.append(summarize(name, label, case, timings, found=bool(position),
+                                 correct=near(position, element)))
+    screen.locator = None
+
+    # Stages on their own
+    timings, _ = measure(lambda: screen.capture.grab(None), runs)
+    results.append(summarize('stage_capture', label, 'full_screen', timings))
+
+    timings, _ = measure(lambda: Snapshot(screen, fixture.frame).gray, runs)
+    results.append(summarize('stage_conversion', label, 'rgb_to_gray', timings))
+
+    template = next(element for element in fixture.elements if element.kind == 'template')
+    snapshot = Snapshot(screen, fixture.frame)
+    snapshot.gray
+    for mode in ('single', 'pyramid'):
+        timings, match = measure(lambda: snapshot.match_template(template.key, mode=mode), runs)
+        results.append(summarize('stage_template_match', label, mode, timings,
+                                 correct=near((match.x, match.y), template) if match else False))
+
+    colors = [element.key for element in fixture.elements if element.kind == 'color']
+    timings, blobs = measure(lambda: find_color_blobs(fixture.frame, colors), runs)
+    results.append(summarize('stage_color_blobs', label, f"{len(colors)}_colors", timings, found=len(blobs)))
+
+    box = (template.x - 24, template.y - 24, template.x + 24, template.y + 24)
+
+    def write_artifact():
+        screen.artifacts.submit(fixture.frame, box, 'bench', f"bench_match_{label}")
+        screen.artifacts.flush()
+
+    timings, _ = measure(write_artifact, runs)
+    results.append(summarize('stage_artifact_write', label, screen.artifacts.image_format, timings))
+
+    if not skip_ocr:
+        timings, ocr = measure(lambda: Snapshot(screen, fixture.frame).read_text(), ocr_runs, setup=clear_ocr)
+        results.append(summarize('stage_ocr', label, 'full_frame', timings, detections=len(ocr)))
+
+    return results
+
+
+def compare(results, baseline_path, threshold):
+    """Print median changes against a baseline; returns the regressions"""
+    with open(baseline_path) as f:
+        baseline = {(r['name'], r['resolution'], r['case']): r for r in json.load(f)['results']}
+    regressions = []
+    print(f"\nComparison with {baseline_path} (threshold {threshold:.0%}):")
+    for result in results:
+        old = baseline.get((result['name'], result['resolution'], result['case']))
+        if old is None or not old['median_ms']:
+            continue
+        change = result['median_ms'] / old['median_ms'] - 1
+        flag = ''
+        # Sub-0.1 ms medians are timer noise, not regressions
+        if change > threshold and result['median_ms'] - old['median_ms'] >= 0.1:
+            flag = '  REGRESSION'
+            regressions.append(result)
+        print(f"  {result['name']:<24} {result['resolution']:<6} {result['case']:<12} "
+              f"{old['median_ms']:>10.2f} -> {result['median_ms']:>10.2f} ms ({change:+.1%}){flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--resolutions', nargs='+', default=list(RESOLUTIONS), choices=list(RESOLUTIONS))
+    parser.add_argument('--runs', type=int, default=10, help="Timed runs per matching/color benchmark")
+    parser.add_argument('--ocr-runs', type=int, default=3, help="Timed runs per OCR benchmark")
+    parser.add_argument('--skip-ocr', action='store_true', help="Skip OCR benchmarks")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--compare', help="Earlier results JSON to compare against")
+    parser.add_argument('--threshold', type=float, default=0.10, help="Slowdown that counts as a regression")
+    args = parser.parse_args(argv)
+
+    skip_ocr = args.skip_ocr or not HAVE_OCR
+    if skip_ocr and not args.skip_ocr:
+        print("easyocr is not installed: skipping OCR benchmarks")
+
+    workdir = tempfile.mkdtemp(prefix='testr-bench-')
+    fixtures = [make_fixture(resolution, os.path.join(workdir, 'templates'), args.seed)
+                for resolution in args.resolutions]
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        automator = Testr(log_dir=os.path.join(workdir, 'logs'), capture_backend=FileCapture(fixtures[0].frame),
+                          tracing=False, timing='fast', input_backend='recording',
+                          assets_dir=os.path.join(workdir, 'assets'))
+    if not skip_ocr:
+        automator.screen.warm_up(background=False)
+
+    results = []
+    for fixture in fixtures:
+        print(f"Benchmarking {fixture.name} ({fixture.frame.shape[1]}x{fixture.frame.shape[0]})...")
+        results.extend(bench_resolution(automator, fixture, args.runs, args.ocr_runs, skip_ocr))
+
+    for result in results:
+        status = '' if result.get('correct', True) else '  (wrong position)'
+        print(f"  {result['name']:<24} {result['resolution']:<6} {result['case']:<12} "
+              f"median {result['median_ms']:>10.2f} ms  min {result['min_ms']:>10.2f} ms{status}")
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'opencv': cv2.__version__,
+            'numpy': np.__version__,
+            'ocr': not skip_ocr,
+            'seed': args.seed,
+            'runs': args.runs,
+            'ocr_runs': args.ocr_runs,
+        },
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        if compare(results, args.compare, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,40 @@
+"""Compare single-scale and pyramid template matching on a synthetic 4K frame"""
+import time
+import cv2
+import numpy as np
+from testr.matching import match_template
+
+WIDTH, HEIGHT = 3840, 2160
+RUNS = 5
+
+rng = np.random.default_rng(0)
+
+# Synthetic desktop: flat panels with some noise and a few "icons"
+frame = np.full((HEIGHT, WIDTH), 235, dtype=np.uint8)
+for _ in range(200):
+    x, y = int(rng.integers(0, WIDTH - 200)), int(rng.integers(0, HEIGHT - 120))
+    w, h = int(rng.integers(40, 200)), int(rng.integers(20, 120))
+    cv2.rectangle(frame, (x, y), (x + w, y + h), int(rng.integers(0, 255)), -1)
+frame = cv2.add(frame, rng.integers(0, 8, frame.shape, dtype=np.uint8))
+
+template = rng.integers(0, 255, (48, 48), dtype=np.uint8)
+template = cv2.GaussianBlur(template, (5, 5), 0)
+target = (2711, 1403)
+frame[target[1]:target[1] + 48, target[0]:target[0] + 48] = template
+
+
+def bench(mode):
+    timings = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        match = match_template(frame, template, mode=mode)
+        timings.append(time.perf_counter() - start)
+    return min(timings), match
+
+
+single_time, single_match = bench('single')
+pyramid_time, pyramid_match = bench('pyramid')
+
+print(f"single : {single_time * 1000:7.1f} ms  score={single_match.score:.3f} at ({single_match.x}, {single_match.y})")
+print(f"pyramid: {pyramid_time * 1000:7.1f} ms  score={pyramid_match.score:.3f} at ({pyramid_match.x}, {pyramid_match.y})")
+print(f"speedup: {single_time / pyramid_time:.1f}x")
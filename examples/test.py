@@ -10,10 +10,12 @@ automator = Testr()
 app_name = "chrome.exe"
 
 try:
+    # wait_ready=True waits for a new chrome process and window. If Chrome is already
+    # open, the launch is handed to the running instance; readiness then falls back to
+    # waiting for the screen to settle after a short grace period (see HANDOFF_GRACE).
     (
         automator.chain()
-            .app.launch_app(app_name, as_admin=False)
-            .wait(5)
+            .app.launch_app(app_name, as_admin=False, wait_ready=True)
             .screen.find_text_position_and_click("Search", max_retries=3, retry_delay=2)
             .input.type("facebook.com")
             .input.press("enter")
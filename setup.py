@@ -16,8 +16,12 @@ setup(
         'pillow', 
         'numpy',
         'psutil',  # Required for process management
+        'pyperclip',  # Clipboard paste typing
         'pywin32; platform_system=="Windows"'  # Windows-specific dependencies
     ],
+    extras_require={
+        'fast-capture': ['mss'],  # Shared-memory screen capture backend
+    },
     entry_points={
         'console_scripts': [
             'testr=testr.cli:main',
@@ -1,26 +1,86 @@
 # testr/__init__.py
 import time
+import atexit
 from .utils import CrossPlatformUtils
 from .exceptions import ElementNotFoundError
 from .app_controller import AppController
 from .input_simulator import InputSimulator
 from .screen_analyzer import ScreenAnalyzer
-from .logger import log_action, TestLogger
+from .logger import log_action, TestLogger, export_json_log
+from .timing import TimingPolicy
+from .metrics import MetricsRegistry
+from .plan import ActionPlan
+from .session import SessionRecorder
 
 class Testr:
-    def __init__(self, log_dir="logs"):
-        self.logger = TestLogger(log_dir)
+    def __init__(self, log_dir="logs", capture_backend=None, warm_ocr=False, tracing=True, save_artifacts=True,
+                 ocr_workers=None, timing=None, input_backend=None, metrics=True, metrics_file=None,
+                 record_session=None, assets_dir=None, locality=False, locality_file=None):
+        self.logger = TestLogger(log_dir, tracing=tracing)
+        # Latency histograms and counters; every action and stage span is timed into it
+        self.metrics = MetricsRegistry()
+        if metrics:
+            self.logger.tracer.metrics = self.metrics
+        # Built-in input delays: 'fast', 'default' (settle detection) or 'conservative'
+        self.timing = TimingPolicy(timing)
         print("\n=== Initializing Testr Framework ===")
         self.app = AppController(self)
         print(" AppController initialized")
-        self.input = InputSimulator(self)
+        self.input = InputSimulator(self, backend=input_backend)
         print(" InputSimulator initialized")
-        self.screen = ScreenAnalyzer(self)
+        self.screen = ScreenAnalyzer(self, capture_backend=capture_backend, save_artifacts=save_artifacts,
+                                     ocr_workers=ocr_workers, assets_dir=assets_dir,
+                                     locality=locality, locality_file=locality_file)
         print(" ScreenAnalyzer initialized")
+        self.timing.analyzer = self.screen
+        self.session = None
+        if record_session:
+            # Every captured frame and input event goes to this file; replay it with capture_backend=<path>
+            self.session = SessionRecorder(record_session).attach(self)
+            self.metrics.register_gauges('session', lambda: self.session.writer.stats)
+        self._register_gauges()
+        if metrics_file:
+            # .prom/.txt for Prometheus text format, JSON otherwise
+            atexit.register(self.export_metrics, metrics_file)
+        if warm_ocr:
+            # Load the OCR model in the background while the first steps run
+            self.screen.warm_up(background=True)
         print("=== Testr Framework Ready ===\n")
 
-    def chain(self):
+    def _register_gauges(self):
+        screen = self.screen
+        if screen.ocr_cache is not None:
+            self.metrics.register_gauges('ocr_tile_cache', lambda: screen.ocr_cache.stats)
+        self.metrics.register_gauges('template_cache', lambda: screen.templates.stats)
+        self.metrics.register_gauges('ocr_tuner', lambda: screen.ocr_tuner.stats)
+        self.metrics.register_gauges('locality', lambda: screen.locator.stats if screen.locator else {})
+        self.metrics.register_gauges('artifacts', lambda: {'written': screen.artifacts.written,
+                                                           'dropped': screen.artifacts.dropped})
+        self.metrics.register_gauges('timing', lambda: self.timing.stats)
+
+    def export_metrics(self, output_path):
+        """Write the run's metrics to a file
+
+        Args:
+            output_path: .prom or .txt for Prometheus text format, anything else for JSON
+
+        Returns:
+            The written text
+        """
+        print(f"Writing metrics to {output_path}")
+        return self.metrics.export(output_path)
+
+    def chain(self, deferred=False, **plan_options):
+        """Start an action chain
+
+        Args:
+            deferred: If True, return an ActionPlan that records the chained calls
+                      and executes them on run(), prefetching and sharing captures
+            **plan_options: Passed to ActionPlan (prefetch, share_captures)
+        """
         print("Starting new action chain")
+        if deferred:
+            return ActionPlan(self, **plan_options)
         return self
 
     def wait(self, seconds):
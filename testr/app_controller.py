@@ -2,16 +2,48 @@
 import subprocess
 import platform
 import os
-import winreg
 from pathlib import Path
+from .lazy_import import lazy_import
 from .exceptions import ApplicationLaunchError
 from .logger import log_action
+from .exe_index import ExecutableIndex
+from .readiness import wait_until_ready, find_processes, find_windows, process_name
+
+winreg = lazy_import('winreg')
 
 class AppController:
-    def __init__(self, parent):
+    def __init__(self, parent, index_file=None):
         self.parent = parent
+        # Executable index over the install directories, built on first lookup
+        # (defaults to executable_index.json in the screen analyzer's assets_dir)
+        self.index_file = index_file
+        self._executable_index = None
         print("AppController initialized")
 
+    @staticmethod
+    def search_paths():
+        """Common installation directories searched for executables"""
+        return [
+            os.environ.get('PROGRAMFILES', 'C:/Program Files'),
+            os.environ.get('PROGRAMFILES(X86)', 'C:/Program Files (x86)'),
+            os.environ.get('LOCALAPPDATA', ''),
+            os.environ.get('APPDATA', ''),
+            os.path.join(os.environ.get('LOCALAPPDATA', ''), 'Programs'),
+            os.path.join(os.environ.get('APPDATA', ''), 'Programs'),
+            'C:/Program Files/WindowsApps'
+        ]
+
+    @property
+    def executable_index(self):
+        """Persistent executable index, loaded from disk on first use"""
+        if self._executable_index is None:
+            if self.index_file is None:
+                self.index_file = os.path.join(self.parent.screen.assets_dir, 'executable_index.json')
+            os.makedirs(os.path.dirname(os.path.abspath(self.index_file)), exist_ok=True)
+            roots = [path for path in self.search_paths() if path and os.path.isdir(path)]
+            self._executable_index = ExecutableIndex(roots, path=self.index_file)
+        return self._executable_index
+
     @log_action
     def find_executable_path(self, app_name):
         """Find the executable path for an application on Windows
@@ -23,17 +55,6 @@ class AppController:
         if not app_name.lower().endswith('.exe'):
             app_name = f"{app_name}.exe"
 
-        # Common installation directories to search
-        search_paths = [
-            os.environ.get('PROGRAMFILES', 'C:/Program Files'),
-            os.environ.get('PROGRAMFILES(X86)', 'C:/Program Files (x86)'),
-            os.environ.get('LOCALAPPDATA', ''),
-            os.environ.get('APPDATA', ''),
-            os.path.join(os.environ.get('LOCALAPPDATA', ''), 'Programs'),
-            os.path.join(os.environ.get('APPDATA', ''), 'Programs'),
-            'C:/Program Files/WindowsApps'
-        ]
-
         # First, try to find in PATH
         if platform.system() == 'Windows':
             try:
@@ -45,14 +66,10 @@ class AppController:
             except subprocess.SubprocessError:
                 pass
 
-        # Search in common installation directories
-        for base_path in search_paths:
-            if not base_path:
-                continue
-                
-            for root, _, files in os.walk(base_path):
-                if app_name.lower() in (f.lower() for f in files):
-                    return os.path.join(root, app_name)
+        # Search the index of common installation directories (rescanned only on a miss)
+        path = self.executable_index.find(app_name)
+        if path:
+            return path
 
         # Try to find in Windows Registry
         try:
@@ -81,13 +98,18 @@ class AppController:
         return None
 
     @log_action
-    def launch_app(self, app_name_or_path, as_admin=False):
+    def launch_app(self, app_name_or_path, as_admin=False, wait_ready=None, ready_timeout=30, ready_region=None):
         """Launch application by name or path
         
         Args:
             app_name_or_path: Name of the application (e.g., 'chrome', 'windsurf') 
                             or full path to executable
             as_admin: If True, launches the application with administrator privileges (Windows only)
+            wait_ready: Readiness probes to wait for before returning: True for
+                        process + window + stable screen, a probe name ('process', 'window',
+                        'stable'), {'text': ...}, {'template': ...}, or a list of these
+            ready_timeout: Deadline in seconds for all readiness probes
+            ready_region: Tuple of (x, y, width, height) the screen probes watch, or None for full screen
         """
         try:
             # If it's a full path or contains directory separators, use it directly
@@ -100,6 +122,10 @@ class AppController:
                     raise ApplicationLaunchError(f"Could not find executable for: {app_name_or_path}")
 
             print(f"Launching application: {app_path}")
+            # Instances already running must not count as the launched app being ready
+            existing_pids = find_processes(process_name(app_path)) if wait_ready else []
+            existing_windows = find_windows(existing_pids) \
+                if existing_pids and platform.system() == 'Windows' else []
             
             if platform.system() == 'Windows':
                 print("Detected Windows OS")
@@ -118,6 +144,10 @@ class AppController:
                     subprocess.Popen(['sudo', 'open', app_path])
                 else:
                     subprocess.Popen(['open', app_path])
+
+            if wait_ready:
+                wait_until_ready(self.parent, app_path, wait_ready, timeout=ready_timeout, region=ready_region,
+                                 existing_pids=existing_pids, existing_windows=existing_windows)
                 
             print(f"Successfully launched: {app_path}")
             return self.parent
@@ -0,0 +1,180 @@
+import os
+import glob
+import queue
+import atexit
+import threading
+from collections import deque
+from .lazy_import import lazy_import
+
+cv2 = lazy_import('cv2')
+np = lazy_import('numpy')
+
+ARTIFACT_FORMATS = ('png', 'jpg', 'webp')
+
+
+class ArtifactWriter:
+    """Bounded background writer for highlighted debug screenshots
+
+    Drawing, encoding and disk writes happen on a worker thread so the
+    find-and-click path only pays for a queue put. When the queue is full the
+    artifact is dropped rather than blocking the test. Queued artifacts are
+    written and the worker is joined at interpreter exit (or on close()).
+
+    Args:
+        directory: Where artifacts are written
+        enabled: If False, submit() does nothing (use for performance runs)
+        image_format: 'png', 'jpg' or 'webp'
+        png_compression: PNG compression level (0-9, lower is faster)
+        quality: JPEG/WebP quality (0-100)
+        crop_margin: If set, save only the match box plus this many pixels around it
+        max_files: Keep at most this many artifacts, including earlier runs' (oldest evicted),
+                   None for no limit
+        max_bytes: Keep at most this many bytes of artifacts, None for no limit
+        queue_size: Maximum artifacts waiting to be written
+    """
+
+    def __init__(self, directory, enabled=True, image_format='png', png_compression=1, quality=90,
+                 crop_margin=None, max_files=None, max_bytes=None, queue_size=8):
+        if image_format not in ARTIFACT_FORMATS:
+            raise ValueError(f"Unknown artifact format: {image_format} (expected one of {ARTIFACT_FORMATS})")
+        self.directory = directory
+        self.enabled = enabled
+        self.image_format = image_format
+        self.png_compression = png_compression
+        self.quality = quality
+        self.crop_margin = crop_margin
+        self.max_files = max_files
+        self.max_bytes = max_bytes
+        self.dropped = 0
+        self.written = 0
+
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._files = deque()
+        self._total_bytes = 0
+        self._worker = None
+        self._closed = False
+        self._lock = threading.Lock()
+        self._load_existing()
+        atexit.register(self.close)
+
+    def _load_existing(self):
+        """Track artifacts left by earlier runs so retention covers them too"""
+        existing = []
+        for extension in ARTIFACT_FORMATS:
+            existing.extend(glob.glob(os.path.join(self.directory, f'*_match_*.{extension}')))
+        for path in sorted(existing, key=os.path.getmtime):
+            size = os.path.getsize(path)
+            self._files.append((path, size))
+            self._total_bytes += size
+
+    def _ensure_worker(self):
+        if self._worker is None:
+            with self._lock:
+                if self._worker is None:
+                    self._worker = threading.Thread(target=self._run, name='testr-artifacts', daemon=True)
+                    self._worker.start()
+
+    def submit(self, frame, box, label, name):
+        """Queue a highlighted screenshot for writing
+
+        Args:
+            frame: RGB frame (not modified)
+            box: (x_min, y_min, x_max, y_max) to highlight, in frame coordinates
+            label: Text drawn above the box
+            name: File name without extension
+
+        Returns:
+            Path the artifact will be written to, or None if disabled or dropped
+        """
+        if not self.enabled:
+            return None
+        path = os.path.join(self.directory, f'{name}.{self.image_format}')
+        if self._closed:
+            # The worker is gone; write in the caller's thread instead
+            self._write(frame, box, label, path)
+            return path
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait((frame, box, label, path))
+        except queue.Full:
+            self.dropped += 1
+            return None
+        return path
+
+    def flush(self):
+        """Block until every queued artifact has been written"""
+        if self._worker is not None:
+            self._queue.join()
+
+    def close(self):
+        """Write the queued artifacts and stop the worker thread"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            worker = self._worker
+        if worker is not None:
+            self._queue.put(None)
+            worker.join()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                return
+            frame, box, label, path = item
+            try:
+                self._write(frame, box, label, path)
+            except Exception as e:
+                print(f"Error writing artifact {path}: {str(e)}")
+            finally:
+                self._queue.task_done()
+
+    def _render(self, frame, box, label):
+        x_min, y_min, x_max, y_max = (int(v) for v in box)
+        frame = np.asarray(frame)
+        if self.crop_margin is not None:
+            height, width = frame.shape[:2]
+            left = max(0, x_min - self.crop_margin)
+            top = max(0, y_min - self.crop_margin - 20)
+            right = min(width, x_max + self.crop_margin)
+            bottom = min(height, y_max + self.crop_margin)
+            frame = frame[top:bottom, left:right]
+            x_min, x_max, y_min, y_max = x_min - left, x_max - left, y_min - top, y_max - top
+
+        # Convert RGB frame to OpenCV format (this also copies it)
+        cv_image = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
+        cv2.rectangle(cv_image, (x_min, y_min), (x_max, y_max), (0, 0, 255), 2)
+        cv2.putText(cv_image, label, (x_min, y_min - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 255), 1)
+        return cv_image
+
+    def _encode_params(self):
+        if self.image_format == 'png':
+            return [cv2.IMWRITE_PNG_COMPRESSION, int(self.png_compression)]
+        if self.image_format == 'jpg':
+            return [cv2.IMWRITE_JPEG_QUALITY, int(self.quality)]
+        return [cv2.IMWRITE_WEBP_QUALITY, int(self.quality)]
+
+    def _write(self, frame, box, label, path):
+        ok, encoded = cv2.imencode(f'.{self.image_format}', self._render(frame, box, label),
+                                   self._encode_params())
+        if not ok:
+            raise ValueError(f"Could not encode artifact as {self.image_format}")
+        with open(path, 'wb') as f:
+            f.write(encoded.tobytes())
+        self.written += 1
+        self._files.append((path, len(encoded)))
+        self._total_bytes += len(encoded)
+        self._enforce_retention()
+
+    def _enforce_retention(self):
+        while self._files and (
+                (self.max_files is not None and len(self._files) > self.max_files) or
+                (self.max_bytes is not None and self._total_bytes > self.max_bytes)):
+            path, size = self._files.popleft()
+            self._total_bytes -= size
+            try:
+                os.remove(path)
+            except OSError:
+                pass
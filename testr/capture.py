@@ -0,0 +1,209 @@
+import os
+import glob
+import threading
+from .lazy_import import lazy_import
+
+cv2 = lazy_import('cv2')
+np = lazy_import('numpy')
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.tif', '.tiff', '.webp')
+
+
+class CaptureBackend:
+    """Base class for screen capture backends
+
+    A backend returns frames as RGB ``uint8`` NumPy arrays of shape
+    (height, width, 3) so the analyzer never has to go through PIL.
+    """
+    name = 'base'
+
+    def grab(self, region=None):
+        """Capture the screen or a region of it
+
+        Args:
+            region: Tuple of (x, y, width, height) or None for full screen
+        """
+        raise NotImplementedError
+
+    def screen_size(self):
+        """(width, height) of the full-screen frame (grabs one unless a backend knows better)"""
+        height, width = self.grab(None).shape[:2]
+        return (width, height)
+
+    def close(self):
+        """Release any resources held by the backend"""
+
+
+class PyAutoGUICapture(CaptureBackend):
+    """Capture through pyautogui/PIL (slowest, works wherever pyautogui does)"""
+    name = 'pyautogui'
+
+    def grab(self, region=None):
+        import pyautogui
+        if region is None:
+            screenshot = pyautogui.screenshot()
+        else:
+            x, y, width, height = region
+            screenshot = pyautogui.screenshot(region=(int(x), int(y), int(width), int(height)))
+        return np.asarray(screenshot.convert('RGB'))
+
+    def screen_size(self):
+        import pyautogui
+        width, height = pyautogui.size()
+        return (int(width), int(height))
+
+
+class MSSCapture(CaptureBackend):
+    """Capture through mss (MIT-SHM on X11, BitBlt on Windows, CoreGraphics on macOS)
+
+    mss hands back a BGRA buffer that is converted to RGB in a single copy.
+    mss instances are not thread-safe, so one is kept per thread.
+    """
+    name = 'mss'
+
+    def __init__(self, monitor=1):
+        import mss  # noqa: F401 - fail early if mss is not installed
+        self.monitor = monitor
+        self._local = threading.local()
+
+    def _sct(self):
+        sct = getattr(self._local, 'sct', None)
+        if sct is None:
+            import mss
+            sct = mss.mss()
+            self._local.sct = sct
+        return sct
+
+    def grab(self, region=None):
+        sct = self._sct()
+        if region is None:
+            area = sct.monitors[self.monitor]
+        else:
+            x, y, width, height = region
+            area = {'left': int(x), 'top': int(y), 'width': int(width), 'height': int(height)}
+        shot = sct.grab(area)
+        bgra = np.frombuffer(shot.raw, dtype=np.uint8).reshape(shot.height, shot.width, 4)
+        return cv2.cvtColor(bgra, cv2.COLOR_BGRA2RGB)
+
+    def screen_size(self):
+        area = self._sct().monitors[self.monitor]
+        return (area['width'], area['height'])
+
+    def close(self):
+        sct = getattr(self._local, 'sct', None)
+        if sct is not None:
+            sct.close()
+            self._local.sct = None
+
+
+class FileCapture(CaptureBackend):
+    """Deterministic backend serving frames from image files
+
+    Args:
+        source: Image file, directory of images (sorted by name), or a list of
+                image paths / RGB arrays
+        loop: If True, start over after the last frame; otherwise keep
+              returning the last frame
+        advance: If False, every grab returns the current frame; call
+                 ``next_frame`` to move on explicitly
+    """
+    name = 'file'
+
+    def __init__(self, source, loop=False, advance=True):
+        self.frames = self._resolve_sources(source)
+        if not self.frames:
+            raise FileNotFoundError(f"No frames found in: {source}")
+        self.loop = loop
+        self.advance = advance
+        self.index = 0
+        self._decoded = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _resolve_sources(source):
+        if isinstance(source, np.ndarray):
+            return [source]
+        if isinstance(source, (list, tuple)):
+            return list(source)
+        source = os.fspath(source)
+        if os.path.isdir(source):
+            return sorted(
+                path for path in glob.glob(os.path.join(source, '*'))
+                if path.lower().endswith(IMAGE_EXTENSIONS)
+            )
+        if os.path.isfile(source):
+            return [source]
+        return []
+
+    def _load(self, index):
+        frame = self._decoded.get(index)
+        if frame is None:
+            source = self.frames[index]
+            if isinstance(source, np.ndarray):
+                frame = source
+            else:
+                bgr = cv2.imread(source, cv2.IMREAD_COLOR)
+                if bgr is None:
+                    raise FileNotFoundError(f"Could not read frame image: {source}")
+                frame = cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
+            self._decoded[index] = frame
+        return frame
+
+    def next_frame(self):
+        """Move to the next frame"""
+        with self._lock:
+            self._step()
+
+    def _step(self):
+        if self.index + 1 < len(self.frames):
+            self.index += 1
+        elif self.loop:
+            self.index = 0
+
+    def grab(self, region=None):
+        with self._lock:
+            frame = self._load(self.index)
+            if self.advance:
+                self._step()
+        if region is not None:
+            x, y, width, height = (int(v) for v in region)
+            frame = frame[y:y + height, x:x + width]
+        return frame
+
+    def screen_size(self):
+        with self._lock:
+            height, width = self._load(self.index).shape[:2]
+        return (width, height)
+
+
+CAPTURE_BACKENDS = {
+    'mss': MSSCapture,
+    'pyautogui': PyAutoGUICapture,
+}
+
+
+def create_capture_backend(backend=None):
+    """Build a capture backend
+
+    Args:
+        backend: A CaptureBackend instance, a backend name ('mss', 'pyautogui',
+                 'auto'), a recorded session file for ReplayCapture, a path to
+                 an image file/directory for FileCapture, or None to use $TESTR_CAPTURE_BACKEND and fall back to 'auto'
+    """
+    if isinstance(backend, CaptureBackend):
+        return backend
+    if backend is None:
+        backend = os.environ.get('TESTR_CAPTURE_BACKEND', 'auto')
+    if backend == 'auto':
+        try:
+            return MSSCapture()
+        except ImportError:
+            return PyAutoGUICapture()
+    if backend in CAPTURE_BACKENDS:
+        return CAPTURE_BACKENDS[backend]()
+    if os.path.exists(backend):
+        from .session import is_session_file, ReplayCapture
+        if is_session_file(backend):
+            return ReplayCapture(backend)
+        return FileCapture(backend)
+    raise ValueError(f"Unknown capture backend: {backend}")
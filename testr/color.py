@@ -0,0 +1,69 @@
+from collections import namedtuple
+from .lazy_import import lazy_import
+
+cv2 = lazy_import('cv2')
+np = lazy_import('numpy')
+
+# x, y: blob centroid; bbox: (x, y, width, height); area in full-resolution pixels
+ColorBlob = namedtuple('ColorBlob', ['color', 'x', 'y', 'area', 'bbox'])
+
+
+def hex_to_rgb(hex_color):
+    """Convert hex color ('#RRGGBB' or 'RRGGBB') to an (r, g, b) tuple"""
+    hex_color = hex_color.lstrip('#')
+    return tuple(int(hex_color[i:i + 2], 16) for i in (0, 2, 4))
+
+
+def color_mask(rgb, rgb_color, tolerance):
+    """Single-pass mask of pixels within `tolerance` of `rgb_color` on every channel
+
+    Bounds are clamped to 0-255, so there is no uint8 wrap-around.
+    """
+    lower = np.array([max(0, c - tolerance) for c in rgb_color], dtype=np.uint8)
+    upper = np.array([min(255, c + tolerance) for c in rgb_color], dtype=np.uint8)
+    return cv2.inRange(rgb, lower, upper)
+
+
+def find_color_blobs(rgb, colors, tolerance=5, downsample=1, min_area=1):
+    """Find connected blobs of one or more target colors
+
+    Args:
+        rgb: RGB frame as a NumPy array
+        colors: Hex color string, (r, g, b) tuple, or a list of either
+        tolerance: Per-channel matching tolerance (0-255)
+        downsample: Scan every Nth pixel in each direction (faster on large screens;
+                    blobs smaller than N pixels may be missed)
+        min_area: Minimum blob area in full-resolution pixels
+
+    Returns:
+        List of ColorBlob in frame coordinates, largest first
+    """
+    if isinstance(colors, str) or (isinstance(colors, tuple) and len(colors) == 3
+                                   and all(isinstance(c, int) for c in colors)):
+        colors = [colors]
+
+    step = max(1, int(downsample))
+    frame = rgb[::step, ::step] if step > 1 else rgb
+    frame = np.ascontiguousarray(frame)
+
+    blobs = []
+    for color in colors:
+        rgb_color = hex_to_rgb(color) if isinstance(color, str) else tuple(color)
+        mask = color_mask(frame, rgb_color, tolerance)
+        if not cv2.countNonZero(mask):
+            continue
+
+        count, _, stats, centroids = cv2.connectedComponentsWithStats(mask, connectivity=8)
+        for label in range(1, count):
+            area = int(stats[label, cv2.CC_STAT_AREA]) * step * step
+            if area < min_area:
+                continue
+            bbox = (int(stats[label, cv2.CC_STAT_LEFT]) * step,
+                    int(stats[label, cv2.CC_STAT_TOP]) * step,
+                    int(stats[label, cv2.CC_STAT_WIDTH]) * step,
+                    int(stats[label, cv2.CC_STAT_HEIGHT]) * step)
+            cx, cy = centroids[label]
+            blobs.append(ColorBlob(color, float(cx * step), float(cy * step), area, bbox))
+
+    blobs.sort(key=lambda blob: blob.area, reverse=True)
+    return blobs
@@ -5,5 +5,8 @@ class TestrError(Exception):
 class ElementNotFoundError(TestrError):
     """Raised when text/image not found on screen"""
     
+class WaitTimeoutError(ElementNotFoundError):
+    """Raised when wait_until reaches its deadline"""
+    
 class ApplicationLaunchError(TestrError):
     """Raised when app fails to launch"""
\ No newline at end of file
@@ -0,0 +1,161 @@
+import os
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+def _normalize_roots(roots):
+    """Absolute, de-duplicated roots, dropping any root nested inside another"""
+    normalized = []
+    for root in roots:
+        if not root:
+            continue
+        root = os.path.abspath(root)
+        if root not in normalized:
+            normalized.append(root)
+    keys = {root: os.path.normcase(root).rstrip('\\/') + os.sep for root in normalized}
+    return [root for root in normalized
+            if not any(other != root and keys[root].startswith(keys[other]) for other in normalized)]
+
+
+class ExecutableIndex:
+    """Persistent index of executables (file name -> paths) under a set of root directories
+
+    Roots are scanned in parallel with os.scandir. Each directory's mtime is
+    stored with its listing, so a refresh only lists directories whose
+    contents changed and reuses the rest. Lookups are a dict access.
+
+    Args:
+        roots: Directories to index
+        path: JSON file to persist the index to, or None to keep it in memory
+        extensions: File extensions counted as executables
+        max_workers: Threads used to scan roots in parallel
+    """
+
+    def __init__(self, roots, path=None, extensions=('.exe',), max_workers=None):
+        self.roots = _normalize_roots(roots)
+        self.path = path
+        self.extensions = tuple(ext.lower() for ext in extensions)
+        self.max_workers = max_workers or max(1, min(8, len(self.roots)))
+        # root -> {directory: [mtime_ns, [executable names], [subdirectories]]}
+        self._dirs = {root: {} for root in self.roots}
+        self._names = {}
+        self._lock = threading.Lock()
+        self.listed = 0
+        self.reused = 0
+        self._load()
+
+    def _load(self):
+        if not (self.path and os.path.exists(self.path)):
+            return
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            if data.get('extensions') != list(self.extensions):
+                return
+            for root, dirs in data.get('roots', {}).items():
+                if root in self._dirs:
+                    self._dirs[root] = dirs
+        except (ValueError, TypeError, AttributeError, OSError) as e:
+            print(f"Ignoring unreadable executable index {self.path}: {str(e)}")
+            return
+        self._rebuild_names()
+
+    def save(self):
+        """Write the index to disk"""
+        if not self.path:
+            return
+        with self._lock:
+            data = {'extensions': list(self.extensions), 'roots': self._dirs}
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(data, f)
+        os.replace(tmp_path, self.path)
+
+    def _scan_root(self, root, previous):
+        """Walk one root top-down, listing only directories whose mtime changed"""
+        dirs = {}
+        stack = [root]
+        while stack:
+            directory = stack.pop()
+            try:
+                mtime = os.stat(directory).st_mtime_ns
+            except OSError:
+                continue
+            cached = previous.get(directory)
+            if cached is not None and cached[0] == mtime:
+                self.reused += 1
+                entry = cached
+            else:
+                self.listed += 1
+                files, subdirs = [], []
+                try:
+                    with os.scandir(directory) as it:
+                        for item in it:
+                            try:
+                                if item.is_dir(follow_symlinks=False):
+                                    subdirs.append(item.path)
+                                elif item.name.lower().endswith(self.extensions) and item.is_file():
+                                    files.append(item.name)
+                            except OSError:
+                                continue
+                except OSError:
+                    # Unreadable directory (permissions, removed mid-scan)
+                    pass
+                entry = [mtime, files, subdirs]
+            dirs[directory] = entry
+            # Reversed so subdirectories are visited in listing order
+            stack.extend(reversed(entry[2]))
+        return root, dirs
+
+    def _rebuild_names(self):
+        names = {}
+        for root in self.roots:
+            for directory, (_, files, _) in self._dirs[root].items():
+                for name in files:
+                    names.setdefault(name.lower(), []).append(os.path.join(directory, name))
+        self._names = names
+
+    def refresh(self):
+        """Rescan all roots, re-listing only directories that changed since the last scan"""
+        roots = [root for root in self.roots if os.path.isdir(root)]
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='testr-index') as executor:
+            scanned = list(executor.map(lambda root: self._scan_root(root, self._dirs.get(root, {})), roots))
+        with self._lock:
+            for root in self.roots:
+                self._dirs[root] = {}
+            for root, dirs in scanned:
+                self._dirs[root] = dirs
+            self._rebuild_names()
+        self.save()
+
+    def lookup(self, name):
+        """Indexed paths for an executable name (case-insensitive), without touching disk"""
+        return list(self._names.get(name.lower(), ()))
+
+    def find(self, name):
+        """First existing path for an executable name
+
+        Served from the index; the roots are rescanned only when the name is
+        missing or every indexed path for it has disappeared.
+
+        Returns:
+            Full path, or None
+        """
+        for rescan in (False, True):
+            if rescan:
+                self.refresh()
+            for path in self.lookup(name):
+                if os.path.isfile(path):
+                    return path
+        return None
+
+    @property
+    def stats(self):
+        """Indexed names and directories, and directories listed vs reused by refreshes"""
+        return {
+            'names': len(self._names),
+            'directories': sum(len(dirs) for dirs in self._dirs.values()),
+            'listed': self.listed,
+            'reused': self.reused,
+        }
@@ -0,0 +1,458 @@
+import os
+import json
+import time
+import ctypes
+import platform
+from collections import namedtuple
+from .lazy_import import lazy_import
+
+pyautogui = lazy_import('pyautogui')
+pyperclip = lazy_import('pyperclip')
+
+INPUT_EVENT_KINDS = ('move', 'mouse_down', 'mouse_up', 'key_down', 'key_up', 'text', 'paste', 'wait')
+
+# kind: one of INPUT_EVENT_KINDS; x, y: move target; button: 'left', 'right' or 'middle';
+# key: pyautogui-style key name; text: typed or pasted text; seconds: wait duration
+InputEvent = namedtuple('InputEvent', ['kind', 'x', 'y', 'button', 'key', 'text', 'seconds'])
+InputEvent.__new__.__defaults__ = (None,) * 6
+
+# Give the target application time to read the clipboard before it is restored
+PASTE_RESTORE_DELAY = 0.1
+
+
+def paste_modifier():
+    """Modifier key used with 'v' to paste on this platform"""
+    return 'command' if platform.system() == 'Darwin' else 'ctrl'
+
+
+class InputBatch:
+    """Queue of input events submitted to a backend in one go
+
+    Every method returns the batch so calls can be chained. Used as a context
+    manager, the batch is submitted when the block exits without an error.
+
+    Args:
+        backend: InputBackend the events are sent to
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.events = []
+
+    def _add(self, kind, **fields):
+        self.events.append(InputEvent(kind, **fields))
+        return self
+
+    def move(self, x, y):
+        return self._add('move', x=int(round(float(x))), y=int(round(float(y))))
+
+    def mouse_down(self, button='left'):
+        return self._add('mouse_down', button=button)
+
+    def mouse_up(self, button='left'):
+        return self._add('mouse_up', button=button)
+
+    def click(self, x=None, y=None, button='left', clicks=1, hold=0.0):
+        """Click at (x, y), or at the current cursor position"""
+        if x is not None and y is not None:
+            self.move(x, y)
+        for _ in range(clicks):
+            self.mouse_down(button)
+            self.wait(hold)
+            self.mouse_up(button)
+        return self
+
+    def key_down(self, key):
+        return self._add('key_down', key=key)
+
+    def key_up(self, key):
+        return self._add('key_up', key=key)
+
+    def press(self, key, presses=1):
+        for _ in range(presses):
+            self.key_down(key)
+            self.key_up(key)
+        return self
+
+    def hotkey(self, *keys):
+        """Press keys together: down in order, up in reverse order"""
+        for key in keys:
+            self.key_down(key)
+        for key in reversed(keys):
+            self.key_up(key)
+        return self
+
+    def write(self, text):
+        """Type text as key events (no per-key pause)"""
+        return self._add('text', text=text)
+
+    def paste(self, text):
+        """Enter text through the clipboard; the previous clipboard content is restored"""
+        return self._add('paste', text=text)
+
+    def wait(self, seconds):
+        if seconds and seconds > 0:
+            self._add('wait', seconds=seconds)
+        return self
+
+    def submit(self):
+        """Send all queued events and clear the queue"""
+        events, self.events = self.events, []
+        self.backend.send(events)
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.submit()
+        return False
+
+
+class InputBackend:
+    """Base class for input backends
+
+    Backends receive batches of InputEvent. Consecutive events between waits
+    and pastes are handed to send_events() together, so a backend can inject
+    them in a single OS call.
+    """
+    name = 'base'
+
+    def batch(self):
+        """New InputBatch for this backend"""
+        return InputBatch(self)
+
+    def send(self, events):
+        """Send a sequence of events, honouring waits and pastes in order"""
+        group = []
+        for event in events:
+            if event.kind == 'wait':
+                self._flush(group)
+                self.sleep(event.seconds)
+            elif event.kind == 'paste':
+                self._flush(group)
+                self.paste(event.text)
+            else:
+                group.append(event)
+        self._flush(group)
+
+    def _flush(self, group):
+        if group:
+            self.send_events(list(group))
+            group.clear()
+
+    def send_events(self, events):
+        """Inject move/button/key/text events"""
+        raise NotImplementedError
+
+    def position(self):
+        """Current cursor position (x, y)"""
+        raise NotImplementedError
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+    def paste(self, text):
+        """Put text on the clipboard, send the paste shortcut, then restore the clipboard"""
+        try:
+            previous = pyperclip.paste()
+        except Exception:
+            previous = None
+        pyperclip.copy(text)
+        try:
+            self.send_events(list(InputBatch(self).hotkey(paste_modifier(), 'v').events))
+            time.sleep(PASTE_RESTORE_DELAY)
+        finally:
+            if previous is not None:
+                pyperclip.copy(previous)
+
+    def close(self):
+        """Release any resources held by the backend"""
+
+
+class PyAutoGUIInputBackend(InputBackend):
+    """Input through pyautogui (works wherever pyautogui does), without its per-call pause"""
+    name = 'pyautogui'
+
+    def send_events(self, events):
+        pause = pyautogui.PAUSE
+        pyautogui.PAUSE = 0
+        try:
+            for event in events:
+                if event.kind == 'move':
+                    pyautogui.moveTo(event.x, event.y)
+                elif event.kind == 'mouse_down':
+                    pyautogui.mouseDown(button=event.button)
+                elif event.kind == 'mouse_up':
+                    pyautogui.mouseUp(button=event.button)
+                elif event.kind == 'key_down':
+                    pyautogui.keyDown(event.key)
+                elif event.kind == 'key_up':
+                    pyautogui.keyUp(event.key)
+                elif event.kind == 'text':
+                    pyautogui.write(event.text, interval=0)
+        finally:
+            pyautogui.PAUSE = pause
+
+    def position(self):
+        x, y = pyautogui.position()
+        return (int(x), int(y))
+
+
+# Win32 SendInput structures
+_ULONG_PTR = ctypes.c_size_t
+# Fixed widths so the layout matches Windows regardless of the host's C long size
+_LONG, _DWORD, _WORD = ctypes.c_int32, ctypes.c_uint32, ctypes.c_uint16
+
+
+class _MOUSEINPUT(ctypes.Structure):
+    _fields_ = [('dx', _LONG), ('dy', _LONG), ('mouseData', _DWORD),
+                ('dwFlags', _DWORD), ('time', _DWORD), ('dwExtraInfo', _ULONG_PTR)]
+
+
+class _KEYBDINPUT(ctypes.Structure):
+    _fields_ = [('wVk', _WORD), ('wScan', _WORD), ('dwFlags', _DWORD),
+                ('time', _DWORD), ('dwExtraInfo', _ULONG_PTR)]
+
+
+class _HARDWAREINPUT(ctypes.Structure):
+    _fields_ = [('uMsg', _DWORD), ('wParamL', _WORD), ('wParamH', _WORD)]
+
+
+class _INPUTUNION(ctypes.Union):
+    _fields_ = [('mi', _MOUSEINPUT), ('ki', _KEYBDINPUT), ('hi', _HARDWAREINPUT)]
+
+
+class _INPUT(ctypes.Structure):
+    _fields_ = [('type', _DWORD), ('union', _INPUTUNION)]
+
+
+_INPUT_MOUSE, _INPUT_KEYBOARD = 0, 1
+_MOUSEEVENTF_MOVE, _MOUSEEVENTF_ABSOLUTE, _MOUSEEVENTF_VIRTUALDESK = 0x0001, 0x8000, 0x4000
+_MOUSE_BUTTON_FLAGS = {
+    'left': (0x0002, 0x0004),
+    'right': (0x0008, 0x0010),
+    'middle': (0x0020, 0x0040),
+}
+_KEYEVENTF_EXTENDEDKEY, _KEYEVENTF_KEYUP, _KEYEVENTF_UNICODE = 0x0001, 0x0002, 0x0004
+
+# pyautogui key names -> virtual-key codes (the names pyautogui maps on Windows);
+# other keys fall back to pyautogui
+VK_CODES = {
+    'backspace': 0x08, 'super': 0x5B, 'tab': 0x09, 'clear': 0x0C, 'enter': 0x0D, 'return': 0x0D,
+    'shift': 0x10, 'ctrl': 0x11, 'control': 0x11, 'alt': 0x12, 'pause': 0x13, 'capslock': 0x14,
+    'kana': 0x15, 'hanguel': 0x15, 'hangul': 0x15, 'junja': 0x17, 'final': 0x18, 'hanja': 0x19, 'kanji': 0x19,
+    'esc': 0x1B, 'escape': 0x1B, 'convert': 0x1C, 'nonconvert': 0x1D, 'accept': 0x1E, 'modechange': 0x1F,
+    'space': 0x20, ' ': 0x20, 'pgup': 0x21, 'pgdn': 0x22, 'pageup': 0x21, 'pagedown': 0x22, 'end': 0x23,
+    'home': 0x24, 'left': 0x25, 'up': 0x26, 'right': 0x27, 'down': 0x28, 'select': 0x29, 'print': 0x2A,
+    'execute': 0x2B, 'prtsc': 0x2C, 'prtscr': 0x2C, 'prntscrn': 0x2C, 'printscreen': 0x2C, 'insert': 0x2D,
+    'delete': 0x2E, 'del': 0x2E, 'help': 0x2F, 'win': 0x5B, 'winleft': 0x5B, 'windows': 0x5B,
+    'winright': 0x5C, 'apps': 0x5D, 'sleep': 0x5F,
+    **{f'num{i}': 0x60 + i for i in range(10)},
+    'multiply': 0x6A, 'add': 0x6B, 'separator': 0x6C, 'subtract': 0x6D, 'decimal': 0x6E, 'divide': 0x6F,
+    **{f'f{i}': 0x6F + i for i in range(1, 25)},
+    'numlock': 0x90, 'scrolllock': 0x91, 'shiftleft': 0xA0, 'shiftright': 0xA1,
+    'ctrlleft': 0xA2, 'ctrlright': 0xA3, 'altleft': 0xA4, 'altright': 0xA5,
+    'browserback': 0xA6, 'browserforward': 0xA7, 'browserrefresh': 0xA8, 'browserstop': 0xA9,
+    'browsersearch': 0xAA, 'browserfavorites': 0xAB, 'browserhome': 0xAC, 'volumemute': 0xAD,
+    'volumedown': 0xAE, 'volumeup': 0xAF, 'nexttrack': 0xB0, 'prevtrack': 0xB1, 'stop': 0xB2,
+    'playpause': 0xB3, 'launchmail': 0xB4, 'launchmediaselect': 0xB5, 'launchapp1': 0xB6, 'launchapp2': 0xB7,
+}
+_EXTENDED_KEYS = {0x21, 0x22, 0x23, 0x24, 0x25, 0x26, 0x27, 0x28, 0x2C, 0x2D, 0x2E, 0x5B, 0x5C, 0x5D,
+                  0x90, 0xA3, 0xA5}
+# VkKeyScan shift-state bits -> modifier virtual-key codes (shift, ctrl, alt)
+_VK_SHIFT_STATE = ((0x01, 0x10), (0x02, 0x11), (0x04, 0x12))
+# Control characters that applications expect as real keys, not Unicode input
+_TEXT_KEYS = {'\n': 0x0D, '\r': 0x0D, '\t': 0x09, '\b': 0x08}
+
+
+class Win32InputBackend(InputBackend):
+    """Input through SendInput: each group of events is injected in a single call
+
+    Text is sent as Unicode key events, so it does not depend on the keyboard
+    layout and needs no per-key pause. Keys without a virtual-key code here
+    (e.g. 'command', 'option') are sent through pyautogui, as before.
+    """
+    name = 'win32'
+
+    def __init__(self):
+        self._user32 = ctypes.WinDLL('user32', use_last_error=True)
+        self._user32.VkKeyScanW.restype = ctypes.c_short
+        self._fallback = None
+
+    def _vk(self, key):
+        """Virtual-key code of a key and the modifier keys the layout needs for it (e.g. shift for 'A')"""
+        name = key.lower()
+        if name in VK_CODES:
+            return VK_CODES[name], ()
+        if len(key) == 1:
+            code = self._user32.VkKeyScanW(ord(key))
+            if code != -1:
+                state = (code >> 8) & 0xFF
+                return code & 0xFF, tuple(vk for bit, vk in _VK_SHIFT_STATE if state & bit)
+        raise ValueError(f"Unknown key: {key}")
+
+    def _key_inputs(self, key, up=False):
+        vk, modifiers = self._vk(key)
+        if up:
+            return [self._key(vk, flags=_KEYEVENTF_KEYUP)] + \
+                [self._key(modifier, flags=_KEYEVENTF_KEYUP) for modifier in reversed(modifiers)]
+        return [self._key(modifier) for modifier in modifiers] + [self._key(vk)]
+
+    def _mouse(self, flags, dx=0, dy=0):
+        item = _INPUT(type=_INPUT_MOUSE)
+        item.union.mi = _MOUSEINPUT(dx, dy, 0, flags, 0, 0)
+        return item
+
+    def _key(self, vk=0, scan=0, flags=0):
+        if vk in _EXTENDED_KEYS:
+            flags |= _KEYEVENTF_EXTENDEDKEY
+        item = _INPUT(type=_INPUT_KEYBOARD)
+        item.union.ki = _KEYBDINPUT(vk, scan, flags, 0, 0)
+        return item
+
+    def _absolute(self, x, y):
+        # Absolute coordinates are normalized to 0-65535 across the virtual desktop
+        left, top = self._user32.GetSystemMetrics(76), self._user32.GetSystemMetrics(77)
+        width, height = self._user32.GetSystemMetrics(78), self._user32.GetSystemMetrics(79)
+        return (int((x - left) * 65535 / max(width - 1, 1)), int((y - top) * 65535 / max(height - 1, 1)))
+
+    def _text_inputs(self, text):
+        inputs = []
+        for char in text:
+            if char in _TEXT_KEYS:
+                vk = _TEXT_KEYS[char]
+                inputs += [self._key(vk), self._key(vk, flags=_KEYEVENTF_KEYUP)]
+                continue
+            # Characters outside the BMP are sent as a UTF-16 surrogate pair
+            encoded = char.encode('utf-16-le')
+            for i in range(0, len(encoded), 2):
+                unit = int.from_bytes(encoded[i:i + 2], 'little')
+                inputs += [self._key(scan=unit, flags=_KEYEVENTF_UNICODE),
+                           self._key(scan=unit, flags=_KEYEVENTF_UNICODE | _KEYEVENTF_KEYUP)]
+        return inputs
+
+    def _send_fallback(self, event):
+        """Send a key event through pyautogui"""
+        if self._fallback is None:
+            self._fallback = PyAutoGUIInputBackend()
+        self._fallback.send_events([event])
+
+    def _send_inputs(self, inputs):
+        if not inputs:
+            return
+        array = (_INPUT * len(inputs))(*inputs)
+        sent = self._user32.SendInput(len(inputs), array, ctypes.sizeof(_INPUT))
+        if sent != len(inputs):
+            raise OSError(f"SendInput injected {sent} of {len(inputs)} events "
+                          f"(error {ctypes.get_last_error()})")
+
+    def send_events(self, events):
+        inputs = []
+        for event in events:
+            if event.kind in ('key_down', 'key_up'):
+                try:
+                    self._vk(event.key)
+                except ValueError:
+                    # Keep the order: send what is queued, then this key through pyautogui
+                    self._send_inputs(inputs)
+                    inputs = []
+                    self._send_fallback(event)
+                    continue
+            if event.kind == 'move':
+                dx, dy = self._absolute(event.x, event.y)
+                inputs.append(self._mouse(_MOUSEEVENTF_MOVE | _MOUSEEVENTF_ABSOLUTE | _MOUSEEVENTF_VIRTUALDESK,
+                                          dx, dy))
+            elif event.kind in ('mouse_down', 'mouse_up'):
+                down, up = _MOUSE_BUTTON_FLAGS[event.button]
+                inputs.append(self._mouse(down if event.kind == 'mouse_down' else up))
+            elif event.kind == 'key_down':
+                inputs.extend(self._key_inputs(event.key))
+            elif event.kind == 'key_up':
+                inputs.extend(self._key_inputs(event.key, up=True))
+            elif event.kind == 'text':
+                inputs.extend(self._text_inputs(event.text))
+        self._send_inputs(inputs)
+
+    def position(self):
+        point = (_LONG * 2)()
+        self._user32.GetCursorPos(point)
+        return (point[0], point[1])
+
+
+class RecordingInputBackend(InputBackend):
+    """Headless backend that records events instead of sending them
+
+    Args:
+        realtime: If True, waits really sleep; otherwise they are only recorded
+        position: Initial cursor position
+    """
+    name = 'recording'
+
+    def __init__(self, realtime=False, position=(0, 0)):
+        self.realtime = realtime
+        self.events = []
+        self._position = tuple(position)
+        self._start = time.monotonic()
+
+    def _record(self, event):
+        entry = {key: value for key, value in event._asdict().items() if value is not None}
+        entry['time'] = round(time.monotonic() - self._start, 6)
+        self.events.append(entry)
+
+    def send_events(self, events):
+        for event in events:
+            if event.kind == 'move':
+                self._position = (event.x, event.y)
+            self._record(event)
+
+    def sleep(self, seconds):
+        self._record(InputEvent('wait', seconds=seconds))
+        if self.realtime:
+            time.sleep(seconds)
+
+    def paste(self, text):
+        self._record(InputEvent('paste', text=text))
+
+    def position(self):
+        return self._position
+
+    def typed_text(self):
+        """All text typed or pasted so far, concatenated"""
+        return ''.join(event['text'] for event in self.events if event['kind'] in ('text', 'paste'))
+
+    def clear(self):
+        self.events = []
+
+    def save(self, path):
+        """Write the recorded events as JSON lines"""
+        with open(path, 'w') as f:
+            for event in self.events:
+                f.write(json.dumps(event) + '\n')
+
+
+INPUT_BACKENDS = {
+    'win32': Win32InputBackend,
+    'pyautogui': PyAutoGUIInputBackend,
+    'recording': RecordingInputBackend,
+}
+
+
+def create_input_backend(backend=None):
+    """Create an input backend
+
+    Args:
+        backend: An InputBackend instance, a backend name ('win32', 'pyautogui',
+                 'recording', 'auto'), or None to use $TESTR_INPUT_BACKEND and
+                 fall back to 'auto'
+    """
+    if isinstance(backend, InputBackend):
+        return backend
+    if backend is None:
+        backend = os.environ.get('TESTR_INPUT_BACKEND', 'auto')
+    if backend == 'auto':
+        backend = 'win32' if platform.system() == 'Windows' else 'pyautogui'
+    if backend in INPUT_BACKENDS:
+        return INPUT_BACKENDS[backend]()
+    raise ValueError(f"Unknown input backend: {backend}")
@@ -1,86 +1,109 @@
 # core/input_simulator.py
-import pyautogui
-import time
-import ctypes
-import win32api
-import win32con
-from ctypes import wintypes
 from .logger import log_action
+from .input_backends import create_input_backend
 
-# Load user32.dll
-user32 = ctypes.WinDLL('user32', use_last_error=True)
-
-# Since we're only using mouse_event and SetCursorPos, we don't need the complex INPUT structure
-# Remove the SendInput related code that was causing the error
+# Events go through an input backend (SendInput on Windows, pyautogui elsewhere,
+# or a recording backend for headless tests) in batches
 class InputSimulator:
-    def __init__(self, parent):
+    def __init__(self, parent, backend=None, paste_threshold=None):
         self.parent = parent
-        self._delay = 0.1  # Default delay between actions
-        pyautogui.PAUSE = self._delay
-        print("InputSimulator initialized with delay:", self._delay)
-    
+        self.backend = create_input_backend(backend)
+        # Text at least this long is pasted through the clipboard by type(); None (default) never
+        # pastes unless asked, since pasting replaces the user's clipboard for a moment
+        self.paste_threshold = paste_threshold
+        print(f"InputSimulator initialized with {self.backend.name} backend, "
+              f"timing profile: {parent.timing.name}")
+
+    def batch(self):
+        """Queue several input events and send them together
+
+        Example:
+            with automator.input.batch() as batch:
+                batch.click(100, 200).write("hello").press("enter")
+        """
+        return self.backend.batch()
+
+    def click_at(self, x, y, button='left', clicks=1):
+        """Move to (x, y) and click, as one batch"""
+        timing = self.parent.timing
+        (self.batch()
+            .move(x, y)
+            .wait(timing.delay('cursor_move'))  # Ensure movement is complete
+            .click(button=button, clicks=clicks, hold=timing.delay('button_hold'))
+            .submit())
+
     @log_action
     def send_mouse_event(self, x, y, event_type):
-        """Send a mouse event using Win32 API"""
-        # Move the mouse
-        win32api.SetCursorPos((x, y))
-        time.sleep(0.1)  # Small delay to ensure movement is complete
-        
-        # Send the mouse event
+        """Move the mouse and send a left button event ('click', 'down' or 'up')"""
+        batch = self.batch().move(x, y).wait(self.parent.timing.delay('cursor_move'))
         if event_type == "click":
-            win32api.mouse_event(win32con.MOUSEEVENTF_LEFTDOWN, x, y, 0, 0)
-            time.sleep(0.1)
-            win32api.mouse_event(win32con.MOUSEEVENTF_LEFTUP, x, y, 0, 0)
+            batch.click(hold=self.parent.timing.delay('button_hold'))
         elif event_type == "down":
-            win32api.mouse_event(win32con.MOUSEEVENTF_LEFTDOWN, x, y, 0, 0)
+            batch.mouse_down()
         elif event_type == "up":
-            win32api.mouse_event(win32con.MOUSEEVENTF_LEFTUP, x, y, 0, 0)
+            batch.mouse_up()
+        batch.submit()
     
     @log_action 
     def move_to_text(self, text, confidence=90):
-        """Move mouse to text using OCR"""
-        from .screen_analyzer import ScreenAnalyzer
-        position = ScreenAnalyzer().find_text_position(text, confidence)
+        """Move mouse to text using OCR
+
+        Uses the framework's shared ScreenAnalyzer so the OCR model is loaded once.
+
+        Args:
+            text: Text to move to
+            confidence: Minimum OCR confidence, as a percentage (0-100) or fraction (0-1)
+        """
+        min_confidence = confidence / 100 if confidence > 1 else confidence
+        position = self.parent.screen.find_text_position(text, min_confidence)
         if position:
             x, y = position
-            win32api.SetCursorPos((int(x), int(y)))
+            self.batch().move(x, y).submit()
 
     @log_action   
     def drag_to_text(self, source_text, target_text):
         """Drag from one text position to another"""
         self.move_to_text(source_text)
-        self.send_mouse_event(win32api.GetCursorPos()[0], win32api.GetCursorPos()[1], "down")
+        self.send_mouse_event(*self.backend.position(), "down")
         self.move_to_text(target_text)
-        self.send_mouse_event(win32api.GetCursorPos()[0], win32api.GetCursorPos()[1], "up")
+        self.send_mouse_event(*self.backend.position(), "up")
 
     @log_action   
     def smooth_drag(self, start, end, duration=1):
         """Human-like drag motion"""
-        win32api.SetCursorPos((int(start[0]), int(start[1])))
-        time.sleep(0.1)
-        self.send_mouse_event(int(start[0]), int(start[1]), "down")
+        batch = self.batch().move(*start).wait(self.parent.timing.delay('cursor_move')).mouse_down()
         
         # Calculate intermediate points for smooth movement
         steps = int(duration * 10)  # 10 steps per second
         for i in range(steps):
             x = int(start[0] + (end[0] - start[0]) * i / steps)
             y = int(start[1] + (end[1] - start[1]) * i / steps)
-            win32api.SetCursorPos((x, y))
-            time.sleep(duration / steps)
+            batch.move(x, y).wait(duration / steps)
             
-        self.send_mouse_event(int(end[0]), int(end[1]), "up")
- 
+        batch.move(*end).mouse_up().submit()
 
     @log_action
-    def type(self, text):
-        print(f"Typing text: '{text}'")
-        pyautogui.write(text)
+    def type(self, text, paste=None):
+        """Type text
+
+        Args:
+            text: Text to type
+            paste: True to paste through the clipboard, False to send key events,
+                   None to paste only text of at least `paste_threshold` characters (off by default)
+        """
+        if paste is None:
+            paste = self.paste_threshold is not None and len(text) >= self.paste_threshold
+        print(f"{'Pasting' if paste else 'Typing'} text: '{text}'")
+        batch = self.batch()
+        (batch.paste(text) if paste else batch.write(text)).submit()
+        self.parent.timing.pause('key_pause')
         return self.parent
 
     @log_action
     def press(self, key):
         print(f"Pressing key: '{key}'")
-        pyautogui.press(key)
+        self.batch().press(key).submit()
+        self.parent.timing.pause('key_pause')
         return self.parent
 
     @log_action
@@ -100,12 +123,13 @@ class InputSimulator:
             - 'option' (macOS)
         """
         print(f"Pressing hotkey combination: {' + '.join(keys)}")
-        pyautogui.hotkey(*keys)
+        self.batch().hotkey(*keys).submit()
+        self.parent.timing.pause('key_pause')
         return self.parent
 
     @log_action
     def click(self):
-        x, y = win32api.GetCursorPos()
+        x, y = self.backend.position()
         print(f"Clicking at position: ({x}, {y})")
         self.send_mouse_event(x, y, "click")
         return self.parent
\ No newline at end of file
@@ -0,0 +1,46 @@
+import importlib
+import sys
+import threading
+
+
+class LazyModule:
+    """Module proxy that imports the real module on first attribute access
+
+    Keeps `import testr` cheap: heavy dependencies (cv2, easyocr/torch,
+    pyautogui, win32) are only loaded by the code paths that use them.
+    Attribute reads and writes are forwarded, so `pyautogui.PAUSE = 0.1`
+    still reaches the real module.
+    """
+
+    def __init__(self, name):
+        object.__setattr__(self, '_name', name)
+        object.__setattr__(self, '_module', None)
+        object.__setattr__(self, '_lock', threading.Lock())
+
+    def _load(self):
+        module = self._module
+        if module is None:
+            with self._lock:
+                module = self._module
+                if module is None:
+                    module = importlib.import_module(self._name)
+                    object.__setattr__(self, '_module', module)
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    def __repr__(self):
+        state = 'loaded' if self._module is not None else 'not loaded'
+        return f"<lazy module '{self._name}' ({state})>"
+
+
+def lazy_import(name):
+    """Return the module if already imported, otherwise a LazyModule proxy"""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    return LazyModule(name)
@@ -0,0 +1,143 @@
+import os
+import json
+import atexit
+import threading
+from .text_matching import normalize_text
+
+LOCALITY_KINDS = ('text', 'template', 'color')
+
+
+def _clip(box, bounds):
+    """Intersection of two (x, y, width, height) boxes, or None if empty"""
+    x0 = max(box[0], bounds[0])
+    y0 = max(box[1], bounds[1])
+    x1 = min(box[0] + box[2], bounds[0] + bounds[2])
+    y1 = min(box[1] + box[3], bounds[1] + bounds[3])
+    if x1 <= x0 or y1 <= y0:
+        return None
+    return (x0, y0, x1 - x0, y1 - y0)
+
+
+class LocalityCache:
+    """Remembers where each query was last found so the next lookup searches there first
+
+    Entries are keyed by query kind, query and search region. A lookup first
+    searches a padded window around the last match box (clipped to the area
+    the match was found in); only if that misses is the whole area searched.
+    Locations are persisted to a JSON file at exit so they carry across runs.
+
+    Args:
+        path: JSON file to persist locations to, or None to keep them in memory
+        padding: Pixels added around the last match box on each side
+        relative_padding: Extra padding as a fraction of the box's larger edge
+    """
+
+    def __init__(self, path=None, padding=48, relative_padding=0.5):
+        self.path = path
+        self.padding = padding
+        self.relative_padding = relative_padding
+        self.hits = 0
+        self.misses = 0
+        self.cold = 0
+        self._entries = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._load()
+        if path:
+            atexit.register(self.save)
+
+    @staticmethod
+    def key(kind, query, region=None):
+        """Cache key for a query ('text' variants, 'template' name or 'color' hex) and region"""
+        if kind not in LOCALITY_KINDS:
+            raise ValueError(f"Unknown locality kind: {kind} (expected one of {LOCALITY_KINDS})")
+        if kind == 'text':
+            variants = [query] if isinstance(query, str) else list(query)
+            query = '|'.join(normalize_text(v) for v in variants)
+        elif kind == 'color':
+            query = query.upper()
+        region_key = ','.join(str(int(v)) for v in region) if region else 'screen'
+        return f"{kind}:{query}@{region_key}"
+
+    def _load(self):
+        if self.path and os.path.exists(self.path):
+            try:
+                with open(self.path) as f:
+                    self._entries = {key: {'box': tuple(value['box']), 'bounds': tuple(value['bounds'])}
+                                     for key, value in json.load(f).items()}
+            except (ValueError, TypeError, KeyError, OSError) as e:
+                print(f"Ignoring unreadable locality cache {self.path}: {str(e)}")
+
+    def save(self):
+        """Write known locations to disk (if any changed since the last save)"""
+        if not self.path or not self._dirty:
+            return
+        with self._lock:
+            data = {key: {'box': list(entry['box']), 'bounds': list(entry['bounds'])}
+                    for key, entry in self._entries.items()}
+            self._dirty = False
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def window(self, key):
+        """Padded search region around the last known location, or None if unknown"""
+        entry = self._entries.get(key)
+        if entry is None:
+            with self._lock:
+                self.cold += 1
+            return None
+        x, y, width, height = entry['box']
+        pad = int(self.padding + self.relative_padding * max(width, height))
+        return _clip((x - pad, y - pad, width + 2 * pad, height + 2 * pad), entry['bounds'])
+
+    def record(self, key, box, bounds):
+        """Remember where a query was found
+
+        Args:
+            key: Cache key (see LocalityCache.key)
+            box: Match box (x, y, width, height) in screen coordinates
+            bounds: Area the query may be searched in (x, y, width, height)
+        """
+        box = tuple(int(v) for v in box)
+        bounds = tuple(int(v) for v in bounds)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry['box'] != box or entry['bounds'] != bounds:
+                self._entries[key] = {'box': box, 'bounds': bounds}
+                self._dirty = True
+
+    def hit(self, key, box):
+        """Count a lookup served by the window; the location follows small moves"""
+        with self._lock:
+            self.hits += 1
+            entry = self._entries.get(key)
+        if entry is not None:
+            self.record(key, box, entry['bounds'])
+
+    def miss(self, key):
+        """Count a lookup whose window search failed"""
+        with self._lock:
+            self.misses += 1
+
+    def forget(self, key=None):
+        """Drop one location, or all of them"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+            self._dirty = True
+
+    @property
+    def stats(self):
+        """Window hits, window misses, lookups without a known location, and the window hit rate"""
+        tried = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'cold': self.cold,
+            'hit_rate': self.hits / tried if tried else 0.0,
+        }
@@ -3,18 +3,50 @@ import logging
 import datetime
 import functools
 import os
+import gzip
+import glob
+import queue
+import shutil
+import threading
+import atexit
+import time
 from pathlib import Path
+from .tracing import Tracer
+
+# Queue marker asking the writer thread to flush immediately
+_FLUSH = object()
 
 class TestLogger:
-    def __init__(self, log_dir="logs"):
+    """Test run logger: console output plus a streaming JSON Lines file
+
+    Entries are queued and appended to ``test_run_<timestamp>.jsonl`` by a
+    background writer thread, which flushes every `flush_interval` seconds,
+    every `flush_count` entries, and on exit.
+
+    Args:
+        log_dir: Directory for log files
+        flush_interval: Maximum seconds an entry waits in the buffer
+        flush_count: Flush once this many entries are buffered
+        max_bytes: Rotate the log file once it reaches this size (None disables rotation)
+        compress_rotated: Gzip rotated segments
+        tracing: Record action/stage spans (see Tracer); False makes log_action a pass-through
+        trace_level: Minimum span level recorded (actions INFO, stages DEBUG, helpers TRACE)
+    """
+
+    def __init__(self, log_dir="logs", flush_interval=1.0, flush_count=200, max_bytes=50 * 1024 * 1024,
+                 compress_rotated=False, tracing=True, trace_level=logging.DEBUG):
         self.log_dir = Path(log_dir)
         self.log_dir.mkdir(exist_ok=True)
-        self.current_test_logs = []
-        
-        # Set up file handler for JSON logs
+        self.flush_interval = flush_interval
+        self.flush_count = flush_count
+        self.max_bytes = max_bytes
+        self.compress_rotated = compress_rotated
+
+        # Set up file for JSON Lines logs
         timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        self.json_log_file = self.log_dir / f"test_run_{timestamp}.json"
-        
+        self.json_log_file = self.log_dir / f"test_run_{timestamp}.jsonl"
+        self._segment = 0
+
         # Set up console logger
         self.console_logger = logging.getLogger("testr")
         if not self.console_logger.handlers:
@@ -24,52 +56,161 @@ class TestLogger:
             self.console_logger.addHandler(console_handler)
             self.console_logger.setLevel(logging.INFO)
 
+        # Span tracer used by log_action and the analyzer's stages
+        self.tracer = Tracer(self, enabled=tracing, threshold=trace_level)
+
+        # Background writer
+        self._queue = queue.Queue()
+        self._closed = False
+        self._writer = threading.Thread(target=self._write_loop, name='testr-log-writer', daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
     def log(self, level, message, **extra):
         # Log to console
         self.console_logger.log(level, message)
-        
-        # Store log entry for JSON
+
+        # Queue log entry for the JSON Lines writer
         log_entry = {
             "timestamp": datetime.datetime.now().isoformat(),
             "level": logging.getLevelName(level),
             "message": message,
             **extra
         }
-        self.current_test_logs.append(log_entry)
-        
-        # Write to JSON file
-        self._write_json_log()
+        if not self._closed:
+            self._queue.put(log_entry)
+
+    def flush(self):
+        """Block until every queued entry has been written to disk"""
+        if not self._closed:
+            self._queue.put(_FLUSH)
+            self._queue.join()
+
+    def close(self):
+        """Flush remaining entries and stop the writer thread"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._writer.join()
+
+    def _write_loop(self):
+        log_file = open(self.json_log_file, 'a', encoding='utf-8')
+        buffer = []
+        deadline = time.monotonic() + self.flush_interval
+        stop = False
+        try:
+            while not stop:
+                force = False
+                try:
+                    entry = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    pass
+                else:
+                    if entry is None or entry is _FLUSH:
+                        stop = entry is None
+                        force = True
+                        self._queue.task_done()
+                    else:
+                        buffer.append(json.dumps(entry, default=str))
+
+                now = time.monotonic()
+                if force or now >= deadline or len(buffer) >= self.flush_count:
+                    if buffer:
+                        log_file.write('\n'.join(buffer) + '\n')
+                        log_file.flush()
+                        for _ in buffer:
+                            self._queue.task_done()
+                        buffer = []
+                        if self.max_bytes and log_file.tell() >= self.max_bytes:
+                            log_file.close()
+                            self._rotate()
+                            log_file = open(self.json_log_file, 'a', encoding='utf-8')
+                    deadline = now + self.flush_interval
+        finally:
+            log_file.close()
+
+    def _rotate(self):
+        """Move the current file to a numbered segment (optionally gzipped)"""
+        self._segment += 1
+        stem = self.json_log_file.name[:-len('.jsonl')]
+        rotated = self.log_dir / f"{stem}.{self._segment}.jsonl"
+        os.replace(self.json_log_file, rotated)
+        if self.compress_rotated:
+            with open(rotated, 'rb') as src, gzip.open(f"{rotated}.gz", 'wb') as dst:
+                shutil.copyfileobj(src, dst)
+            os.remove(rotated)
 
-    def _write_json_log(self):
-        with open(self.json_log_file, 'w') as f:
-            json.dump({"logs": self.current_test_logs}, f, indent=2)
+    def to_json(self, output_path=None):
+        """Aggregate this run's log into the legacy {"logs": [...]} format
+
+        Args:
+            output_path: Optional path to also write the aggregated JSON to
+        """
+        self.flush()
+        return export_json_log(self.json_log_file, output_path)
+
+
+def _log_segments(jsonl_path):
+    """Rotated segments of a log (oldest first), followed by the live file"""
+    jsonl_path = Path(jsonl_path)
+    stem = jsonl_path.name[:-len('.jsonl')] if jsonl_path.name.endswith('.jsonl') else jsonl_path.stem
+    segments = []
+    for path in glob.glob(str(jsonl_path.parent / f"{glob.escape(stem)}.*.jsonl*")):
+        index = Path(path).name[len(stem) + 1:].split('.')[0]
+        if index.isdigit():
+            segments.append((int(index), path))
+    paths = [path for _, path in sorted(segments)]
+    if jsonl_path.exists():
+        paths.append(str(jsonl_path))
+    return paths
+
+
+def read_log_entries(jsonl_path):
+    """Yield log entries from a JSON Lines log, including rotated segments"""
+    for path in _log_segments(jsonl_path):
+        opener = gzip.open if path.endswith('.gz') else open
+        with opener(path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def export_json_log(jsonl_path, output_path=None):
+    """Build the aggregated {"logs": [...]} document from a JSON Lines log
+
+    Args:
+        jsonl_path: Path of the run's .jsonl file
+        output_path: Optional path to write the aggregated JSON to (indent=2)
+    """
+    document = {"logs": list(read_log_entries(jsonl_path))}
+    if output_path:
+        with open(output_path, 'w') as f:
+            json.dump(document, f, indent=2)
+    return document
+
+def log_action(func=None, *, level=logging.INFO):
+    """Trace a framework method as an action span
+
+    Can be used bare (``@log_action``) or with a verbosity level
+    (``@log_action(level=TRACE)``) for hot helpers that should only be
+    recorded when tracing is turned up.
+    """
+    if func is None:
+        return lambda f: log_action(f, level=level)
+
+    action_name = func.__name__
 
-def log_action(func):
     @functools.wraps(func)
     def wrapper(self, *args, **kwargs):
         logger = self.parent.logger if hasattr(self, 'parent') else self.logger
-        
-        # Log the start of the action
-        action_name = func.__name__
-        logger.log(logging.INFO, f"Starting action: {action_name}", 
-                  action=action_name, 
-                  args=str(args), 
-                  kwargs=str(kwargs))
-        
-        try:
-            result = func(self, *args, **kwargs)
-            # Log successful completion
-            logger.log(logging.INFO, f"Successfully completed: {action_name}",
-                      action=action_name,
-                      status="success")
-            return result
-        except Exception as e:
-            # Log error
-            logger.log(logging.ERROR, f"Error in {action_name}: {str(e)}",
-                      action=action_name,
-                      status="error",
-                      error=str(e),
-                      error_type=type(e).__name__)
-            raise
-    
-    return wrapper
\ No newline at end of file
+        tracer = logger.tracer
+
+        # Skip all bookkeeping when this action isn't traced
+        if not tracer.enabled_for(action_name, level):
+            return func(self, *args, **kwargs)
+
+        with tracer.action(action_name, args, kwargs, level):
+            return func(self, *args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,136 @@
+from collections import namedtuple
+from .lazy_import import lazy_import
+
+cv2 = lazy_import('cv2')
+np = lazy_import('numpy')
+
+# x, y are the match center in frame coordinates; width/height the matched template size
+TemplateMatch = namedtuple('TemplateMatch', ['score', 'x', 'y', 'width', 'height', 'scale'])
+
+MATCH_MODES = ('single', 'pyramid')
+
+# Smallest template edge (in pixels) worth matching at a coarse pyramid level
+MIN_COARSE_TEMPLATE_SIZE = 8
+
+
+def _resize(gray, scale):
+    height, width = gray.shape[:2]
+    size = (max(1, int(round(width * scale))), max(1, int(round(height * scale))))
+    return cv2.resize(gray, size, interpolation=cv2.INTER_AREA if scale < 1 else cv2.INTER_LINEAR)
+
+
+def _top_candidates(result, count, suppress_w, suppress_h):
+    """Return up to `count` (score, x, y) peaks, suppressing each peak's neighbourhood"""
+    result = result.copy()
+    candidates = []
+    for _ in range(count):
+        _, max_val, _, max_loc = cv2.minMaxLoc(result)
+        if max_val <= -1:
+            break
+        candidates.append((max_val, max_loc[0], max_loc[1]))
+        x0, y0 = max(0, max_loc[0] - suppress_w), max(0, max_loc[1] - suppress_h)
+        result[y0:max_loc[1] + suppress_h + 1, x0:max_loc[0] + suppress_w + 1] = -1
+    return candidates
+
+
+def match_single(gray, template_gray):
+    """Full-resolution TM_CCOEFF_NORMED match
+
+    Returns:
+        (score, (x, y)) of the best top-left location
+    """
+    result = cv2.matchTemplate(gray, template_gray, cv2.TM_CCOEFF_NORMED)
+    _, max_val, _, max_loc = cv2.minMaxLoc(result)
+    return max_val, max_loc
+
+
+def match_pyramid(gray, template_gray, levels=2, top_k=3, downscaled=None):
+    """Coarse-to-fine match: search a downscaled frame, refine at full resolution
+
+    The frame and template are shrunk by 2**levels, the `top_k` best coarse
+    peaks are collected, and each is re-matched at full resolution inside a
+    small window around it.
+
+    Args:
+        gray: Grayscale frame
+        template_gray: Grayscale template
+        levels: Number of halvings for the coarse search
+        top_k: Number of coarse candidates to refine
+        downscaled: Optional callable(scale) returning the frame at that scale,
+                    so callers can reuse a memoized pyramid
+
+    Returns:
+        (score, (x, y)) of the best top-left location
+    """
+    t_height, t_width = template_gray.shape[:2]
+    # Don't shrink the template below a useful size
+    while levels > 0 and min(t_width, t_height) / 2 ** levels < MIN_COARSE_TEMPLATE_SIZE:
+        levels -= 1
+    if levels == 0:
+        return match_single(gray, template_gray)
+
+    scale = 1.0 / 2 ** levels
+    coarse_frame = downscaled(scale) if downscaled else _resize(gray, scale)
+    coarse_template = _resize(template_gray, scale)
+    if coarse_frame.shape[0] < coarse_template.shape[0] or coarse_frame.shape[1] < coarse_template.shape[1]:
+        return match_single(gray, template_gray)
+
+    coarse = cv2.matchTemplate(coarse_frame, coarse_template, cv2.TM_CCOEFF_NORMED)
+    candidates = _top_candidates(coarse, top_k,
+                                 max(1, coarse_template.shape[1] // 2),
+                                 max(1, coarse_template.shape[0] // 2))
+
+    # Refinement window margin covers the rounding error of the coarse level
+    margin = 2 ** levels * 2
+    height, width = gray.shape[:2]
+    best_score, best_loc = -1.0, (0, 0)
+    for _, cx, cy in candidates:
+        x0 = max(0, int(cx / scale) - margin)
+        y0 = max(0, int(cy / scale) - margin)
+        x1 = min(width, int(cx / scale) + t_width + margin)
+        y1 = min(height, int(cy / scale) + t_height + margin)
+        if x1 - x0 < t_width or y1 - y0 < t_height:
+            continue
+        score, loc = match_single(gray[y0:y1, x0:x1], template_gray)
+        if score > best_score:
+            best_score, best_loc = score, (loc[0] + x0, loc[1] + y0)
+    return best_score, best_loc
+
+
+def match_template(gray, template, mode='single', scales=None, levels=2, top_k=3, downscaled=None):
+    """Find the best match of a template in a grayscale frame
+
+    Args:
+        gray: Grayscale frame
+        template: Template from the registry, or a grayscale template array
+        mode: 'single' for a full-resolution search, 'pyramid' for coarse-to-fine
+        scales: Optional iterable of template scale factors to try (DPI-scaled UIs)
+        levels: Pyramid levels for 'pyramid' mode
+        top_k: Coarse candidates refined in 'pyramid' mode
+        downscaled: Optional callable(scale) returning a memoized downscaled frame
+
+    Returns:
+        TemplateMatch for the best scale, or None if the template never fits the frame
+    """
+    if mode not in MATCH_MODES:
+        raise ValueError(f"Unknown template match mode: {mode} (expected one of {MATCH_MODES})")
+
+    best = None
+    for scale in scales or (1.0,):
+        if hasattr(template, 'scaled'):
+            template_gray = template.scaled(scale)
+        else:
+            template_gray = template if scale == 1 else _resize(template, scale)
+        t_height, t_width = template_gray.shape[:2]
+        if t_height > gray.shape[0] or t_width > gray.shape[1]:
+            continue
+
+        if mode == 'pyramid':
+            score, loc = match_pyramid(gray, template_gray, levels, top_k, downscaled)
+        else:
+            score, loc = match_single(gray, template_gray)
+
+        if best is None or score > best.score:
+            best = TemplateMatch(float(score), loc[0] + t_width / 2, loc[1] + t_height / 2,
+                                 t_width, t_height, scale)
+    return best
@@ -0,0 +1,259 @@
+import json
+import math
+import threading
+from .exceptions import ElementNotFoundError
+
+# Histogram bucket upper bounds in seconds: 0.1 ms to ~2 minutes, each bucket
+# 2**0.25 (~19%) wider than the previous, so quantile estimates stay within ~10%
+BUCKET_BOUNDS = tuple(0.0001 * 2 ** (i / 4) for i in range(81))
+
+METRIC_PREFIX = 'testr'
+
+
+def _label_key(labels):
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format_labels(label_key, extra=()):
+    pairs = list(label_key) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (key + '="' + str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+               for key, value in pairs)
+    return '{' + ','.join(escaped) + '}'
+
+
+class Histogram:
+    """Latency histogram with fixed log-spaced buckets
+
+    Fixed buckets keep memory constant and let histograms from many runs be
+    added together; quantiles are interpolated within a bucket.
+    """
+    __slots__ = ('counts', 'count', 'sum', 'min', 'max')
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def observe(self, value):
+        # Buckets are geometric, so the index follows directly from the log
+        index = 0 if value <= BUCKET_BOUNDS[0] else min(
+            len(BUCKET_BOUNDS), int(math.ceil(4 * math.log2(value / BUCKET_BOUNDS[0]) - 1e-9)))
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def quantile(self, q):
+        """Estimated q-quantile (0-1) in seconds, or None when empty"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= rank and bucket_count:
+                lower = BUCKET_BOUNDS[index - 1] if index > 0 else 0.0
+                upper = BUCKET_BOUNDS[index] if index < len(BUCKET_BOUNDS) else self.max
+                value = lower + (upper - lower) * (rank - seen) / bucket_count
+                return min(max(value, self.min), self.max)
+            seen += bucket_count
+        return self.max
+
+    def merge(self, data):
+        """Add counts from a histogram dict produced by to_dict()"""
+        for index, bucket_count in enumerate(data['buckets']):
+            self.counts[index] += bucket_count
+        self.count += data['count']
+        self.sum += data['sum']
+        if data['count']:
+            self.min = min(self.min, data['min'])
+            self.max = max(self.max, data['max'])
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'min': self.min if self.count else 0.0,
+            'max': self.max,
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'p99': self.quantile(0.99),
+            'buckets': list(self.counts),
+        }
+
+
+class MetricsRegistry:
+    """Latency histograms, counters and gauges for a test run
+
+    Action and stage durations arrive from the Tracer (every finished span is
+    observed here, whether or not it is logged). Framework code increments
+    counters such as retries, and cache statistics are read through gauges
+    when metrics are exported.
+    """
+
+    def __init__(self):
+        self._histograms = {}
+        self._counters = {}
+        self._gauges = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name, seconds, **labels):
+        """Record a duration in the named histogram"""
+        key = (name, _label_key(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(seconds)
+
+    def increment(self, name, amount=1, **labels):
+        """Add to the named counter"""
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def register_gauges(self, name, source):
+        """Expose the numeric values of `source()` (a dict) as gauges named <name>_<key>"""
+        self._gauges[name] = source
+
+    def record_span(self, span, exc):
+        """Tracer hook: observe a finished span"""
+        if span.announce:
+            status = 'success' if exc is None else 'error'
+            self.observe('action_duration_seconds', span.duration, action=span.name, status=status)
+            if exc is not None:
+                if isinstance(exc, ElementNotFoundError):
+                    self.increment('misses_total', action=span.name)
+                else:
+                    self.increment('errors_total', action=span.name, error_type=type(exc).__name__)
+        else:
+            self.observe('stage_duration_seconds', span.duration, stage=span.name)
+
+    def histogram(self, name, **labels):
+        """The named histogram, or None"""
+        return self._histograms.get((name, _label_key(labels)))
+
+    def counter(self, name, **labels):
+        """Current value of the named counter"""
+        return self._counters.get((name, _label_key(labels)), 0)
+
+    def quantile(self, name, q, **labels):
+        """Estimated q-quantile in seconds of the named histogram, or None"""
+        histogram = self.histogram(name, **labels)
+        return histogram.quantile(q) if histogram else None
+
+    def gauges(self):
+        """Current gauge values as {name: value}"""
+        values = {}
+        for name, source in list(self._gauges.items()):
+            try:
+                data = source()
+            except Exception as e:
+                print(f"Could not read gauge {name}: {str(e)}")
+                continue
+            for key, value in data.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    values[f"{name}_{key}"] = value
+        return values
+
+    def slowest(self, name='action_duration_seconds', q=0.95, limit=10):
+        """Label sets of a histogram ordered by their q-quantile, slowest first"""
+        with self._lock:
+            rows = [(dict(labels), histogram.quantile(q), histogram.count)
+                    for (metric, labels), histogram in self._histograms.items() if metric == name]
+        rows.sort(key=lambda row: row[1] or 0.0, reverse=True)
+        return rows[:limit]
+
+    def to_dict(self):
+        """All metrics as plain data (histograms include their buckets, so runs can be merged)"""
+        with self._lock:
+            histograms = [{'name': name, 'labels': dict(labels), **histogram.to_dict()}
+                          for (name, labels), histogram in self._histograms.items()]
+            counters = [{'name': name, 'labels': dict(labels), 'value': value}
+                        for (name, labels), value in self._counters.items()]
+        return {'bucket_bounds': list(BUCKET_BOUNDS), 'histograms': histograms, 'counters': counters,
+                'gauges': self.gauges()}
+
+    def merge(self, data):
+        """Add the histograms and counters of another run (a to_dict() result)"""
+        for entry in data.get('histograms', ()):
+            key = (entry['name'], _label_key(entry['labels']))
+            with self._lock:
+                histogram = self._histograms.get(key)
+                if histogram is None:
+                    histogram = self._histograms[key] = Histogram()
+                histogram.merge(entry)
+        for entry in data.get('counters', ()):
+            self.increment(entry['name'], entry['value'], **entry['labels'])
+
+    def to_json(self, output_path=None):
+        """Metrics as JSON, written to `output_path` if given"""
+        text = json.dumps(self.to_dict(), indent=2)
+        if output_path:
+            with open(output_path, 'w') as f:
+                f.write(text)
+        return text
+
+    def to_prometheus(self, output_path=None):
+        """Metrics in the Prometheus text exposition format, written to `output_path` if given"""
+        lines = []
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            counters = sorted(self._counters.items())
+
+        declared = set()
+        for (name, labels), histogram in histograms:
+            metric = f"{METRIC_PREFIX}_{name}"
+            if metric not in declared:
+                lines.append(f"# TYPE {metric} histogram")
+                declared.add(metric)
+            cumulative = 0
+            for bound, bucket_count in zip(BUCKET_BOUNDS, histogram.counts):
+                cumulative += bucket_count
+                lines.append(f"{metric}_bucket{_format_labels(labels, [('le', f'{bound:.6g}')])} {cumulative}")
+            lines.append(f"{metric}_bucket{_format_labels(labels, [('le', '+Inf')])} {histogram.count}")
+            lines.append(f"{metric}_sum{_format_labels(labels)} {histogram.sum:.6f}")
+            lines.append(f"{metric}_count{_format_labels(labels)} {histogram.count}")
+
+        for (name, labels), value in counters:
+            metric = f"{METRIC_PREFIX}_{name}"
+            if metric not in declared:
+                lines.append(f"# TYPE {metric} counter")
+                declared.add(metric)
+            lines.append(f"{metric}{_format_labels(labels)} {value}")
+
+        for name, value in sorted(self.gauges().items()):
+            metric = f"{METRIC_PREFIX}_{name}"
+            lines.append(f"# TYPE {metric} gauge")
+            lines.append(f"{metric} {value}")
+
+        text = '\n'.join(lines) + '\n'
+        if output_path:
+            with open(output_path, 'w') as f:
+                f.write(text)
+        return text
+
+    def export(self, output_path):
+        """Write metrics to a file: Prometheus text for .prom/.txt, JSON otherwise"""
+        if output_path.endswith(('.prom', '.txt')):
+            return self.to_prometheus(output_path)
+        return self.to_json(output_path)
+
+    def report(self, limit=10):
+        """Print the slowest actions and stages (p50/p95/p99)"""
+        for name, title in (('action_duration_seconds', 'Slowest actions'),
+                            ('stage_duration_seconds', 'Slowest stages')):
+            rows = self.slowest(name, 0.95, limit)
+            if not rows:
+                continue
+            print(f"\n{title} (p50 / p95 / p99):")
+            for labels, _, count in rows:
+                histogram = self.histogram(name, **labels)
+                label = ' '.join(f"{key}={value}" for key, value in labels.items())
+                print(f"  {label:<50} {histogram.quantile(0.5) * 1000:>9.1f} / "
+                      f"{histogram.quantile(0.95) * 1000:>9.1f} / {histogram.quantile(0.99) * 1000:>9.1f} ms"
+                      f"  ({count} calls)")
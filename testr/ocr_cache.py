@@ -0,0 +1,266 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from .lazy_import import lazy_import
+
+np = lazy_import('numpy')
+
+
+def iter_tiles(width, height, tile_size, overlap):
+    """Yield (x, y, w, h) tiles covering a frame, overlapping by `overlap` pixels"""
+    step = max(1, tile_size - overlap)
+    xs = list(range(0, max(width - overlap, 1), step))
+    ys = list(range(0, max(height - overlap, 1), step))
+    for y in ys:
+        for x in xs:
+            yield (x, y, min(tile_size, width - x), min(tile_size, height - y))
+
+
+def offset_results(results, dx, dy):
+    """Translate OCR result boxes from tile to frame coordinates"""
+    return [
+        ([[point[0] + dx, point[1] + dy] for point in bbox], text, confidence)
+        for bbox, text, confidence in results
+    ]
+
+
+def _box_bounds(bbox):
+    xs = [point[0] for point in bbox]
+    ys = [point[1] for point in bbox]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def _touches_seam(bounds, tile_box, width, height, margin=2):
+    """Whether a box reaches a tile edge that is not also a frame edge"""
+    x0, y0, x1, y1 = bounds
+    x, y, w, h = tile_box
+    return (x > 0 and x0 <= x + margin) or (y > 0 and y0 <= y + margin) or \
+        (x + w < width and x1 >= x + w - margin) or (y + h < height and y1 >= y + h - margin)
+
+
+def _union_rects(rects):
+    """Merge overlapping (x0, y0, x1, y1) rectangles until none overlap"""
+    rects = list(rects)
+    merged = True
+    while merged:
+        merged = False
+        for i in range(len(rects)):
+            for j in range(i + 1, len(rects)):
+                a, b = rects[i], rects[j]
+                if a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]:
+                    rects[i] = (min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3]))
+                    del rects[j]
+                    merged = True
+                    break
+            if merged:
+                break
+    return rects
+
+
+def merge_results(results, min_overlap=0.6):
+    """Drop duplicate detections produced by overlapping tiles
+
+    When two boxes overlap by more than `min_overlap` of the smaller box, only
+    the larger one is kept: a word cut by a tile seam shows up as a fragment
+    in one tile and whole in its neighbour.
+    """
+    boxes = [(_box_bounds(bbox), bbox, text, confidence) for bbox, text, confidence in results]
+    boxes.sort(key=lambda item: ((item[0][2] - item[0][0]) * (item[0][3] - item[0][1]), item[3]),
+               reverse=True)
+
+    kept = []
+    for bounds, bbox, text, confidence in boxes:
+        x0, y0, x1, y1 = bounds
+        area = max((x1 - x0) * (y1 - y0), 1)
+        duplicate = False
+        for (kx0, ky0, kx1, ky1), _, _, _ in kept:
+            inter_w = min(x1, kx1) - max(x0, kx0)
+            inter_h = min(y1, ky1) - max(y0, ky0)
+            if inter_w > 0 and inter_h > 0 and inter_w * inter_h >= min_overlap * area:
+                duplicate = True
+                break
+        if not duplicate:
+            kept.append((bounds, bbox, text, confidence))
+
+    # Restore reading order (top to bottom, left to right)
+    kept.sort(key=lambda item: (item[0][1], item[0][0]))
+    return [(bbox, text, confidence) for _, bbox, text, confidence in kept]
+
+
+def reread_seams(frame, tile_results, results, read_crops):
+    """Replace detections cut by tile seams with a read of the area around them
+
+    Text wider than the tile overlap can be cut by a seam in every tile that
+    sees it. Detections reaching a tile's inner edge are grouped into crops
+    spanning the neighbouring fragments, and those crops are read whole.
+
+    Args:
+        frame: Image the tiles were cut from
+        tile_results: Iterable of ((x, y, w, h) tile box, results in frame coordinates)
+        results: All tile detections, in frame coordinates
+        read_crops: Callable taking a list of (x0, y0, x1, y1) crops and returning
+                    one result list per crop, in frame coordinates
+
+    Returns:
+        `results` with the seam fragments replaced by the crop detections
+    """
+    height, width = frame.shape[:2]
+    rects = []
+    for tile_box, detections in tile_results:
+        for bbox, _, _ in detections:
+            bounds = _box_bounds(bbox)
+            if _touches_seam(bounds, tile_box, width, height):
+                # Pad by the text height so the fragments from both sides join up
+                pad = max(int(bounds[3] - bounds[1]), 8)
+                rects.append((max(0, int(bounds[0]) - pad), max(0, int(bounds[1]) - pad),
+                              min(width, int(bounds[2]) + pad), min(height, int(bounds[3]) + pad)))
+    if not rects:
+        return results
+
+    crops = sorted(_union_rects(rects))
+
+    def inside_crop(bbox):
+        x0, y0, x1, y1 = _box_bounds(bbox)
+        return any(cx0 <= x0 and cy0 <= y0 and x1 <= cx1 and y1 <= cy1 for cx0, cy0, cx1, cy1 in crops)
+
+    kept = [result for result in results if not inside_crop(result[0])]
+    for crop_results in read_crops(crops):
+        kept.extend(crop_results)
+    return kept
+
+
+class TileOCRCache:
+    """Incremental OCR that only re-reads tiles whose pixels changed
+
+    The frame is split into overlapping tiles. Each tile is hashed, and OCR
+    runs only on tiles whose hash differs from the previous frame captured for
+    the same region; cached results are reused for the rest.
+
+    Text wider than the overlap can be cut by a seam in every tile that
+    sees it, so detections reaching a tile's inner edge are read again from
+    a crop spanning the neighbouring fragments (see reread_seams). Crops are
+    cached by box and hash the same way tiles are.
+
+    Args:
+        tile_size: Tile edge length in pixels
+        overlap: Overlap between neighbouring tiles; words narrower than this
+                 are always read whole by at least one tile
+        max_regions: Number of distinct capture regions to keep cached
+    """
+
+    def __init__(self, tile_size=640, overlap=96, max_regions=8):
+        self.tile_size = tile_size
+        self.overlap = overlap
+        self.max_regions = max_regions
+        self._regions = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.seam_hits = 0
+        self.seam_misses = 0
+
+    @staticmethod
+    def _digest(tile):
+        return hashlib.blake2b(np.ascontiguousarray(tile).data, digest_size=16).digest()
+
+    def _region_cache(self, key, shape):
+        entry = self._regions.get(key)
+        if entry is None or entry['shape'] != shape:
+            entry = {'shape': shape, 'tiles': {}, 'crops': {}}
+            self._regions[key] = entry
+        self._regions.move_to_end(key)
+        while len(self._regions) > self.max_regions:
+            self._regions.popitem(last=False)
+        return entry
+
+    def readtext(self, reader, frame, key=None, pool=None, **readtext_kwargs):
+        """Run OCR on a frame, re-reading only the tiles that changed
+
+        Args:
+            reader: EasyOCR reader (unused when `pool` is given)
+            frame: Image as a NumPy array
+            key: Identifies the capture region the frame came from
+            pool: Optional ParallelOCR that reads the changed tiles in parallel
+
+        Returns:
+            EasyOCR-style results [(bbox, text, confidence), ...] in frame coordinates
+        """
+        height, width = frame.shape[:2]
+        with self._lock:
+            entry = self._region_cache(key, frame.shape)
+        tiles = entry['tiles']
+
+        results = []
+        dirty = []
+        for tile_box in iter_tiles(width, height, self.tile_size, self.overlap):
+            x, y, w, h = tile_box
+            tile = frame[y:y + h, x:x + w]
+            digest = self._digest(tile)
+            cached = tiles.get(tile_box)
+            if cached is not None and cached[0] == digest:
+                self.hits += 1
+                results.extend(cached[1])
+            else:
+                self.misses += 1
+                dirty.append((tile_box, digest, tile))
+
+        read = self._read(reader, pool, [(tile, tile_box[0], tile_box[1]) for tile_box, _, tile in dirty],
+                          readtext_kwargs)
+        for (tile_box, digest, _), tile_results in zip(dirty, read):
+            tiles[tile_box] = (digest, tile_results)
+            results.extend(tile_results)
+
+        def read_crops(crops):
+            return self._read_crops(reader, pool, frame, entry, crops, readtext_kwargs)
+
+        seen = [(tile_box, tile_results) for tile_box, (_, tile_results) in tiles.items()]
+        return merge_results(reread_seams(frame, seen, results, read_crops))
+
+    @staticmethod
+    def _read(reader, pool, pieces, readtext_kwargs):
+        if not pieces:
+            return []
+        if pool is not None:
+            return pool.read_tiles(pieces, **readtext_kwargs)
+        return [offset_results(reader.readtext(tile, **readtext_kwargs), x, y) for tile, x, y in pieces]
+
+    def _read_crops(self, reader, pool, frame, entry, crops, readtext_kwargs):
+        """Read seam crops, reusing the results of crops whose box and pixels are unchanged"""
+        cached = entry['crops']
+        current = {}
+        dirty = []
+        for crop_box in crops:
+            x0, y0, x1, y1 = crop_box
+            crop = frame[y0:y1, x0:x1]
+            digest = self._digest(crop)
+            hit = cached.get(crop_box)
+            if hit is not None and hit[0] == digest:
+                self.seam_hits += 1
+                current[crop_box] = hit
+            else:
+                self.seam_misses += 1
+                dirty.append((crop_box, digest, crop))
+
+        read = self._read(reader, pool, [(crop, box[0], box[1]) for box, _, crop in dirty], readtext_kwargs)
+        for (crop_box, digest, _), crop_results in zip(dirty, read):
+            current[crop_box] = (digest, crop_results)
+        # Only the crops of the latest frame are kept; seams move with the text
+        entry['crops'] = current
+        return [current[crop_box][1] for crop_box in crops]
+
+    def clear(self):
+        """Forget all cached tiles"""
+        with self._lock:
+            self._regions.clear()
+
+    @property
+    def stats(self):
+        """Tile and seam crop cache hit/miss counters"""
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'seam_hits': self.seam_hits,
+            'seam_misses': self.seam_misses,
+        }
@@ -0,0 +1,120 @@
+import math
+from .text_matching import normalize_text, rank_text_matches
+
+OCR_MODES = ('full', 'targeted')
+
+# Typical glyph width as a fraction of the text box height for UI fonts
+CHAR_WIDTH_MIN = 0.3
+CHAR_WIDTH_TYPICAL = 0.55
+CHAR_WIDTH_MAX = 0.95
+
+
+def detect_text_boxes(reader, frame):
+    """Run only EasyOCR's text detector
+
+    Returns:
+        (horizontal_boxes, free_boxes): horizontal boxes as [x_min, x_max, y_min, y_max],
+        free (rotated) boxes as four [x, y] points
+    """
+    horizontal_list, free_list = reader.detect(frame)
+    return horizontal_list[0], free_list[0]
+
+
+def plausible_boxes(boxes, text, exact_match=False, min_score=1.0):
+    """Keep horizontal boxes whose size fits the search text, most plausible first
+
+    A box of height h and width w holds roughly w / (0.55 * h) characters. Boxes
+    that cannot hold the search text (or, for exact matches, hold far more
+    than it) are pruned.
+
+    Args:
+        boxes: Horizontal boxes [x_min, x_max, y_min, y_max]
+        text: Text to search for, or a list of text variations
+        exact_match: If True, boxes must fit the text length from both sides
+        min_score: Similarity threshold used for matching; loosens the length bounds
+
+    Returns:
+        List of boxes sorted by how well their estimated length fits the text
+    """
+    variants = [text] if isinstance(text, str) else list(text)
+    lengths = [len(normalize_text(variant)) for variant in variants]
+    lengths = [length for length in lengths if length] or [1]
+    slack = max(min_score, 0.1)
+
+    ranked = []
+    for box in boxes:
+        x_min, x_max, y_min, y_max = box
+        width, height = x_max - x_min, y_max - y_min
+        if width <= 0 or height <= 0:
+            continue
+        most_chars = width / (CHAR_WIDTH_MIN * height)
+        fewest_chars = width / (CHAR_WIDTH_MAX * height)
+        estimated_chars = width / (CHAR_WIDTH_TYPICAL * height)
+
+        fit = None
+        for length in lengths:
+            if most_chars < length * slack:
+                continue
+            if exact_match and fewest_chars > length / slack:
+                continue
+            distance = abs(math.log(estimated_chars / length))
+            # Substring matches may sit inside longer boxes: only penalize short ones
+            if not exact_match and estimated_chars > length:
+                distance *= 0.25
+            fit = distance if fit is None else min(fit, distance)
+        if fit is not None:
+            ranked.append((fit, box))
+
+    ranked.sort(key=lambda item: item[0])
+    return [box for _, box in ranked]
+
+
+def find_text_targeted(reader, frame, gray, text, min_confidence=0.4, exact_match=False, min_score=1.0,
+                       detected=None, recognized=None):
+    """Detect once, then recognize only plausible boxes until the text is found
+
+    Args:
+        reader: EasyOCR reader
+        frame: RGB frame (for detection)
+        gray: Grayscale version of the frame (for recognition)
+        text: Text to search for, or a list of text variations
+        min_confidence: Minimum OCR confidence for a detection to count
+        exact_match: If True, compare whole detections instead of substrings
+        min_score: Minimum similarity (0-1)
+        detected: Optional precomputed (horizontal_boxes, free_boxes)
+        recognized: Optional dict cache of box -> recognition results, shared across queries
+
+    Returns:
+        Ranked TextMatch list for the first box that matched, or []
+    """
+    horizontal, free = detected if detected is not None else detect_text_boxes(reader, frame)
+    recognized = recognized if recognized is not None else {}
+
+    def recognize(box, free_box=False):
+        key = _box_key(box)
+        results = recognized.get(key)
+        if results is None:
+            results = reader.recognize(gray,
+                                       horizontal_list=[] if free_box else [box],
+                                       free_list=[box] if free_box else [],
+                                       reformat=False)
+            recognized[key] = results
+        return results
+
+    for box in plausible_boxes(horizontal, text, exact_match, min_score):
+        matches = rank_text_matches(recognize(box), text, min_confidence, exact_match, min_score)
+        if matches:
+            return matches
+
+    # Rotated text is rare in UIs; only read it when nothing else matched
+    for box in free:
+        matches = rank_text_matches(recognize(box, free_box=True), text, min_confidence, exact_match, min_score)
+        if matches:
+            return matches
+    return []
+
+
+def _box_key(box):
+    if len(box) and hasattr(box[0], '__len__'):
+        return tuple(tuple(int(v) for v in point) for point in box)
+    return tuple(int(v) for v in box)
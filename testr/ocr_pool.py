@@ -0,0 +1,122 @@
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from .lazy_import import lazy_import
+from .ocr_cache import iter_tiles, offset_results, merge_results, reread_seams
+
+np = lazy_import('numpy')
+
+# Reader owned by each worker process
+_worker_reader = None
+
+
+def _init_worker(languages, gpu, torch_threads):
+    global _worker_reader
+    try:
+        import torch
+        # One worker per core: keep each worker's torch from spawning its own thread pool
+        torch.set_num_threads(torch_threads)
+    except ImportError:
+        pass
+    import easyocr
+    _worker_reader = easyocr.Reader(list(languages), gpu=gpu)
+
+
+def _ready():
+    return _worker_reader is not None
+
+
+def _read_tile(tile, x, y, readtext_kwargs):
+    results = _worker_reader.readtext(tile, **readtext_kwargs)
+    # Plain Python types pickle back cheaply
+    return offset_results([([[float(v) for v in point] for point in bbox], text, float(confidence))
+                           for bbox, text, confidence in results], x, y)
+
+
+class ParallelOCR:
+    """OCR large frames as overlapping tiles across a pool of worker processes
+
+    Each worker loads its own EasyOCR reader once. Detections from
+    neighbouring tiles are merged and de-duplicated across seams, and text
+    cut by a seam is read again whole (see reread_seams).
+    Workers are spawned, so scripts using the pool need the usual
+    `if __name__ == '__main__':` guard.
+
+    Args:
+        workers: Number of worker processes (defaults to the CPU count)
+        tile_size: Tile edge length in pixels
+        overlap: Overlap between neighbouring tiles; words narrower than this are read whole
+        languages: EasyOCR languages
+        gpu: Let workers use the GPU (usually only sensible with one worker)
+        torch_threads: Torch intra-op threads per worker
+        min_pixels: Frames smaller than this are left to the in-process reader
+    """
+
+    def __init__(self, workers=None, tile_size=1024, overlap=128, languages=('en',), gpu=False, torch_threads=1,
+                 min_pixels=1280 * 720):
+        self.workers = workers or os.cpu_count() or 1
+        self.tile_size = tile_size
+        self.overlap = overlap
+        self.languages = tuple(languages)
+        self.gpu = gpu
+        self.torch_threads = torch_threads
+        self.min_pixels = min_pixels
+        self._executor = None
+
+    @property
+    def executor(self):
+        """Worker pool, started on first use"""
+        if self._executor is None:
+            # spawn: forking a process that already loaded torch is not safe
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+                initargs=(self.languages, self.gpu, self.torch_threads),
+            )
+        return self._executor
+
+    def warm_up(self):
+        """Start the workers and load their readers ahead of the first OCR call"""
+        futures = [self.executor.submit(_ready) for _ in range(self.workers)]
+        for future in futures:
+            future.result()
+
+    def accepts(self, frame):
+        """Whether a frame is large enough to be worth splitting across processes"""
+        return self.workers > 1 and frame.shape[0] * frame.shape[1] >= self.min_pixels
+
+    def read_tiles(self, tiles, **readtext_kwargs):
+        """OCR (tile, x, y) pieces in parallel
+
+        Returns:
+            One result list per tile, in frame coordinates, in input order
+        """
+        futures = [self.executor.submit(_read_tile, np.ascontiguousarray(tile), x, y, readtext_kwargs)
+                   for tile, x, y in tiles]
+        return [future.result() for future in futures]
+
+    def readtext(self, frame, **readtext_kwargs):
+        """OCR a whole frame, split into overlapping tiles across the pool
+
+        Returns:
+            EasyOCR-style results [(bbox, text, confidence), ...] in frame coordinates
+        """
+        height, width = frame.shape[:2]
+        tile_boxes = list(iter_tiles(width, height, self.tile_size, self.overlap))
+        tiles = [(frame[y:y + h, x:x + w], x, y) for x, y, w, h in tile_boxes]
+        read = self.read_tiles(tiles, **readtext_kwargs)
+        results = []
+        for tile_results in read:
+            results.extend(tile_results)
+
+        def read_crops(crops):
+            return self.read_tiles([(frame[y0:y1, x0:x1], x0, y0) for x0, y0, x1, y1 in crops], **readtext_kwargs)
+
+        return merge_results(reread_seams(frame, zip(tile_boxes, read), results, read_crops))
+
+    def close(self):
+        """Shut the worker pool down"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
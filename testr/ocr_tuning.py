@@ -0,0 +1,194 @@
+import json
+import os
+import threading
+from collections import namedtuple
+from .lazy_import import lazy_import
+from .text_matching import normalize_text
+
+cv2 = lazy_import('cv2')
+
+# scale: resize factor applied before OCR; grayscale/binarize: color reduction;
+# contrast: gain around mid-gray (1.0 leaves the image unchanged)
+OCRSettings = namedtuple('OCRSettings', ['scale', 'grayscale', 'binarize', 'contrast'])
+OCRSettings.__new__.__defaults__ = (1.0, False, False, 1.0)
+
+DEFAULT_OCR_SETTINGS = OCRSettings()
+
+# Cheaper than the raw frame: tried (cheapest first) to find the cheapest settings that still work
+REDUCED_SETTINGS = [
+    OCRSettings(scale=0.5, grayscale=True),
+    OCRSettings(scale=0.75, grayscale=True),
+]
+
+# More expensive than the raw frame: tried as a last resort when the raw frame misses
+# (tiny or low-contrast fonts)
+ENHANCED_SETTINGS = [
+    OCRSettings(scale=1.0, grayscale=True, contrast=1.5),
+    OCRSettings(scale=1.5, grayscale=True),
+    OCRSettings(scale=2.0, grayscale=True, binarize=True),
+]
+
+
+def as_settings(value):
+    """Coerce None, a dict or an OCRSettings into OCRSettings"""
+    if value is None:
+        return DEFAULT_OCR_SETTINGS
+    if isinstance(value, OCRSettings):
+        return value
+    if isinstance(value, dict):
+        return OCRSettings(**value)
+    raise ValueError(f"Invalid OCR preprocessing settings: {value!r}")
+
+
+def preprocess_frame(frame, settings):
+    """Apply OCR preprocessing to an RGB frame
+
+    Returns:
+        Image to run OCR on (RGB or single channel)
+    """
+    image = frame
+    if settings.grayscale or settings.binarize:
+        image = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+    if settings.contrast != 1.0:
+        image = cv2.convertScaleAbs(image, alpha=settings.contrast, beta=128 * (1 - settings.contrast))
+    if settings.scale != 1.0:
+        height, width = image.shape[:2]
+        size = (max(1, int(round(width * settings.scale))), max(1, int(round(height * settings.scale))))
+        interpolation = cv2.INTER_AREA if settings.scale < 1 else cv2.INTER_CUBIC
+        image = cv2.resize(image, size, interpolation=interpolation)
+    if settings.binarize:
+        _, image = cv2.threshold(image, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    return image
+
+
+def unscale_results(results, scale):
+    """Map OCR boxes from a resized image back to frame coordinates"""
+    if scale == 1.0:
+        return results
+    return [
+        ([[point[0] / scale, point[1] / scale] for point in bbox], text, confidence)
+        for bbox, text, confidence in results
+    ]
+
+
+class OCRAutoTuner:
+    """Learns, per text target and region, the cheapest OCR preprocessing that works
+
+    On the first successful lookup of a target with the raw frame, cheaper
+    settings (downscaled, grayscale) are tried from the cheapest up and the
+    first one that still finds the text is remembered. Enhanced settings
+    (upscaled, contrast, binarized) cost several full OCR passes, so they are
+    only tried when the caller asks for them, e.g. on the final retry of a
+    lookup: an early miss usually means the text has not rendered yet.
+    Learned settings are persisted to a JSON file.
+
+    Args:
+        path: JSON file to persist learned settings to, or None to keep them in memory
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self._settings = {}
+        self._lock = threading.Lock()
+        self.tuned_hits = 0
+        self.fallbacks = 0
+        self._load()
+
+    @staticmethod
+    def key(text, region=None):
+        """Tuning key for a text target (or list of variants) and region"""
+        variants = [text] if isinstance(text, str) else list(text)
+        region_key = ','.join(str(int(v)) for v in region) if region else 'screen'
+        return f"{'|'.join(normalize_text(v) for v in variants)}@{region_key}"
+
+    def _load(self):
+        if self.path and os.path.exists(self.path):
+            try:
+                with open(self.path) as f:
+                    self._settings = {key: OCRSettings(**value) for key, value in json.load(f).items()}
+            except (ValueError, TypeError, OSError) as e:
+                print(f"Ignoring unreadable OCR tuning file {self.path}: {str(e)}")
+
+    def save(self):
+        """Write learned settings to disk"""
+        if not self.path:
+            return
+        with self._lock:
+            data = {key: settings._asdict() for key, settings in self._settings.items()}
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def get(self, key):
+        """Learned settings for a key, or None"""
+        return self._settings.get(key)
+
+    def record(self, key, settings):
+        """Remember settings for a key and persist them"""
+        with self._lock:
+            changed = self._settings.get(key) != settings
+            self._settings[key] = settings
+        if changed:
+            self.save()
+
+    def forget(self, key):
+        """Drop learned settings so the key is tuned again"""
+        with self._lock:
+            removed = self._settings.pop(key, None) is not None
+        if removed:
+            self.save()
+
+    def run(self, key, attempt, enhance=False):
+        """Run `attempt(settings)` with tuned settings, learning them if needed
+
+        Args:
+            key: Tuning key (see OCRAutoTuner.key)
+            attempt: Callable taking OCRSettings, returning a truthy result on success
+            enhance: If the raw frame misses, also try the enhanced settings
+
+        Returns:
+            The first truthy result, or None
+        """
+        learned = self.get(key)
+        if learned is not None:
+            result = attempt(learned)
+            if result:
+                self.tuned_hits += 1
+                return result
+            if learned == DEFAULT_OCR_SETTINGS:
+                return None
+            # The screen may have changed: confirm with the raw frame, and re-tune next time
+            self.fallbacks += 1
+            result = attempt(DEFAULT_OCR_SETTINGS)
+            if result:
+                self.forget(key)
+            return result
+
+        result = attempt(DEFAULT_OCR_SETTINGS)
+        if result:
+            # Found at full quality: look for the cheapest settings that still find it
+            for settings in REDUCED_SETTINGS:
+                if attempt(settings):
+                    self.record(key, settings)
+                    return result
+            self.record(key, DEFAULT_OCR_SETTINGS)
+            return result
+
+        if not enhance:
+            return None
+        for settings in ENHANCED_SETTINGS:
+            result = attempt(settings)
+            if result:
+                self.record(key, settings)
+                return result
+        return None
+
+    @property
+    def stats(self):
+        """Number of learned targets, lookups served by them, and fallbacks to the raw frame"""
+        return {
+            'targets': len(self._settings),
+            'tuned_hits': self.tuned_hits,
+            'fallbacks': self.fallbacks,
+        }
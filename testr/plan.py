@@ -0,0 +1,199 @@
+import time
+import inspect
+from collections import namedtuple
+from .snapshot import region_key
+
+# Screen methods that only look at the screen; consecutive ones can share a capture
+QUERY_METHODS = ('find_text_position', 'find_template_position', 'find_color_position', 'find_any_template',
+                 'find_templates', 'find_all_text', 'find_color_blobs')
+# Screen methods that look first and then act; they can use a shared capture but end the sharing
+QUERY_THEN_ACT_METHODS = ('find_text_position_and_click', 'find_color_position_and_click')
+
+# target: 'app', 'input', 'screen' or None for Testr itself; seconds: wall time of the step;
+# status: 'ok', 'error' or 'skipped'; shared_capture: True if the step reused the previous step's capture
+StepTiming = namedtuple('StepTiming', ['index', 'description', 'target', 'method', 'seconds', 'status',
+                                       'shared_capture'])
+
+
+class PlanStep:
+    """One recorded call of an ActionPlan"""
+
+    def __init__(self, index, target, method, args, kwargs):
+        self.index = index
+        self.target = target
+        self.method = method
+        self.args = args
+        self.kwargs = kwargs
+
+    @property
+    def description(self):
+        arguments = [repr(arg) for arg in self.args]
+        arguments += [f"{key}={value!r}" for key, value in self.kwargs.items()]
+        prefix = f"{self.target}." if self.target else ''
+        return f"{prefix}{self.method}({', '.join(arguments)})"
+
+    def arguments(self, func):
+        """Call arguments by parameter name, defaults included"""
+        try:
+            bound = inspect.signature(func).bind(*self.args, **self.kwargs)
+        except (TypeError, ValueError):
+            return dict(self.kwargs)
+        bound.apply_defaults()
+        return dict(bound.arguments)
+
+
+class _StepRecorder:
+    """Stands in for testr.app/input/screen while a plan is being built"""
+
+    def __init__(self, plan, target):
+        self._plan = plan
+        self._target = target
+
+    def __getattr__(self, name):
+        component = getattr(self._plan.testr, self._target)
+        if not callable(getattr(component, name, None)):
+            raise AttributeError(f"{type(component).__name__} has no action '{name}'")
+
+        def record(*args, **kwargs):
+            return self._plan.add_step(self._target, name, args, kwargs)
+
+        return record
+
+
+class ActionPlan:
+    """Deferred action chain: calls are recorded, then executed by run()
+
+    Before the first step runs, work needed by later steps is started in the
+    background: templates are decoded, the OCR model is loaded and the
+    executable index is read. While running, consecutive screen queries with
+    the same region share one capture (and its OCR results); any step that
+    can change the screen ends the sharing.
+
+    Example:
+        (automator.chain(deferred=True)
+            .app.launch_app("chrome", wait_ready=True)
+            .screen.find_text_position_and_click("Search")
+            .input.type("facebook.com")
+            .run())
+
+    Args:
+        testr: Testr instance the plan runs against
+        prefetch: Start background preparation of later steps when run() begins
+        share_captures: Let consecutive screen queries reuse one capture
+    """
+
+    def __init__(self, testr, prefetch=True, share_captures=True):
+        self.testr = testr
+        self.prefetch = prefetch
+        self.share_captures = share_captures
+        self.steps = []
+        self.timings = []
+        self.app = _StepRecorder(self, 'app')
+        self.input = _StepRecorder(self, 'input')
+        self.screen = _StepRecorder(self, 'screen')
+
+    def add_step(self, target, method, args, kwargs):
+        self.steps.append(PlanStep(len(self.steps) + 1, target, method, args, kwargs))
+        return self
+
+    def chain(self):
+        return self
+
+    def wait(self, seconds):
+        return self.add_step(None, 'wait', (seconds,), {})
+
+    def _component(self, step):
+        return getattr(self.testr, step.target) if step.target else self.testr
+
+    def _start_prefetch(self):
+        """Submit background preparation for every step; returns the futures"""
+        screen = self.testr.screen
+        futures = []
+        needs_ocr = False
+        for step in self.steps:
+            func = getattr(self._component(step), step.method)
+            arguments = step.arguments(func)
+            if 'text' in step.method:
+                needs_ocr = True
+            templates = arguments.get('template_path') or arguments.get('templates')
+            if templates:
+                names = [templates] if isinstance(templates, str) else list(templates)
+                for name in names:
+                    futures.append(screen.executor.submit(screen.templates.get, name))
+            if step.target == 'app' and step.method in ('launch_app', 'find_executable_path'):
+                futures.append(screen.executor.submit(lambda: self.testr.app.executable_index))
+        if needs_ocr:
+            screen.warm_up(background=True)
+        return futures
+
+    def run(self):
+        """Execute the recorded steps in order
+
+        Returns:
+            The Testr instance, so a regular chain can continue
+
+        Raises:
+            Whatever the failing step raised; later steps are reported as skipped
+        """
+        screen = self.testr.screen
+        tracer = screen.tracer
+        self.timings = []
+        print(f"Running action plan with {len(self.steps)} steps")
+
+        with tracer.span('plan', steps=len(self.steps)):
+            prefetched = self._start_prefetch() if self.prefetch else []
+            shared = None
+            for position, step in enumerate(self.steps):
+                component = self._component(step)
+                func = getattr(component, step.method)
+                is_query = step.target == 'screen' and step.method in QUERY_METHODS + QUERY_THEN_ACT_METHODS
+                region = step.arguments(func).get('region') if is_query else None
+
+                reused = False
+                if self.share_captures and is_query and shared is not None and \
+                        region_key(shared.region) == region_key(region):
+                    screen.reuse_snapshot(shared)
+                    reused = True
+
+                # Only a snapshot taken (or reused) by this step may be shared with the next one
+                screen.last_snapshot = None
+                start = time.perf_counter()
+                try:
+                    with tracer.span('plan_step', step=step.index, action=step.description):
+                        func(*step.args, **step.kwargs)
+                except Exception:
+                    self._record(step, time.perf_counter() - start, 'error', reused)
+                    for skipped in self.steps[position + 1:]:
+                        self._record(skipped, 0.0, 'skipped', False)
+                    self.report()
+                    raise
+                finally:
+                    screen.reuse_snapshot(None)
+                self._record(step, time.perf_counter() - start, 'ok', reused)
+
+                if is_query and step.method in QUERY_METHODS:
+                    shared = screen.last_snapshot
+                else:
+                    # Clicks, typing, waits and launches can change the screen
+                    shared = None
+
+            for future in prefetched:
+                if future.done() and future.exception() is not None:
+                    print(f"Prefetch failed: {str(future.exception())}")
+
+        self.report()
+        return self.testr
+
+    def _record(self, step, seconds, status, shared_capture):
+        self.timings.append(StepTiming(step.index, step.description, step.target, step.method, seconds, status,
+                                       shared_capture))
+
+    def report(self):
+        """Print per-step timings"""
+        total = sum(timing.seconds for timing in self.timings)
+        print(f"\n⏱ Action plan: {total * 1000:.1f} ms")
+        for timing in self.timings:
+            shared = ' (shared capture)' if timing.shared_capture else ''
+            print(f"  {timing.index:>3}. {timing.description:<60} {timing.seconds * 1000:>9.1f} ms  "
+                  f"{timing.status}{shared}")
+        return self.timings
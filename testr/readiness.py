@@ -0,0 +1,235 @@
+import os
+import time
+import platform
+from .lazy_import import lazy_import
+from .exceptions import WaitTimeoutError
+from .waiting import frame_fingerprint, fingerprint_distance
+
+psutil = lazy_import('psutil')
+win32gui = lazy_import('win32gui')
+win32process = lazy_import('win32process')
+
+READINESS_PROBES = ('process', 'window', 'stable', 'text', 'template')
+
+# wait_ready=True: the app has a process, a window, and has stopped repainting
+DEFAULT_PROBES = ('process', 'window', 'stable')
+
+# Seconds to wait for a new process (or window) while an instance was already
+# running; single-instance apps (e.g. Chrome) hand the launch over to it and exit
+HANDOFF_GRACE = 5
+
+
+def process_name(app_path):
+    """Process name of an executable path, lowercased and without extension"""
+    name = os.path.basename(app_path.rstrip('\\/')).lower()
+    for extension in ('.exe', '.app'):
+        if name.endswith(extension):
+            name = name[:-len(extension)]
+    return name
+
+
+def find_processes(name, exclude=()):
+    """PIDs of running processes whose name matches `name` (see process_name)
+
+    Args:
+        name: Process name as returned by process_name
+        exclude: PIDs to leave out, e.g. instances that were running before a launch
+    """
+    pids = []
+    for process in psutil.process_iter(['name']):
+        if process.pid in exclude:
+            continue
+        process_base = (process.info.get('name') or '').lower()
+        if process_base.endswith('.exe'):
+            process_base = process_base[:-4]
+        if process_base == name:
+            pids.append(process.pid)
+    return pids
+
+
+def find_windows(pids):
+    """Handles of visible, titled top-level windows owned by the given processes (Windows only)"""
+    pids = set(pids)
+    windows = []
+
+    def collect(hwnd, _):
+        if win32gui.IsWindowVisible(hwnd) and win32gui.GetWindowText(hwnd):
+            if win32process.GetWindowThreadProcessId(hwnd)[1] in pids:
+                windows.append(hwnd)
+        return True
+
+    win32gui.EnumWindows(collect, None)
+    return windows
+
+
+def new_windows(name, existing_windows):
+    """Windows of any instance of `name` that are not in `existing_windows` (Windows only)"""
+    return [hwnd for hwnd in find_windows(find_processes(name)) if hwnd not in existing_windows]
+
+
+def poll(check, deadline, poll_interval, description):
+    """Call `check` until it returns something truthy or the deadline passes"""
+    while True:
+        result = check()
+        if result:
+            return result
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise WaitTimeoutError(f"{description} did not appear before the deadline")
+        time.sleep(min(poll_interval, remaining))
+
+
+def wait_stable(analyzer, deadline, region=None, stable_for=0.5, poll_interval=0.05, change_threshold=4):
+    """Wait until the screen (or region) has not changed for `stable_for` seconds
+
+    Returns:
+        Seconds waited
+    """
+    start = time.monotonic()
+    previous = frame_fingerprint(analyzer.capture.grab(region))
+    stable_since = start
+    while True:
+        now = time.monotonic()
+        if now - stable_since >= stable_for:
+            return now - start
+        if now >= deadline:
+            raise WaitTimeoutError(f"Screen did not settle for {stable_for}s before the deadline")
+        time.sleep(min(poll_interval, deadline - now))
+        fingerprint = frame_fingerprint(analyzer.capture.grab(region))
+        if fingerprint_distance(fingerprint, previous) >= change_threshold:
+            stable_since = time.monotonic()
+        previous = fingerprint
+
+
+def normalize_probes(wait_ready):
+    """Turn a wait_ready argument into a list of probe dicts
+
+    Accepts True (default probes), a probe name, a dict such as
+    {'text': 'Search'} or {'probe': 'stable', 'timeout': 3}, or a list of these.
+    """
+    if wait_ready is True:
+        wait_ready = list(DEFAULT_PROBES)
+    elif isinstance(wait_ready, (str, dict)):
+        wait_ready = [wait_ready]
+
+    probes = []
+    for probe in wait_ready:
+        if isinstance(probe, str):
+            probe = {'probe': probe}
+        else:
+            probe = dict(probe)
+            if 'probe' not in probe:
+                # {'text': 'Search'} / {'template': 'x.png'} shorthand
+                kind = next((key for key in ('text', 'template') if key in probe), None)
+                if kind is None:
+                    raise ValueError(f"Readiness probe needs a 'probe' key: {probe!r}")
+                probe['probe'] = kind
+        if probe['probe'] not in READINESS_PROBES:
+            raise ValueError(f"Unknown readiness probe: {probe['probe']} (expected one of {READINESS_PROBES})")
+        probes.append(probe)
+    return probes
+
+
+def wait_until_ready(parent, app_path, wait_ready=True, timeout=30, region=None, poll_interval=0.1,
+                     existing_pids=(), existing_windows=()):
+    """Run readiness probes in order until all pass
+
+    Probes share the overall `timeout`; a probe may set its own shorter
+    'timeout'. Probes:
+        process: a new process for the executable is running (one not in existing_pids)
+        window: a new visible top-level window (one not in existing_windows) of any
+                instance of the executable (Windows only; elsewhere it is satisfied
+                by the process probe)
+        stable: the screen (or 'region') has not changed for 'stable_for' seconds (default 0.5)
+        text: the given 'text' is visible (OCR match, see find_all_text)
+        template: the given 'template' matches with 'confidence' (default 0.8)
+
+    Args:
+        parent: Testr instance (for screen capture and tracing)
+        app_path: Launched executable path or name
+        wait_ready: Probe specification (see normalize_probes)
+        timeout: Deadline in seconds for all probes together
+        region: Default region for the stable, text and template probes
+        poll_interval: Seconds between process/window checks
+        existing_pids: PIDs of instances running before the launch; they never satisfy
+                       the process probe, so an app that is already open is not
+                       reported ready before the launched instance is
+        existing_windows: Window handles of those instances; they never satisfy the window probe
+
+    If instances were already running and no new process appears within
+    HANDOFF_GRACE seconds, the launch is taken to have been handed to a
+    running instance: the process probe passes, the window probe gives up
+    after the same grace period, and readiness falls back to the stable probe.
+
+    Returns:
+        Dict of probe name -> seconds it took
+
+    Raises:
+        WaitTimeoutError: If a probe misses its deadline
+    """
+    screen = parent.screen
+    tracer = parent.logger.tracer
+    name = process_name(app_path)
+    overall_deadline = time.monotonic() + timeout
+    timings = {}
+    pids = []
+    existing_pids = set(existing_pids)
+    existing_windows = set(existing_windows)
+    handed_off = False
+    probes = normalize_probes(wait_ready)
+
+    for probe in probes:
+        kind = probe['probe']
+        start = time.monotonic()
+        deadline = overall_deadline
+        if probe.get('timeout') is not None:
+            deadline = min(deadline, start + probe['timeout'])
+        probe_region = probe.get('region', region)
+
+        with tracer.span(f'ready_{kind}', app=name):
+            if kind == 'process' or (kind == 'window' and not pids and not handed_off):
+                running = [pid for pid in find_processes(name) if pid in existing_pids]
+                process_deadline = min(deadline, start + HANDOFF_GRACE) if running else deadline
+                try:
+                    pids = poll(lambda: find_processes(name, existing_pids), process_deadline, poll_interval,
+                                f"Process {name}")
+                except WaitTimeoutError:
+                    running = [pid for pid in find_processes(name) if pid in existing_pids]
+                    if not running:
+                        raise
+                    handed_off = True
+                    pids = running
+                    print(f"🔁 No new {name} process; the launch was handed to the running instance")
+                    if not any(other['probe'] == 'stable' for other in probes):
+                        wait_stable(screen, deadline, probe_region)
+            if kind == 'window' and platform.system() == 'Windows':
+                window_deadline = min(deadline, start + HANDOFF_GRACE) if handed_off else deadline
+                try:
+                    poll(lambda: new_windows(name, existing_windows), window_deadline, poll_interval,
+                         f"Window of {name}")
+                except WaitTimeoutError:
+                    if not handed_off:
+                        raise
+                    # The running instance may reuse a window it already had; rely on the stable probe
+                    print(f"🔁 No new {name} window; waiting for the screen to settle instead")
+                    if not any(other['probe'] == 'stable' for other in probes):
+                        wait_stable(screen, deadline, probe_region)
+            elif kind == 'stable':
+                wait_stable(screen, deadline, probe_region, stable_for=probe.get('stable_for', 0.5))
+            elif kind == 'text':
+                screen.wait_until(lambda snapshot: snapshot.find_all_text(probe['text']),
+                                  timeout=max(0, deadline - time.monotonic()), region=probe_region,
+                                  description=f"Text '{probe['text']}'")
+            elif kind == 'template':
+                confidence = probe.get('confidence', 0.8)
+
+                def template_visible(snapshot):
+                    match = snapshot.match_template(probe['template'])
+                    return match is not None and match.score >= confidence
+
+                screen.wait_until(template_visible, timeout=max(0, deadline - time.monotonic()),
+                                  region=probe_region, description=f"Template {probe['template']}")
+
+        timings[kind] = time.monotonic() - start
+        print(f"✅ Ready ({kind}) after {timings[kind]:.2f}s")
+    return timings
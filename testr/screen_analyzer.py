@@ -1,116 +1,267 @@
-import cv2
-import numpy as np
-import pyautogui
-import easyocr
-from PIL import Image
 import os
 import time
-import win32api
-import win32con
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from .lazy_import import lazy_import
 from .exceptions import ElementNotFoundError
 from .logger import log_action
+from .tracing import TRACE
+from .capture import create_capture_backend
+from .snapshot import Snapshot, region_key, resolve_ocr_options
+from .ocr_cache import TileOCRCache
+from .ocr_pool import ParallelOCR
+from .templates import TemplateRegistry
+from .color import hex_to_rgb
+from .waiting import wait_until
+from .artifacts import ArtifactWriter
+from .ocr_tuning import OCRAutoTuner
+from .locality import LocalityCache
+
+cv2 = lazy_import('cv2')
+np = lazy_import('numpy')
+easyocr = lazy_import('easyocr')
 
 class ScreenAnalyzer:
-    def __init__(self, parent):
+    def __init__(self, parent, capture_backend=None, incremental_ocr=True, save_artifacts=True,
+                 artifact_options=None, ocr_mode='full', ocr_preprocess=None, ocr_tuning_file=None,
+                 ocr_workers=None, locality=False, locality_file=None, assets_dir=None):
         self.parent = parent
-        # Initialize EasyOCR reader (only need to do this once)
-        print("Initializing EasyOCR (this may take a moment on first run)...")
-        self.reader = easyocr.Reader(['en'])
-        self.assets_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'assets')
+        # Default text search strategy: 'full' OCR or 'targeted' detect-then-recognize
+        self.ocr_mode = ocr_mode
+        # Default OCR preprocessing: None (raw frame), OCRSettings, or 'auto' to learn per target
+        self.ocr_preprocess = ocr_preprocess
+        # Screen capture backend (mss, pyautogui or file replay)
+        self.capture = create_capture_backend(capture_backend)
+        # Tile cache so OCR only re-reads screen areas that changed
+        self.ocr_cache = TileOCRCache() if incremental_ocr else None
+        # Optional process pool that OCRs large frames tile by tile in parallel
+        self.ocr_pool = ParallelOCR(workers=ocr_workers) if ocr_workers and ocr_workers > 1 else None
+        # EasyOCR reader is loaded on first OCR use (or by warm_up)
+        self._reader = None
+        self._reader_lock = threading.Lock()
+        # Debug screenshots and learned state; defaults to assets/ next to the package
+        self.assets_dir = assets_dir or os.path.join(os.path.dirname(os.path.dirname(__file__)), 'assets')
         os.makedirs(self.assets_dir, exist_ok=True)
+        # Highlighted debug screenshots are written in the background
+        self.artifacts = ArtifactWriter(self.assets_dir, enabled=save_artifacts, **(artifact_options or {}))
+        # Learned OCR preprocessing per text target, persisted across runs
+        self.ocr_tuner = OCRAutoTuner(ocr_tuning_file or os.path.join(self.assets_dir, 'ocr_tuning.json'))
+        # Opt-in: last known element locations, searched first on the next lookup
+        # (persisted across runs only when locality_file is given)
+        self.locator = LocalityCache(locality_file) if locality or locality_file else None
+        # Decoded, grayscale templates from the images folder, loaded once
+        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        self.templates = TemplateRegistry(os.path.join(base_dir, 'images'))
+        # Thread pool for concurrent matching, created on first use
+        self._executor = None
+        # Snapshot handed to the next snapshot() call for the same region (see reuse_snapshot)
+        self._pending_snapshot = None
+        self.last_snapshot = None
 
-    @log_action
+    @property
+    def reader(self):
+        """EasyOCR reader, loaded on first use and shared afterwards"""
+        if self._reader is None:
+            with self._reader_lock:
+                if self._reader is None:
+                    print("Initializing EasyOCR (this may take a moment on first run)...")
+                    self._reader = easyocr.Reader(['en'])
+        return self._reader
+
+    @property
+    def executor(self):
+        """Shared thread pool used for concurrent template matching"""
+        if self._executor is None:
+            with self._reader_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=os.cpu_count() or 4,
+                                                        thread_name_prefix='testr-match')
+        return self._executor
+
+    def warm_up(self, background=True):
+        """Load the EasyOCR model (and start the OCR worker pool, if any) ahead of the first text lookup
+
+        Args:
+            background: If True, load in a daemon thread and return immediately
+
+        Returns:
+            The loading thread, or None when loaded synchronously
+        """
+        def load():
+            self.reader
+            if self.ocr_pool is not None:
+                self.ocr_pool.warm_up()
+
+        if not background:
+            load()
+            return None
+        thread = threading.Thread(target=load, name='testr-ocr-warmup', daemon=True)
+        thread.start()
+        return thread
+
+    @property
+    def timing(self):
+        """Timing policy of the parent framework"""
+        return self.parent.timing
+
+    @property
+    def metrics(self):
+        """Metrics registry of the parent framework"""
+        return self.parent.metrics
+
+    @property
+    def tracer(self):
+        """Span tracer of the parent framework's logger"""
+        return self.parent.logger.tracer
+
+    @log_action(level=TRACE)
     def normalize_text(self, text):
         """Normalize text by removing spaces and converting to lowercase"""
         return ''.join(text.lower().split())
 
-    @log_action
+    @log_action(level=logging.DEBUG)
     def save_screenshot_with_highlight(self, screenshot, bbox, text):
-        """Save screenshot with highlighted text area"""
-        # Convert PIL image to OpenCV format
-        cv_image = cv2.cvtColor(np.array(screenshot), cv2.COLOR_RGB2BGR)
-        
-        # Draw red rectangle around text
+        """Queue a screenshot with highlighted text area for writing"""
         x_min, y_min = bbox[0]
         x_max, y_max = bbox[2]
-        cv2.rectangle(cv_image, 
-                     (int(x_min), int(y_min)), 
-                     (int(x_max), int(y_max)), 
-                     (0, 0, 255),  # BGR color (red)
-                     2)  # Thickness
-        
-        # Add text label above rectangle
-        cv2.putText(cv_image, 
-                   f'Found: {text}',
-                   (int(x_min), int(y_min) - 10),
-                   cv2.FONT_HERSHEY_SIMPLEX,
-                   0.5,
-                   (0, 0, 255),
-                   1)
         
         # Generate unique filename with timestamp
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f'text_match_{text.replace(" ", "_")}_{timestamp}.png'
-        filepath = os.path.join(self.assets_dir, filename)
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')[:-3]
+        filename = f'text_match_{text.replace(" ", "_")}_{timestamp}'
         
-        # Save image
-        cv2.imwrite(filepath, cv_image)
-        print(f"Screenshot saved: {filepath}")
+        # Drawing and encoding happen on the artifact writer's thread
+        filepath = self.artifacts.submit(screenshot, (x_min, y_min, x_max, y_max), f'Found: {text}', filename)
+        if filepath:
+            print(f"Screenshot queued: {filepath}")
 
-    @log_action
+    @log_action(level=logging.DEBUG)
     def save_screenshot_with_color_highlight(self, screenshot, x, y, hex_color, radius=20):
-        """Save screenshot with highlighted color match area
+        """Queue a screenshot with highlighted color match area for writing
         
         Args:
-            screenshot: PIL Image screenshot
+            screenshot: RGB frame (NumPy array or PIL Image)
             x, y: Coordinates of the color match
             hex_color: The hex color that was matched
             radius: Size of the highlight box
         """
-        # Convert PIL image to OpenCV format
-        cv_image = cv2.cvtColor(np.array(screenshot), cv2.COLOR_RGB2BGR)
-        
-        # Draw red rectangle around the color match
-        cv2.rectangle(cv_image, 
-                     (int(x - radius), int(y - radius)), 
-                     (int(x + radius), int(y + radius)), 
-                     (0, 0, 255),  # BGR color (red)
-                     2)  # Thickness
-        
-        # Add color info label above rectangle
-        cv2.putText(cv_image, 
-                   f'Found color: {hex_color}',
-                   (int(x - radius), int(y - radius - 10)),
-                   cv2.FONT_HERSHEY_SIMPLEX,
-                   0.5,
-                   (0, 0, 255),
-                   1)
-        
         # Generate unique filename with timestamp
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f'color_match_{hex_color.replace("#", "")}_{timestamp}.png'
-        filepath = os.path.join(self.assets_dir, filename)
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')[:-3]
+        filename = f'color_match_{hex_color.replace("#", "")}_{timestamp}'
         
-        # Save the image
-        cv2.imwrite(filepath, cv_image)
-        print(f"Screenshot saved: {filepath}")
+        # Drawing and encoding happen on the artifact writer's thread
+        filepath = self.artifacts.submit(screenshot, (x - radius, y - radius, x + radius, y + radius),
+                                         f'Found color: {hex_color}', filename)
+        if filepath:
+            print(f"Screenshot queued: {filepath}")
 
-    @log_action
     def get_region_screenshot(self, region=None):
         """Take a screenshot of the specified region or full screen
         
         Args:
             region: Tuple of (x, y, width, height) or None for full screen
+
+        Returns:
+            RGB frame as a NumPy array of shape (height, width, 3)
+        """
+        with self.tracer.span('capture', region=region):
+            return self.capture.grab(region)
+
+    @log_action
+    def snapshot(self, region=None):
+        """Capture the screen once for several queries
+
+        Args:
+            region: Tuple of (x, y, width, height) or None for full screen
+
+        Returns:
+            Snapshot with find_text, find_template and find_color methods
         """
-        if region is None:
-            return pyautogui.screenshot()
+        pending, self._pending_snapshot = self._pending_snapshot, None
+        if pending is not None and region_key(pending.region) == region_key(region):
+            snapshot = pending
         else:
-            x, y, width, height = region
-            return pyautogui.screenshot(region=(x, y, width, height))
+            snapshot = Snapshot(self, self.get_region_screenshot(region), region)
+        self.last_snapshot = snapshot
+        return snapshot
+
+    def reuse_snapshot(self, snapshot):
+        """Serve an existing snapshot to the next snapshot() call for the same region
+
+        Lets consecutive queries share one capture and its OCR results. Only
+        the next call is served; retries capture again.
+
+        Args:
+            snapshot: Snapshot to reuse, or None to cancel
+        """
+        self._pending_snapshot = snapshot
+
+    def locate(self, kind, query, region, find):
+        """Run a query near its last known location first, then over the whole region
+
+        Args:
+            kind: 'text', 'template' or 'color'
+            query: Text variants, template name or hex color (part of the locality key)
+            region: Tuple of (x, y, width, height) to search within, or None for full screen
+            find: Callable taking a Snapshot and returning a position or None
+
+        A match inside the window is accepted even if a better one exists
+        elsewhere in the region, which is why the locality cache is opt-in.
+
+        Returns:
+            Whatever `find` returned for the window or, on a window miss, for the whole region
+        """
+        locator = self.locator
+        # A snapshot shared by an action plan is already captured; searching it beats a new capture
+        if locator is None or self._pending_snapshot is not None:
+            return find(self.snapshot(region))
+
+        key = locator.key(kind, query, region)
+        window = locator.window(key)
+        if window is not None:
+            with self.tracer.span('locality_window', key=key, window=window):
+                try:
+                    snapshot = self.snapshot(window)
+                    snapshot.query_region = region
+                    position = find(snapshot)
+                except Exception as e:
+                    print(f"Locality window search failed: {str(e)}")
+                    position = None
+            if position and snapshot.last_box:
+                locator.hit(key, snapshot.last_box)
+                return position
+            locator.miss(key)
+
+        snapshot = self.snapshot(region)
+        position = find(snapshot)
+        if position and snapshot.last_box:
+            height, width = snapshot.frame.shape[:2]
+            locator.record(key, snapshot.last_box, region or (0, 0, width, height))
+        return position
+
+    def wait_until(self, condition, timeout=10, region=None, poll_interval=0.05, description='Condition'):
+        """Wait until a condition holds, re-checking only when the screen changes
+
+        Args:
+            condition: Callable taking a Snapshot and returning a truthy result when satisfied
+            timeout: Deadline in seconds
+            region: Tuple of (x, y, width, height) to watch, or None for full screen
+            poll_interval: Seconds between cheap change checks
+            description: Used in the timeout error message
+
+        Returns:
+            The condition's first truthy result
+        """
+        return wait_until(self, condition, timeout, region, poll_interval, description=description)
+
+    def resolve_template_path(self, template_path):
+        """Resolve a template name or path relative to the images folder"""
+        return self.templates.resolve(template_path)
 
     @log_action
-    def find_color_position(self, hex_color, tolerance=5, max_retries=3, retry_delay=1, region=None):
+    def find_color_position(self, hex_color, tolerance=5, max_retries=3, retry_delay=1, region=None,
+                            downsample=1, min_area=1, timeout=None):
         """Find position of a specific color on screen or in region
         
         Args:
@@ -119,41 +270,28 @@ class ScreenAnalyzer:
             max_retries: Maximum retry attempts
             retry_delay: Delay between retries in seconds
             region: Tuple of (x, y, width, height) to search within, or None for full screen
+            downsample: Scan every Nth pixel in each direction (faster on large screens)
+            min_area: Minimum blob area in pixels
+            timeout: If given, wait up to this many seconds for the color, re-checking
+                     whenever the screen changes (max_retries/retry_delay are ignored)
+
+        Returns:
+            Centroid (x, y) of the largest matching color blob
         """        
-        rgb_color = self.hex_to_rgb(hex_color)
-        region_offset_x = int(region[0]) if region else 0
-        region_offset_y = int(region[1]) if region else 0
-        
+        if timeout is not None:
+            return self.wait_until(lambda snap: snap.find_color(hex_color, tolerance, downsample, min_area),
+                                   timeout, region, description=f"Color {hex_color}")
+
         for attempt in range(max_retries):
             try:
+                if attempt:
+                    self.metrics.increment('retries_total', action='find_color_position')
                 print(f"\n🔍 Attempt {attempt + 1}/{max_retries} - Searching for color: {hex_color}")
                 
-                # Take screenshot
-                screenshot = self.get_region_screenshot(region)
-                
-                # Convert to numpy array and get dimensions
-                img_array = np.array(screenshot)
-                height, width = img_array.shape[:2]
-                
-                # Find pixels matching the color within tolerance
-                matches = np.where(
-                    (abs(img_array[..., 0] - rgb_color[0]) <= tolerance) &
-                    (abs(img_array[..., 1] - rgb_color[1]) <= tolerance) &
-                    (abs(img_array[..., 2] - rgb_color[2]) <= tolerance)
-                )
-                
-                if len(matches[0]) > 0:
-                    # Get center of first matching region
-                    y, x = matches[0][0], matches[1][0]
-                    screen_x = int(x + region_offset_x)
-                    screen_y = int(y + region_offset_y)
-                    
-                    print(f"✅ Found color at coordinates: ({screen_x}, {screen_y})")
-                    
-                    # Save screenshot with highlight
-                    self.save_screenshot_with_color_highlight(screenshot, x, y, hex_color)
-                    
-                    return (screen_x, screen_y)
+                position = self.locate('color', hex_color, region,
+                                       lambda snap: snap.find_color(hex_color, tolerance, downsample, min_area))
+                if position:
+                    return position
                 
                 print("❌ Color not found in current screenshot")
                 if attempt < max_retries - 1:
@@ -169,56 +307,58 @@ class ScreenAnalyzer:
         raise ElementNotFoundError(f"Color {hex_color} not found after {max_retries} attempts")
 
     @log_action
-    def find_template_position(self, template_path, confidence=0.8, max_retries=3, retry_delay=1, region=None):
+    def find_color_blobs(self, colors, tolerance=5, region=None, downsample=1, min_area=1):
+        """Find all blobs of one or more colors in a single capture
+
+        Args:
+            colors: Hex color string or list of hex colors
+            tolerance: Color matching tolerance (0-255)
+            region: Tuple of (x, y, width, height) to search within, or None for full screen
+            downsample: Scan every Nth pixel in each direction (faster on large screens)
+            min_area: Minimum blob area in pixels
+
+        Returns:
+            List of ColorBlob (color, centroid x/y, area, bbox) in screen coordinates, largest first
+        """
+        return self.snapshot(region).find_color_blobs(colors, tolerance, downsample, min_area)
+
+    @log_action
+    def find_template_position(self, template_path, confidence=0.8, max_retries=3, retry_delay=1, region=None,
+                               mode='single', scales=None, timeout=None):
         """Find position of a template image on screen or in region
         
         Args:
-            template_path: Path to template image file (relative to images folder or absolute path)
+            template_path: Template name or path to image file (relative to images folder or absolute path)
             confidence: Matching confidence threshold (0-1)
             max_retries: Maximum retry attempts
             retry_delay: Delay between retries in seconds
             region: Tuple of (x, y, width, height) to search within, or None for full screen
+            mode: 'single' for a full-resolution search, or 'pyramid' to match on a
+                  downscaled frame first and refine around the best candidates
+            scales: Optional iterable of template scale factors (e.g. (1.0, 1.25, 1.5))
+                    for DPI-scaled UIs
+            timeout: If given, wait up to this many seconds for the template, re-checking
+                     whenever the screen changes (max_retries/retry_delay are ignored)
         """
-        # Handle template path - check if absolute or relative to images folder
-        if not os.path.isabs(template_path):
-            base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-            template_path = os.path.join(base_dir, 'images', template_path)
-            
-        if not os.path.exists(template_path):
-            raise FileNotFoundError(f"Template image not found at: {template_path}")
-            
-        region_offset_x = int(region[0]) if region else 0
-        region_offset_y = int(region[1]) if region else 0
+        # Load the template once (raises FileNotFoundError if missing)
+        template = self.templates.get(template_path)
+        template_path = template.path
+
+        if timeout is not None:
+            return self.wait_until(lambda snap: snap.find_template(template, confidence, mode, scales),
+                                   timeout, region, description=f"Template {template_path}")
         
         for attempt in range(max_retries):
             try:
+                if attempt:
+                    self.metrics.increment('retries_total', action='find_template_position')
                 print(f"\n🔍 Attempt {attempt + 1}/{max_retries} - Searching for template: {template_path}")
                 
-                # Take screenshot and load template
-                screenshot = self.get_region_screenshot(region)
-                template = cv2.imread(template_path)
-                
-                if template is None:
-                    raise ElementNotFoundError(f"Template image not found: {template_path}")
-                
-                # Convert images to grayscale
-                screenshot_gray = cv2.cvtColor(np.array(screenshot), cv2.COLOR_RGB2GRAY)
-                template_gray = cv2.cvtColor(template, cv2.COLOR_BGR2GRAY)
-                
-                # Perform template matching
-                result = cv2.matchTemplate(screenshot_gray, template_gray, cv2.TM_CCOEFF_NORMED)
-                min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
-                
-                if max_val >= confidence:
-                    # Calculate center position
-                    template_h, template_w = template_gray.shape
-                    center_x = int(max_loc[0] + template_w/2 + region_offset_x)
-                    center_y = int(max_loc[1] + template_h/2 + region_offset_y)
-                    
-                    print(f"✅ Found template at coordinates: ({center_x}, {center_y}) with confidence: {max_val:.2f}")
-                    return (center_x, center_y)
+                position = self.locate('template', template_path, region,
+                                       lambda snap: snap.find_template(template, confidence, mode, scales))
+                if position:
+                    return position
                 
-                print(f"❌ Template not found (best match: {max_val:.2f} < {confidence})")
                 if attempt < max_retries - 1:
                     print(f"Retrying in {retry_delay} seconds...")
                     time.sleep(retry_delay)
@@ -232,43 +372,149 @@ class ScreenAnalyzer:
         raise ElementNotFoundError(f"Template {template_path} not found after {max_retries} attempts")
 
     @log_action
-    def find_text_position(self, text, min_confidence=0.4, exact_match=False, max_retries=3, retry_delay=1, region=None):
-        """Find text position using OCR"""
-        region_offset_x = int(region[0]) if region else 0
-        region_offset_y = int(region[1]) if region else 0
-        
+    def find_templates(self, templates, confidence=0.8, region=None, mode='single', scales=None,
+                       stop_on_first=False):
+        """Match several templates against a single capture concurrently
+
+        Args:
+            templates: Iterable of template names/paths
+            confidence: Matching confidence threshold (0-1) used to decide hits
+            region: Tuple of (x, y, width, height) to search within, or None for full screen
+            mode: 'single' or 'pyramid' (see find_template_position)
+            scales: Optional iterable of template scale factors for DPI-scaled UIs
+            stop_on_first: If True, stop as soon as any template is found
+
+        Returns:
+            Dict of template name -> TemplateMatch (best score and center in screen
+            coordinates), or None for templates that were not matched
+        """
+        return self.snapshot(region).find_templates(templates, confidence, mode, scales, stop_on_first)
+
+    @log_action
+    def find_any_template(self, templates, confidence=0.8, max_retries=3, retry_delay=1, region=None,
+                          mode='single', scales=None, timeout=None):
+        """Find whichever of several templates is on screen
+
+        Args:
+            templates: Iterable of template names/paths (e.g. error dialog, success toast)
+            confidence: Matching confidence threshold (0-1)
+            max_retries: Maximum retry attempts
+            retry_delay: Delay between retries in seconds
+            region: Tuple of (x, y, width, height) to search within, or None for full screen
+            mode: 'single' or 'pyramid' (see find_template_position)
+            scales: Optional iterable of template scale factors for DPI-scaled UIs
+            timeout: If given, wait up to this many seconds instead of retrying
+
+        Returns:
+            Tuple of (template name, (x, y)) for the best-scoring template found
+        """
+        templates = list(templates)
+        # Load all templates up front (raises FileNotFoundError if one is missing)
+        for template in templates:
+            self.templates.get(template)
+
+        def best_hit(snap):
+            # Every template is matched so the best score wins, not the first to finish
+            results = snap.find_templates(templates, confidence, mode, scales)
+            hits = [(match.score, name, match) for name, match in results.items()
+                    if match is not None and match.score >= confidence]
+            if not hits:
+                return None
+            score, name, match = max(hits, key=lambda hit: hit[0])
+            print(f"✅ Found template '{name}' at ({match.x}, {match.y}) with confidence: {score:.2f}")
+            return name, (match.x, match.y)
+
+        if timeout is not None:
+            return self.wait_until(best_hit, timeout, region, description=f"Any of {templates}")
+
+        for attempt in range(max_retries):
+            try:
+                if attempt:
+                    self.metrics.increment('retries_total', action='find_any_template')
+                print(f"\n🔍 Attempt {attempt + 1}/{max_retries} - Searching for any of: {templates}")
+
+                hit = best_hit(self.snapshot(region))
+                if hit:
+                    return hit
+
+                print("❌ None of the templates found in current screenshot")
+                if attempt < max_retries - 1:
+                    print(f"Retrying in {retry_delay} seconds...")
+                    time.sleep(retry_delay)
+
+            except Exception as e:
+                print(f"Error on attempt {attempt + 1}: {str(e)}")
+                if attempt < max_retries - 1:
+                    print(f"Retrying in {retry_delay} seconds...")
+                    time.sleep(retry_delay)
+
+        raise ElementNotFoundError(f"None of the templates {templates} found after {max_retries} attempts")
+
+    @log_action
+    def find_all_text(self, text, min_confidence=0.4, exact_match=False, min_score=1.0, region=None):
+        """Find every on-screen occurrence of a text, ranked by similarity
+
+        Args:
+            text: Text to search for, or a list of text variations
+            min_confidence: Minimum OCR confidence for a detection to count
+            exact_match: If True, compare whole detections instead of substrings
+            min_score: Minimum similarity (0-1); the default 1.0 disables fuzzy matching
+            region: Tuple of (x, y, width, height) to search within, or None for full screen
+
+        Returns:
+            List of TextMatch (text, variant, score, confidence, bbox, center x/y in
+            screen coordinates), best first
+        """
+        return self.snapshot(region).find_all_text(text, min_confidence, exact_match, min_score)
+
+    @log_action
+    def find_text_position(self, text, min_confidence=0.4, exact_match=False, max_retries=3, retry_delay=1, region=None,
+                           timeout=None, min_score=1.0, ocr_mode=None, preprocess=None):
+        """Find text position using OCR
+
+        Args:
+            text: Text to search for, or a list of text variations
+            min_confidence: Minimum OCR confidence for a detection to count
+            exact_match: If True, requires exact text match
+            max_retries: Maximum retry attempts
+            retry_delay: Delay between retries in seconds
+            region: Tuple of (x, y, width, height) to search within, or None for full screen
+            timeout: If given, wait up to this many seconds for the text, re-running OCR
+                     only when the screen changes (max_retries/retry_delay are ignored)
+            min_score: Minimum similarity (0-1) between the text and a detection. The default
+                       1.0 disables fuzzy matching; lower it (e.g. 0.8) so OCR noise like
+                       'Searh' still matches 'Search'
+            ocr_mode: 'full' to read all text, or 'targeted' to run detection once and
+                      recognize only boxes sized like the search text, stopping at the
+                      first match (defaults to the analyzer's ocr_mode)
+            preprocess: OCRSettings(scale, grayscale, binarize, contrast) applied before OCR,
+                        or 'auto' to learn and reuse the cheapest settings that still find
+                        this text in this region (defaults to the analyzer's ocr_preprocess; full OCR only).
+                        With 'auto', enhanced settings for hard-to-read text are only tried on the
+                        final attempt
+        """
         # Handle both single string and list of strings
         text_variations = [text] if isinstance(text, str) else text
+        # Fail fast on invalid OCR options instead of retrying them
+        ocr_mode, preprocess = resolve_ocr_options(self, ocr_mode, preprocess)
+
+        if timeout is not None:
+            return self.wait_until(lambda snap: snap.find_text(text_variations, min_confidence, exact_match, min_score,
+                                                                 ocr_mode, preprocess),
+                                   timeout, region, description=f"Text {text}")
         
         for attempt in range(max_retries):
             try:
+                if attempt:
+                    self.metrics.increment('retries_total', action='find_text_position')
                 print(f"\n🔍 Attempt {attempt + 1}/{max_retries} - Searching for: {text_variations}")
                 
-                # Take screenshot
-                screenshot = self.get_region_screenshot(region)
-                
-                # Perform OCR
-                results = self.reader.readtext(np.array(screenshot))
-                print(f"\n📝 Detected text: {' '.join(result[1] for result in results)}")
-                
-                # Search for each text variation
-                for text_variant in text_variations:
-                    for bbox, detected_text, confidence in results:
-                        if confidence >= min_confidence:
-                            detected_normalized = self.normalize_text(detected_text)
-                            search_normalized = self.normalize_text(text_variant)
-                            
-                            if (exact_match and detected_normalized == search_normalized) or \
-                               (not exact_match and search_normalized in detected_normalized):
-                                print(f"✅ Found: '{text_variant}' (confidence: {confidence:.2f})")
-                                
-                                # Calculate center position
-                                center_x = int((bbox[0][0] + bbox[2][0])/2 + region_offset_x)
-                                center_y = int((bbox[0][1] + bbox[2][1])/2 + region_offset_y)
-                                
-                                # Save debug image
-                                self.save_screenshot_with_highlight(screenshot, bbox, text_variant)
-                                return (center_x, center_y)
+                last_attempt = attempt == max_retries - 1
+                position = self.locate('text', text_variations, region,
+                                       lambda snap: snap.find_text(text_variations, min_confidence, exact_match,
+                                                                   min_score, ocr_mode, preprocess, last_attempt))
+                if position:
+                    return position
                 
                 print("❌ Text not found in current screenshot")
                 if attempt < max_retries - 1:
@@ -283,36 +529,27 @@ class ScreenAnalyzer:
         
         raise ElementNotFoundError(f"Text {text} not found after {max_retries} attempts")
 
-    @log_action
+    @log_action(level=TRACE)
     def hex_to_rgb(self, hex_color):
         """Convert hex color to RGB"""
-        hex_color = hex_color.lstrip('#')
-        return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
+        return hex_to_rgb(hex_color)
 
 
     @log_action
     def click_position(self, x, y):
-        """Click at specific coordinates using Win32 API"""
+        """Click at specific coordinates through the input backend"""
         # Convert numpy floats to integers
         x = int(round(float(x)))
         y = int(round(float(y)))
-        
-        # Move cursor
-        win32api.SetCursorPos((x, y))
-        time.sleep(0.1)  # Small delay to ensure movement is complete
-        
-        # Perform click
-        win32api.mouse_event(win32con.MOUSEEVENTF_LEFTDOWN, x, y, 0, 0)
-        time.sleep(0.1)
-        win32api.mouse_event(win32con.MOUSEEVENTF_LEFTUP, x, y, 0, 0)
+        self.parent.input.click_at(x, y)
 
     @log_action
     def move_to_position(self, x, y):
         """Move mouse to specific coordinates"""
         x = int(round(float(x)))
         y = int(round(float(y)))
-        win32api.SetCursorPos((x, y))
-        time.sleep(0.5)  # Small delay to ensure movement is complete
+        self.parent.input.batch().move(x, y).submit()
+        self.timing.pause('hover')  # Let hover effects start
         return self.parent
 
     @log_action
@@ -325,7 +562,8 @@ class ScreenAnalyzer:
         return self.parent
 
     @log_action
-    def find_text_position_and_click(self, text, min_confidence=0.4, exact_match=False, max_retries=3, retry_delay=1, region=None):
+    def find_text_position_and_click(self, text, min_confidence=0.4, exact_match=False, max_retries=3, retry_delay=1, region=None,
+                                     timeout=None, min_score=1.0, ocr_mode=None, preprocess=None):
         """Find text using OCR and click on it
         
         Args:
@@ -335,20 +573,27 @@ class ScreenAnalyzer:
             max_retries: Maximum retry attempts
             retry_delay: Delay between retries in seconds
             region: Tuple of (x, y, width, height) to search within
+            timeout: If given, wait up to this many seconds instead of retrying
+            min_score: Minimum similarity (0-1) tolerated for OCR noise (1.0, the default, disables it)
+            ocr_mode: 'full' or 'targeted' (see find_text_position)
+            preprocess: OCR preprocessing settings or 'auto' (see find_text_position)
         """
-        position = self.find_text_position(text, min_confidence, exact_match, max_retries, retry_delay, region)
+        position = self.find_text_position(text, min_confidence, exact_match, max_retries, retry_delay, region,
+                                           timeout=timeout, min_score=min_score, ocr_mode=ocr_mode,
+                                           preprocess=preprocess)
         if position:
             x, y = position
             try:
                 self.click_position(x, y)
-                time.sleep(0.5)  # Wait for click to register
+                self.timing.settle('after_click', (x, y))  # Wait for click to register
             except Exception as e:
                 print(f"Error clicking at position ({x}, {y}): {str(e)}")
                 raise
         return self.parent
 
     @log_action
-    def find_color_position_and_click(self, hex_color, tolerance=5, max_retries=3, retry_delay=1, region=None):
+    def find_color_position_and_click(self, hex_color, tolerance=5, max_retries=3, retry_delay=1, region=None,
+                                      timeout=None):
         """Find and click on a specific color on screen or in region
         
         Args:
@@ -357,13 +602,15 @@ class ScreenAnalyzer:
             max_retries: Maximum retry attempts
             retry_delay: Delay between retries in seconds
             region: Tuple of (x, y, width, height) to search within, or None for full screen
+            timeout: If given, wait up to this many seconds instead of retrying
         """
-        position = self.find_color_position(hex_color, tolerance, max_retries, retry_delay, region)
+        position = self.find_color_position(hex_color, tolerance, max_retries, retry_delay, region,
+                                            timeout=timeout)
         if position:
             x, y = position
             try:
                 self.click_position(x, y)
-                time.sleep(0.5)  # Wait for click to register
+                self.timing.settle('after_click', (x, y))  # Wait for click to register
             except Exception as e:
                 print(f"Error clicking at position ({x}, {y}): {str(e)}")
                 raise
@@ -380,25 +627,26 @@ class ScreenAnalyzer:
             end_y: Ending Y coordinate
             duration: Duration of drag operation in seconds
         """
-        pyautogui.moveTo(start_x, start_y)
-        pyautogui.mouseDown()
-        pyautogui.moveTo(end_x, end_y, duration=duration)
-        pyautogui.mouseUp()
-        time.sleep(2)  # Built-in wait
+        batch = self.parent.input.batch().move(start_x, start_y).mouse_down()
+        # Intermediate moves so the application sees a drag, not a jump
+        steps = max(1, int(duration * 60))
+        for i in range(1, steps + 1):
+            batch.move(start_x + (end_x - start_x) * i / steps, start_y + (end_y - start_y) * i / steps)
+            batch.wait(duration / steps)
+        batch.mouse_up().submit()
+        self.timing.settle('after_gesture', (end_x, end_y))
         return self.parent
 
     @log_action
     def double_click_position(self, x, y):
         """Move to position and double click"""
-        pyautogui.moveTo(x, y)
-        pyautogui.doubleClick()
-        time.sleep(2)  # Built-in wait
+        self.parent.input.click_at(x, y, clicks=2)
+        self.timing.settle('after_gesture', (x, y))
         return self.parent
 
     @log_action
     def right_click_position(self, x, y):
         """Move to position and right click"""
-        pyautogui.moveTo(x, y)
-        pyautogui.rightClick()
-        time.sleep(2)  # Built-in wait
+        self.parent.input.click_at(x, y, button='right')
+        self.timing.settle('after_gesture', (x, y))
         return self.parent
\ No newline at end of file
@@ -0,0 +1,434 @@
+import os
+import json
+import mmap
+import zlib
+import queue
+import struct
+import atexit
+import datetime
+import platform
+import threading
+import time
+from collections import OrderedDict
+from .lazy_import import lazy_import
+from .capture import CaptureBackend
+from .input_backends import InputBackend
+
+np = lazy_import('numpy')
+
+# Session file layout: SESSION_MAGIC, then records of
+# [meta length u32][payload length u32][meta JSON][payload].
+# Records are self-describing, so a session cut short by a crash is still readable.
+SESSION_MAGIC = b'TESTRSN1'
+SESSION_VERSION = 1
+RECORD_HEADER = struct.Struct('<II')
+
+# Frame encodings: 'key' (the whole frame), 'delta' (XOR against the previous
+# frame of the same region, cropped to the changed box) or 'same' (no change)
+FRAME_ENCODINGS = ('key', 'delta', 'same')
+
+
+def _region(region):
+    return [int(v) for v in region] if region else None
+
+
+def is_session_file(path):
+    """Whether `path` is a recorded session"""
+    try:
+        with open(path, 'rb') as f:
+            return f.read(len(SESSION_MAGIC)) == SESSION_MAGIC
+    except OSError:
+        return False
+
+
+class SessionWriter:
+    """Writes captured frames and input events to a session file
+
+    Frames are delta-encoded against the previous frame captured for the same
+    region, with a keyframe every `keyframe_interval` frames of that region so
+    decoding any frame touches a bounded number of records. Encoding and
+    writing happen on a background thread; the queue is bounded and blocks
+    rather than dropping frames, since a replay needs every one of them.
+
+    Args:
+        path: Session file to create
+        keyframe_interval: Deltas between two keyframes of the same region
+        compression: zlib level for frame payloads (1 is fastest)
+        queue_size: Maximum records waiting to be written
+    """
+
+    def __init__(self, path, keyframe_interval=30, compression=1, queue_size=32):
+        self.path = path
+        self.keyframe_interval = keyframe_interval
+        self.compression = compression
+        self.frames = 0
+        self.inputs = 0
+        self.keyframes = 0
+        self.deltas = 0
+        self.unchanged = 0
+        self.raw_bytes = 0
+        self.stored_bytes = 0
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._file = open(path, 'wb')
+        self._file.write(SESSION_MAGIC)
+        # Per region: (last frame, its index, deltas since the last keyframe)
+        self._previous = {}
+        self._start = time.monotonic()
+        self._queue = queue.Queue(maxsize=queue_size)
+        self.closed = False
+        self._write_record({
+            'type': 'session',
+            'version': SESSION_VERSION,
+            'created': datetime.datetime.now().isoformat(),
+            'platform': platform.platform(),
+            'keyframe_interval': keyframe_interval,
+        })
+        self._worker = threading.Thread(target=self._run, name='testr-session-writer', daemon=True)
+        self._worker.start()
+
+    def _now(self):
+        return round(time.monotonic() - self._start, 6)
+
+    def add_frame(self, frame, region=None):
+        """Queue a captured RGB frame (not modified; it must not be changed by the caller afterwards)"""
+        if self.closed:
+            return
+        self._queue.put(('frame', self._now(), frame, _region(region)))
+
+    def add_input(self, event):
+        """Queue an input event (InputEvent or dict)"""
+        if self.closed:
+            return
+        entry = event if isinstance(event, dict) else \
+            {key: value for key, value in event._asdict().items() if value is not None}
+        self._queue.put(('input', self._now(), entry, None))
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                kind, timestamp, data, region = item
+                if kind == 'frame':
+                    self._write_frame(timestamp, data, region)
+                else:
+                    self._write_record({'type': 'input', 'time': timestamp, **data})
+                    self.inputs += 1
+            except Exception as e:
+                print(f"Could not write session record: {str(e)}")
+            finally:
+                self._queue.task_done()
+
+    def _write_frame(self, timestamp, frame, region):
+        frame = np.ascontiguousarray(frame, dtype=np.uint8)
+        key = tuple(region) if region else None
+        meta = {'type': 'frame', 'index': self.frames, 'time': timestamp, 'region': region,
+                'shape': list(frame.shape)}
+        previous = self._previous.get(key)
+        payload = b''
+
+        if previous is not None and previous[0].shape == frame.shape and previous[2] < self.keyframe_interval:
+            base, base_index, deltas = previous
+            changed = (frame != base).any(axis=2)
+            rows = np.flatnonzero(changed.any(axis=1))
+            meta['base'] = base_index
+            if not rows.size:
+                meta['encoding'] = 'same'
+                self.unchanged += 1
+            else:
+                cols = np.flatnonzero(changed.any(axis=0))
+                y0, y1, x0, x1 = int(rows[0]), int(rows[-1]) + 1, int(cols[0]), int(cols[-1]) + 1
+                meta['encoding'] = 'delta'
+                meta['box'] = [x0, y0, x1, y1]
+                payload = zlib.compress(np.bitwise_xor(frame[y0:y1, x0:x1], base[y0:y1, x0:x1]).tobytes(),
+                                        self.compression)
+                self.deltas += 1
+            self._previous[key] = (frame, self.frames, deltas + 1)
+        else:
+            meta['encoding'] = 'key'
+            payload = zlib.compress(frame.tobytes(), self.compression)
+            self.keyframes += 1
+            self._previous[key] = (frame, self.frames, 0)
+
+        self._write_record(meta, payload)
+        self.frames += 1
+        self.raw_bytes += frame.nbytes
+
+    def _write_record(self, meta, payload=b''):
+        encoded = json.dumps(meta).encode('utf-8')
+        self._file.write(RECORD_HEADER.pack(len(encoded), len(payload)))
+        self._file.write(encoded)
+        self._file.write(payload)
+        self.stored_bytes += RECORD_HEADER.size + len(encoded) + len(payload)
+
+    def flush(self):
+        """Block until every queued record is written"""
+        self._queue.join()
+        self._file.flush()
+
+    def close(self):
+        """Write the remaining records and close the file"""
+        if self.closed:
+            return
+        self.closed = True
+        self._queue.put(None)
+        self._worker.join()
+        self._file.close()
+
+    @property
+    def stats(self):
+        """Recorded frames by encoding, input events, and raw vs stored bytes"""
+        return {
+            'frames': self.frames,
+            'keyframes': self.keyframes,
+            'deltas': self.deltas,
+            'unchanged': self.unchanged,
+            'inputs': self.inputs,
+            'raw_bytes': self.raw_bytes,
+            'stored_bytes': self.stored_bytes,
+            'compression_ratio': self.raw_bytes / self.stored_bytes if self.stored_bytes else 0.0,
+        }
+
+
+class SessionReader:
+    """Random access to a recorded session through a memory map
+
+    Only record headers are read when opening; frame payloads are
+    decompressed on demand and the most recently decoded frames are kept so
+    sequential reads decode each delta once.
+
+    Args:
+        path: Session file written by SessionWriter
+        cache_size: Decoded frames kept in memory
+    """
+
+    def __init__(self, path, cache_size=8):
+        self.path = path
+        self.cache_size = cache_size
+        self.info = {}
+        self.frames = []
+        self.inputs = []
+        self._offsets = []
+        self._decoded = OrderedDict()
+        self._lock = threading.Lock()
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(SESSION_MAGIC)] != SESSION_MAGIC:
+            self.close()
+            raise ValueError(f"Not a testr session file: {path}")
+        self._index()
+
+    def _index(self):
+        position = len(SESSION_MAGIC)
+        size = len(self._map)
+        while position + RECORD_HEADER.size <= size:
+            meta_length, payload_length = RECORD_HEADER.unpack_from(self._map, position)
+            start = position + RECORD_HEADER.size
+            end = start + meta_length + payload_length
+            if end > size:
+                print(f"Session {self.path} ends with a truncated record; ignoring it")
+                break
+            meta = json.loads(self._map[start:start + meta_length].decode('utf-8'))
+            if meta['type'] == 'frame':
+                self.frames.append(meta)
+                self._offsets.append((start + meta_length, payload_length))
+            elif meta['type'] == 'input':
+                self.inputs.append(meta)
+            elif meta['type'] == 'session':
+                self.info = meta
+            position = end
+
+    def __len__(self):
+        return len(self.frames)
+
+    def frame(self, index):
+        """Decoded RGB frame `index` (read-only; copy before modifying)"""
+        with self._lock:
+            return self._decode(index)
+
+    def _decode(self, index):
+        frame = self._decoded.get(index)
+        if frame is not None:
+            self._decoded.move_to_end(index)
+            return frame
+
+        meta = self.frames[index]
+        encoding = meta['encoding']
+        if encoding == 'key':
+            offset, length = self._offsets[index]
+            frame = np.frombuffer(zlib.decompress(self._map[offset:offset + length]), dtype=np.uint8)
+            frame = frame.reshape(meta['shape'])
+        elif encoding == 'same':
+            frame = self._decode(meta['base'])
+        else:
+            x0, y0, x1, y1 = meta['box']
+            offset, length = self._offsets[index]
+            delta = np.frombuffer(zlib.decompress(self._map[offset:offset + length]), dtype=np.uint8)
+            frame = self._decode(meta['base']).copy()
+            frame[y0:y1, x0:x1] ^= delta.reshape(y1 - y0, x1 - x0, -1)
+        frame.flags.writeable = False
+
+        self._decoded[index] = frame
+        while len(self._decoded) > self.cache_size:
+            self._decoded.popitem(last=False)
+        return frame
+
+    def iter_frames(self):
+        """Yield (meta, frame) for every recorded frame in capture order"""
+        for index, meta in enumerate(self.frames):
+            yield meta, self.frame(index)
+
+    def timeline(self):
+        """Frame and input records merged in recording order"""
+        return sorted(self.frames + self.inputs, key=lambda record: record['time'])
+
+    def close(self):
+        self._decoded.clear()
+        self._map.close()
+        self._file.close()
+
+
+class SessionCapture(CaptureBackend):
+    """Capture backend wrapper writing every grabbed frame to a session"""
+    name = 'record'
+
+    def __init__(self, backend, writer):
+        self.backend = backend
+        self.writer = writer
+
+    def grab(self, region=None):
+        frame = self.backend.grab(region)
+        self.writer.add_frame(frame, region)
+        return frame
+
+    def screen_size(self):
+        return self.backend.screen_size()
+
+    def close(self):
+        self.backend.close()
+
+
+class SessionInputBackend(InputBackend):
+    """Input backend wrapper writing every event to a session before sending it"""
+    name = 'record'
+
+    def __init__(self, backend, writer):
+        self.backend = backend
+        self.writer = writer
+
+    def send_events(self, events):
+        for event in events:
+            self.writer.add_input(event)
+        self.backend.send_events(events)
+
+    def sleep(self, seconds):
+        self.writer.add_input({'kind': 'wait', 'seconds': seconds})
+        self.backend.sleep(seconds)
+
+    def paste(self, text):
+        self.writer.add_input({'kind': 'paste', 'text': text})
+        self.backend.paste(text)
+
+    def position(self):
+        return self.backend.position()
+
+    def close(self):
+        self.backend.close()
+
+
+class ReplayCapture(CaptureBackend):
+    """Capture backend serving the frames of a recorded session, at full speed
+
+    Each grab returns the next recorded frame captured for the same region;
+    a recorded full-screen frame also serves any region by cropping. Frames
+    that do not fit the request are skipped, so a rerun that captures less
+    often than the recording still moves forward in time. After the last
+    frame, the latest fitting frame keeps being returned.
+
+    Example:
+        automator = Testr(capture_backend='runs/failed.session', input_backend='recording', timing='fast')
+
+    Args:
+        source: Session file path or SessionReader
+    """
+    name = 'replay'
+
+    def __init__(self, source):
+        self.reader = source if isinstance(source, SessionReader) else SessionReader(source)
+        if not len(self.reader):
+            raise ValueError(f"Session has no frames: {self.reader.path}")
+        self.position = 0
+        self.served = 0
+        self.skipped = 0
+        self._lock = threading.Lock()
+
+    def screen_size(self):
+        full = [meta['shape'] for meta in self.reader.frames if meta['region'] is None]
+        if full:
+            return (full[0][1], full[0][0])
+        # Only region grabs were recorded: the screen is at least as large as their union
+        return (max(meta['region'][0] + meta['shape'][1] for meta in self.reader.frames),
+                max(meta['region'][1] + meta['shape'][0] for meta in self.reader.frames))
+
+    @staticmethod
+    def _fits(meta, region):
+        return meta['region'] == region or meta['region'] is None
+
+    def grab(self, region=None):
+        region = _region(region)
+        frames = self.reader.frames
+        with self._lock:
+            index = next((i for i in range(self.position, len(frames)) if self._fits(frames[i], region)), None)
+            if index is not None:
+                self.skipped += index - self.position
+                self.position = index + 1
+            else:
+                index = next((i for i in range(min(self.position, len(frames)) - 1, -1, -1)
+                              if self._fits(frames[i], region)), None)
+                if index is None:
+                    raise ValueError(f"No recorded frame covers region {region}")
+            self.served += 1
+            frame = self.reader.frame(index)
+
+        if region is not None and frames[index]['region'] is None:
+            x, y, width, height = region
+            frame = frame[y:y + height, x:x + width]
+        return frame
+
+    def close(self):
+        self.reader.close()
+
+
+class SessionRecorder:
+    """Records a Testr run: every captured frame and every input event
+
+    Example:
+        automator = Testr(record_session='runs/nightly.session')
+
+    Args:
+        path: Session file to write
+        **options: Passed to SessionWriter (keyframe_interval, compression, queue_size)
+    """
+
+    def __init__(self, path, **options):
+        self.path = path
+        self.writer = SessionWriter(path, **options)
+        atexit.register(self.close)
+
+    def attach(self, testr):
+        """Route the framework's capture and input through the recorder"""
+        testr.screen.capture = SessionCapture(testr.screen.capture, self.writer)
+        testr.input.backend = SessionInputBackend(testr.input.backend, self.writer)
+        print(f"📼 Recording session to {self.path}")
+        return self
+
+    def close(self):
+        if self.writer.closed:
+            return
+        self.writer.close()
+        stats = self.writer.stats
+        print(f"📼 Session saved to {self.path}: {stats['frames']} frames, {stats['inputs']} input events, "
+              f"{stats['stored_bytes'] / 1e6:.1f} MB ({stats['compression_ratio']:.0f}x smaller than raw)")
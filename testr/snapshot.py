@@ -0,0 +1,355 @@
+from concurrent.futures import FIRST_COMPLETED, wait
+from .lazy_import import lazy_import
+from .logger import log_action
+from .templates import Template
+from .matching import match_template
+from .color import find_color_blobs
+from .text_matching import rank_text_matches
+from .ocr_pipeline import OCR_MODES, detect_text_boxes, find_text_targeted
+from .ocr_tuning import DEFAULT_OCR_SETTINGS, as_settings, preprocess_frame, unscale_results
+
+cv2 = lazy_import('cv2')
+
+
+def region_key(region):
+    """Hashable form of a capture region (None for full screen)"""
+    return tuple(int(v) for v in region) if region else None
+
+
+def resolve_ocr_options(analyzer, ocr_mode=None, preprocess=None):
+    """Apply the analyzer's OCR defaults and reject combinations that cannot work
+
+    Returns:
+        Tuple of (ocr_mode, preprocess)
+
+    Raises:
+        ValueError: For an unknown mode, or preprocessing with targeted OCR (which
+                    recognizes crops of the raw frame and would ignore it)
+    """
+    ocr_mode = ocr_mode or analyzer.ocr_mode
+    if ocr_mode not in OCR_MODES:
+        raise ValueError(f"Unknown OCR mode: {ocr_mode} (expected one of {OCR_MODES})")
+    if preprocess is None:
+        preprocess = analyzer.ocr_preprocess
+    if ocr_mode == 'targeted' and preprocess is not None and \
+            (preprocess == 'auto' or as_settings(preprocess) != DEFAULT_OCR_SETTINGS):
+        raise ValueError("OCR preprocessing is not supported with ocr_mode='targeted'; "
+                         "use ocr_mode='full' or drop preprocess")
+    return ocr_mode, preprocess
+
+
+class Snapshot:
+    """A single captured frame that can serve many text/template/color queries
+
+    Derived data (grayscale frame, OCR results) is computed on first use and
+    memoized, so checking several elements costs one capture and at most one
+    OCR pass.
+    """
+
+    def __init__(self, analyzer, frame, region=None):
+        self.analyzer = analyzer
+        self.parent = analyzer.parent
+        self.frame = frame
+        self.region = region
+        self.offset_x = int(region[0]) if region else 0
+        self.offset_y = int(region[1]) if region else 0
+        # Region the query was made for; differs from `region` for locality windows
+        self.query_region = region
+        # (x, y, width, height) in screen coordinates of the last successful find_*
+        self.last_box = None
+        self._gray = None
+        self._gray_scaled = {}
+        self._ocr_results = {}
+        self._text_boxes = None
+        self._recognized = {}
+
+    @property
+    def rgb(self):
+        """RGB frame as a NumPy array"""
+        return self.frame
+
+    @property
+    def gray(self):
+        """Grayscale frame (computed once)"""
+        if self._gray is None:
+            self._gray = cv2.cvtColor(self.frame, cv2.COLOR_RGB2GRAY)
+        return self._gray
+
+    def gray_scaled(self, scale):
+        """Grayscale frame resized by `scale` (computed once per scale)"""
+        scaled = self._gray_scaled.get(scale)
+        if scaled is None:
+            height, width = self.gray.shape[:2]
+            size = (max(1, int(round(width * scale))), max(1, int(round(height * scale))))
+            scaled = cv2.resize(self.gray, size, interpolation=cv2.INTER_AREA)
+            self._gray_scaled[scale] = scaled
+        return scaled
+
+    @property
+    def ocr_results(self):
+        """EasyOCR results for the raw frame (computed once)"""
+        return self.read_text()
+
+    def read_text(self, preprocess=None):
+        """EasyOCR results in frame coordinates, computed once per preprocessing setting
+
+        Args:
+            preprocess: OCRSettings (or dict of its fields) applied before OCR, or None for the raw frame
+        """
+        settings = as_settings(preprocess)
+        results = self._ocr_results.get(settings)
+        if results is None:
+            with self.analyzer.tracer.span('ocr', shape=self.frame.shape, settings=tuple(settings)):
+                image = self.frame if settings == DEFAULT_OCR_SETTINGS else preprocess_frame(self.frame, settings)
+                # Small regions are cheaper to read in-process than to ship to the pool
+                pool = self.analyzer.ocr_pool
+                if pool is not None and not pool.accepts(image):
+                    pool = None
+                if self.analyzer.ocr_cache is not None:
+                    results = self.analyzer.ocr_cache.readtext(None if pool else self.analyzer.reader, image,
+                                                               key=(region_key(self.region), settings), pool=pool)
+                elif pool is not None:
+                    results = pool.readtext(image)
+                else:
+                    results = self.analyzer.reader.readtext(image)
+                results = unscale_results(results, settings.scale)
+            self._ocr_results[settings] = results
+            print(f"\n📝 Detected text: {' '.join(result[1] for result in results)}")
+        return results
+
+    @property
+    def text_boxes(self):
+        """EasyOCR detection boxes without recognition (computed once)"""
+        if self._text_boxes is None:
+            with self.analyzer.tracer.span('ocr_detect', shape=self.frame.shape):
+                self._text_boxes = detect_text_boxes(self.analyzer.reader, self.frame)
+        return self._text_boxes
+
+    def to_screen(self, x, y):
+        """Convert frame coordinates to screen coordinates"""
+        return (int(x + self.offset_x), int(y + self.offset_y))
+
+    def find_all_text(self, text, min_confidence=0.4, exact_match=False, min_score=1.0, preprocess=None):
+        """Rank every OCR detection in this snapshot against the search text
+
+        Args:
+            text: Text to search for, or a list of text variations
+            min_confidence: Minimum OCR confidence for a detection to count
+            exact_match: If True, compare whole detections instead of substrings
+            min_score: Minimum similarity (0-1); the default 1.0 disables fuzzy matching
+            preprocess: OCRSettings applied before OCR, or None for the raw frame
+
+        Returns:
+            List of TextMatch (text, variant, score, confidence, bbox, center in
+            screen coordinates), best first
+        """
+        results = self.read_text(preprocess)
+        with self.analyzer.tracer.span('text_match', detections=len(results)):
+            matches = rank_text_matches(results, text, min_confidence, exact_match, min_score)
+        return [match._replace(x=match.x + self.offset_x, y=match.y + self.offset_y) for match in matches]
+
+    def find_text_targeted(self, text, min_confidence=0.4, exact_match=False, min_score=1.0):
+        """Detect-then-recognize search: only boxes whose size fits the text are read
+
+        Detection runs once per snapshot and recognized boxes are cached, so
+        further queries on the same snapshot only recognize boxes not read yet.
+
+        Returns:
+            Ranked TextMatch list (screen coordinates) for the first box that matched, or []
+        """
+        with self.analyzer.tracer.span('ocr_targeted', text=text):
+            matches = find_text_targeted(self.analyzer.reader, self.frame, self.gray, text,
+                                         min_confidence, exact_match, min_score,
+                                         detected=self.text_boxes, recognized=self._recognized)
+        return [match._replace(x=match.x + self.offset_x, y=match.y + self.offset_y) for match in matches]
+
+    @log_action
+    def find_text(self, text, min_confidence=0.4, exact_match=False, min_score=1.0, ocr_mode=None,
+                  preprocess=None, enhance=False):
+        """Find text in this snapshot using OCR
+
+        Args:
+            text: Text to search for, or a list of text variations
+            min_confidence: Minimum OCR confidence for a detection to count
+            exact_match: If True, requires exact text match
+            min_score: Minimum similarity (0-1) tolerated for OCR noise; the default 1.0 disables
+                       fuzzy matching
+            ocr_mode: 'full' reads every detected box; 'targeted' recognizes only boxes
+                      sized like the text, best first, stopping at the first match.
+                      Defaults to the analyzer's ocr_mode
+            preprocess: OCRSettings applied before full OCR, 'auto' to use (and learn) the
+                        cheapest settings for this text and region, or None for the
+                        analyzer's ocr_preprocess. Not supported with ocr_mode='targeted'
+            enhance: With preprocess='auto', also try the (expensive) enhanced settings
+                     if the raw frame misses
+
+        Returns:
+            Screen coordinates (x, y) of the best match center, or None
+        """
+        ocr_mode, preprocess = resolve_ocr_options(self.analyzer, ocr_mode, preprocess)
+
+        if preprocess == 'auto':
+            tuner = self.analyzer.ocr_tuner
+            matches = tuner.run(tuner.key(text, self.query_region),
+                                lambda settings: self.find_all_text(text, min_confidence, exact_match,
+                                                                    min_score, settings),
+                                enhance) or []
+        elif ocr_mode == 'targeted' and not self._ocr_results:
+            matches = self.find_text_targeted(text, min_confidence, exact_match, min_score)
+        else:
+            matches = self.find_all_text(text, min_confidence, exact_match, min_score, preprocess)
+        if not matches:
+            return None
+
+        best = matches[0]
+        xs = [point[0] for point in best.bbox]
+        ys = [point[1] for point in best.bbox]
+        self.last_box = (int(min(xs)) + self.offset_x, int(min(ys)) + self.offset_y,
+                         int(max(xs) - min(xs)), int(max(ys) - min(ys)))
+        print(f"✅ Found: '{best.variant}' as '{best.text}' (score: {best.score:.2f}, confidence: {best.confidence:.2f})")
+
+        # Save debug image
+        self.analyzer.save_screenshot_with_highlight(self.frame, best.bbox, best.variant)
+        return (int(best.x), int(best.y))
+
+    def match_template(self, template_path, mode='single', scales=None):
+        """Best match of a template in this snapshot, without thresholding
+
+        Args:
+            template_path: Template name, path to image file, or a Template from the registry
+            mode: 'single' (full resolution) or 'pyramid' (coarse-to-fine)
+            scales: Optional iterable of template scale factors for DPI-scaled UIs
+
+        Returns:
+            TemplateMatch in frame coordinates, or None if the template is larger than the frame
+        """
+        template = template_path if isinstance(template_path, Template) \
+            else self.analyzer.templates.get(template_path)
+        gray = self.gray
+        with self.analyzer.tracer.span('template_match', template=template.name, mode=mode):
+            return match_template(gray, template, mode=mode, scales=scales, downscaled=self.gray_scaled)
+
+    @log_action
+    def find_template(self, template_path, confidence=0.8, mode='single', scales=None):
+        """Find a template image in this snapshot
+
+        Args:
+            template_path: Template name, path to image file (relative to images folder
+                           or absolute path), or a Template from the registry
+            confidence: Matching confidence threshold (0-1)
+            mode: 'single' (full resolution) or 'pyramid' (coarse-to-fine)
+            scales: Optional iterable of template scale factors for DPI-scaled UIs
+
+        Returns:
+            Screen coordinates (x, y) of the match center, or None
+        """
+        match = self.match_template(template_path, mode, scales)
+        max_val = match.score if match else -1.0
+
+        if max_val >= confidence:
+            # Calculate center position
+            position = self.to_screen(match.x, match.y)
+            self.last_box = (int(match.x - match.width / 2) + self.offset_x,
+                             int(match.y - match.height / 2) + self.offset_y, int(match.width), int(match.height))
+            print(f"✅ Found template at coordinates: {position} with confidence: {max_val:.2f}")
+            return position
+
+        print(f"❌ Template not found (best match: {max_val:.2f} < {confidence})")
+        return None
+
+    @log_action
+    def find_templates(self, templates, confidence=0.8, mode='single', scales=None, stop_on_first=False):
+        """Match several templates against this snapshot concurrently
+
+        Matching runs on the analyzer's thread pool; OpenCV releases the GIL
+        while matching, so templates are searched in parallel across cores.
+
+        Args:
+            templates: Iterable of template names/paths or Template objects
+            confidence: Matching confidence threshold (0-1) used to decide hits
+            mode: 'single' (full resolution) or 'pyramid' (coarse-to-fine)
+            scales: Optional iterable of template scale factors for DPI-scaled UIs
+            stop_on_first: If True, return as soon as any template reaches `confidence`;
+                           templates not matched yet are reported as None
+
+        Returns:
+            Dict of template name -> TemplateMatch in screen coordinates (or None),
+            in the order the templates were given
+        """
+        templates = list(templates)
+        loaded = [template if isinstance(template, Template) else self.analyzer.templates.get(template)
+                  for template in templates]
+        names = [template if isinstance(template, str) else loaded[i].name
+                 for i, template in enumerate(templates)]
+        results = dict.fromkeys(names)
+
+        # Compute the shared grayscale frame once before fanning out
+        self.gray
+        executor = self.analyzer.executor
+        pending = {executor.submit(self.match_template, template, mode, scales): name
+                   for name, template in zip(names, loaded)}
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            hit = False
+            for future in done:
+                name = pending.pop(future)
+                match = future.result()
+                if match is not None:
+                    screen_x, screen_y = self.to_screen(match.x, match.y)
+                    match = match._replace(x=screen_x, y=screen_y)
+                    hit = hit or match.score >= confidence
+                results[name] = match
+            if stop_on_first and hit:
+                for future in pending:
+                    future.cancel()
+                break
+
+        return results
+
+    def find_color_blobs(self, colors, tolerance=5, downsample=1, min_area=1):
+        """Find connected blobs of one or more colors in this snapshot
+
+        Args:
+            colors: Hex color string or list of hex colors
+            tolerance: Color matching tolerance (0-255)
+            downsample: Scan every Nth pixel in each direction
+            min_area: Minimum blob area in pixels
+
+        Returns:
+            List of ColorBlob (centroid and bbox in screen coordinates), largest first
+        """
+        with self.analyzer.tracer.span('color_match', colors=colors):
+            blobs = find_color_blobs(self.frame, colors, tolerance, downsample, min_area)
+        return [blob._replace(x=blob.x + self.offset_x,
+                              y=blob.y + self.offset_y,
+                              bbox=(blob.bbox[0] + self.offset_x, blob.bbox[1] + self.offset_y,
+                                    blob.bbox[2], blob.bbox[3]))
+                for blob in blobs]
+
+    @log_action
+    def find_color(self, hex_color, tolerance=5, downsample=1, min_area=1):
+        """Find a specific color in this snapshot
+
+        Args:
+            hex_color: Color in hex format (e.g. '#FF0000' for red)
+            tolerance: Color matching tolerance (0-255)
+            downsample: Scan every Nth pixel in each direction (faster on large screens)
+            min_area: Minimum blob area in pixels
+
+        Returns:
+            Screen coordinates (x, y) of the largest matching blob's centroid, or None
+        """
+        with self.analyzer.tracer.span('color_match', colors=hex_color):
+            blobs = find_color_blobs(self.frame, hex_color, tolerance, downsample, min_area)
+
+        if blobs:
+            blob = blobs[0]
+            position = self.to_screen(blob.x, blob.y)
+            self.last_box = (blob.bbox[0] + self.offset_x, blob.bbox[1] + self.offset_y, blob.bbox[2], blob.bbox[3])
+            print(f"✅ Found color at coordinates: {position} (blob area: {blob.area}px)")
+
+            # Save screenshot with highlight
+            self.analyzer.save_screenshot_with_color_highlight(self.frame, blob.x, blob.y, hex_color)
+            return position
+        return None
@@ -0,0 +1,158 @@
+import os
+import threading
+from collections import OrderedDict
+from .lazy_import import lazy_import
+from .capture import IMAGE_EXTENSIONS
+
+cv2 = lazy_import('cv2')
+
+
+class Template:
+    """A template image loaded once and kept in memory
+
+    Attributes:
+        name: Name the template was registered under (file name in images/)
+        path: Absolute path of the image file
+        mtime: File modification time when loaded
+        bgr: Color image as loaded by OpenCV
+        gray: Grayscale version used for matching
+    """
+
+    def __init__(self, name, path, mtime, bgr):
+        self.name = name
+        self.path = path
+        self.mtime = mtime
+        self.bgr = bgr
+        self.gray = cv2.cvtColor(bgr, cv2.COLOR_BGR2GRAY)
+        self._scaled = {}
+
+    @property
+    def size(self):
+        """(width, height) of the template"""
+        height, width = self.gray.shape[:2]
+        return (width, height)
+
+    def scaled(self, scale):
+        """Grayscale template resized by `scale` (computed once per scale)"""
+        if scale == 1:
+            return self.gray
+        key = round(float(scale), 4)
+        scaled = self._scaled.get(key)
+        if scaled is None:
+            width, height = self.size
+            new_size = (max(1, int(round(width * key))), max(1, int(round(height * key))))
+            interpolation = cv2.INTER_AREA if key < 1 else cv2.INTER_LINEAR
+            scaled = cv2.resize(self.gray, new_size, interpolation=interpolation)
+            self._scaled[key] = scaled
+        return scaled
+
+
+class TemplateRegistry:
+    """LRU cache of decoded, pre-converted template images
+
+    Callers may pass a template name ('x.png' or 'x'), a path relative to the
+    images directory, or an absolute path. Entries are reloaded when the file's
+    modification time changes.
+
+    Args:
+        images_dir: Directory holding template images
+        max_size: Maximum number of templates kept in memory
+    """
+
+    def __init__(self, images_dir, max_size=256):
+        self.images_dir = images_dir
+        self.max_size = max_size
+        self._templates = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def resolve(self, name_or_path):
+        """Resolve a template name or path to an absolute file path
+
+        Names without an extension are looked up with each known image extension.
+        """
+        path = os.fspath(name_or_path)
+        if not os.path.isabs(path):
+            path = os.path.join(self.images_dir, path)
+        if not os.path.splitext(path)[1] and not os.path.exists(path):
+            for extension in IMAGE_EXTENSIONS:
+                if os.path.exists(path + extension):
+                    return path + extension
+        return path
+
+    def get(self, name_or_path):
+        """Return the Template for a name or path, loading it if needed
+
+        Raises:
+            FileNotFoundError: If the image does not exist or cannot be decoded
+        """
+        path = self.resolve(name_or_path)
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            raise FileNotFoundError(f"Template image not found at: {path}")
+
+        with self._lock:
+            template = self._templates.get(path)
+            if template is not None and template.mtime == mtime:
+                self._templates.move_to_end(path)
+                self.hits += 1
+                return template
+
+        self.misses += 1
+        bgr = cv2.imread(path)
+        if bgr is None:
+            raise FileNotFoundError(f"Template image could not be read: {path}")
+        template = Template(os.path.relpath(path, self.images_dir), path, mtime, bgr)
+
+        with self._lock:
+            self._templates[path] = template
+            self._templates.move_to_end(path)
+            while len(self._templates) > self.max_size:
+                self._templates.popitem(last=False)
+        return template
+
+    def preload(self, scales=None):
+        """Load every image in the images directory
+
+        Args:
+            scales: Optional iterable of scale factors to pre-compute as well
+
+        Returns:
+            Number of templates loaded
+        """
+        if not os.path.isdir(self.images_dir):
+            return 0
+        count = 0
+        for root, _, files in os.walk(self.images_dir):
+            for file_name in sorted(files):
+                if not file_name.lower().endswith(IMAGE_EXTENSIONS):
+                    continue
+                template = self.get(os.path.join(root, file_name))
+                for scale in scales or ():
+                    template.scaled(scale)
+                count += 1
+        return count
+
+    def invalidate(self, name_or_path=None):
+        """Drop one template, or all of them when called without arguments"""
+        with self._lock:
+            if name_or_path is None:
+                self._templates.clear()
+            else:
+                self._templates.pop(self.resolve(name_or_path), None)
+
+    def __len__(self):
+        return len(self._templates)
+
+    @property
+    def stats(self):
+        """Registry hit/miss counters"""
+        total = self.hits + self.misses
+        return {
+            'size': len(self._templates),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+        }
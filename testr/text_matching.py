@@ -0,0 +1,113 @@
+from collections import namedtuple
+
+# x, y: bbox center in frame coordinates (screen coordinates once a Snapshot offsets them)
+TextMatch = namedtuple('TextMatch', ['text', 'variant', 'score', 'confidence', 'bbox', 'x', 'y'])
+
+
+def normalize_text(text):
+    """Normalize text by removing spaces and converting to lowercase"""
+    return ''.join(text.lower().split())
+
+
+def edit_distance(a, b):
+    """Levenshtein distance between two strings"""
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1,
+                               current[j - 1] + 1,
+                               previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return previous[-1]
+
+
+def substring_distance(needle, haystack):
+    """Smallest edit distance between `needle` and any substring of `haystack`
+
+    Same recurrence as Levenshtein, but a match may start and end anywhere in
+    the haystack (first row is all zeros, answer is the minimum of the last row).
+    """
+    previous = [0] * (len(haystack) + 1)
+    for i, char_n in enumerate(needle, 1):
+        current = [i]
+        for j, char_h in enumerate(haystack, 1):
+            current.append(min(previous[j] + 1,
+                               current[j - 1] + 1,
+                               previous[j - 1] + (char_n != char_h)))
+        previous = current
+    return min(previous)
+
+
+def text_similarity(search, detected, exact_match=False):
+    """Similarity (0-1) of a normalized search string to a normalized detection
+
+    Args:
+        search: Normalized text being looked for
+        detected: Normalized OCR output
+        exact_match: Require equal strings (1.0 or 0.0); otherwise `search` may match any
+                     part of `detected`, and near misses score by edit distance
+    """
+    if not search:
+        return 0.0
+    if exact_match:
+        return 1.0 if search == detected else 0.0
+    if search in detected:
+        return 1.0
+    return max(0.0, 1.0 - substring_distance(search, detected) / len(search))
+
+
+def rank_text_matches(results, text, min_confidence=0.4, exact_match=False, min_score=1.0):
+    """Score every text variant against every OCR detection in one pass
+
+    Each detection and each variant is normalized once. A detection is scored
+    by its best variant.
+
+    Args:
+        results: EasyOCR results [(bbox, text, confidence), ...]
+        text: Text to search for, or a list of text variations
+        min_confidence: Minimum OCR confidence for a detection to count
+        exact_match: Require the whole detection to equal a variant (never fuzzy)
+        min_score: Minimum similarity (0-1) for a candidate; the default 1.0 disables fuzzy
+                   matching, lower values tolerate OCR noise
+
+    Returns:
+        List of TextMatch sorted by score, then by how close the detection's length is
+        to the variant's (so 'Search' beats a substring hit in 'Search settings'),
+        then OCR confidence (best first)
+    """
+    variants = [text] if isinstance(text, str) else list(text)
+    normalized_variants = [(variant, normalize_text(variant)) for variant in variants]
+
+    candidates = []
+    for bbox, detected_text, confidence in results:
+        if confidence < min_confidence:
+            continue
+        detected = normalize_text(detected_text)
+
+        best_score, best_variant = 0.0, None
+        for variant, search in normalized_variants:
+            # Cheap length bound before running the edit-distance DP
+            if exact_match:
+                if search != detected:
+                    continue
+            elif len(detected) < len(search) * min_score:
+                continue
+            score = text_similarity(search, detected, exact_match)
+            if score > best_score:
+                best_score, best_variant = score, variant
+                if score == 1.0:
+                    break
+
+        if best_variant is not None and best_score >= min_score:
+            center_x = (bbox[0][0] + bbox[2][0]) / 2
+            center_y = (bbox[0][1] + bbox[2][1]) / 2
+            candidates.append(TextMatch(detected_text, best_variant, best_score, float(confidence),
+                                        bbox, center_x, center_y))
+
+    candidates.sort(key=lambda match: (match.score,
+                                       -abs(len(normalize_text(match.text)) - len(normalize_text(match.variant))),
+                                       match.confidence), reverse=True)
+    return candidates
@@ -0,0 +1,146 @@
+import os
+import time
+from collections import namedtuple
+from .waiting import frame_fingerprint, fingerprint_distance
+
+# cursor_move: after moving the cursor, before pressing a button
+# button_hold: between button down and up
+# hover: after move_to_position
+# after_click: after find_*_and_click
+# after_gesture: after drag, double click and right click
+# key_pause: pause after every keyboard action
+# settle: wait for the screen around the action point to change and then stop
+#         changing instead of sleeping the full after_click/after_gesture delay,
+#         which then acts as the upper bound (and the wait when nothing changes)
+# settle_quiet: seconds without change, after the first change, that count as settled
+# settle_radius: half-size in pixels of the watched square around the action point
+TimingProfile = namedtuple('TimingProfile', ['cursor_move', 'button_hold', 'hover', 'after_click', 'after_gesture',
+                                             'key_pause', 'settle', 'settle_quiet', 'settle_radius'])
+
+TIMING_PROFILES = {
+    # The delays Testr has always used
+    'conservative': TimingProfile(cursor_move=0.1, button_hold=0.1, hover=0.5, after_click=0.5, after_gesture=2.0,
+                                  key_pause=0.1, settle=False, settle_quiet=0.2, settle_radius=200),
+    # Short input delays; post-action waits end as soon as the screen settles
+    'default': TimingProfile(cursor_move=0.02, button_hold=0.05, hover=0.05, after_click=0.5, after_gesture=2.0,
+                             key_pause=0.02, settle=True, settle_quiet=0.15, settle_radius=200),
+    # No waiting beyond what the OS needs to register input
+    'fast': TimingProfile(cursor_move=0.0, button_hold=0.01, hover=0.0, after_click=0.0, after_gesture=0.0,
+                          key_pause=0.0, settle=False, settle_quiet=0.1, settle_radius=200),
+}
+
+SETTLE_POLL_INTERVAL = 0.03
+# Fingerprint difference (0-255) that counts as the screen still changing
+SETTLE_CHANGE_THRESHOLD = 4
+
+
+class TimingPolicy:
+    """Central source of every built-in delay in input actions
+
+    Args:
+        profile: Profile name ('fast', 'default', 'conservative'), or None to use
+                 $TESTR_TIMING_PROFILE and fall back to 'default'
+        analyzer: ScreenAnalyzer used for settle detection (can be set later)
+        **overrides: Individual TimingProfile fields to override
+    """
+
+    def __init__(self, profile=None, analyzer=None, **overrides):
+        self.analyzer = analyzer
+        self.slept = 0.0
+        self.saved = 0.0
+        self.set_profile(profile, **overrides)
+
+    def set_profile(self, profile=None, **overrides):
+        """Switch to a named profile, optionally overriding some of its fields"""
+        if profile is None:
+            profile = os.environ.get('TESTR_TIMING_PROFILE', 'default')
+        if profile not in TIMING_PROFILES:
+            raise ValueError(f"Unknown timing profile: {profile} (expected one of {tuple(TIMING_PROFILES)})")
+        self.name = profile
+        self.profile = TIMING_PROFILES[profile]._replace(**overrides)
+        return self
+
+    def delay(self, name):
+        """Configured delay in seconds for a step"""
+        return getattr(self.profile, name)
+
+    def pause(self, name):
+        """Sleep the fixed delay configured for a step"""
+        seconds = self.delay(name)
+        if seconds > 0:
+            time.sleep(seconds)
+            self.slept += seconds
+
+    def settle(self, name, point=None):
+        """Wait after an action: until the screen settles, or the fixed delay
+
+        With settle detection enabled, the screen around `point` (or the whole
+        screen) is sampled until it has changed and then not changed for
+        `settle_quiet` seconds; the step's delay is the upper bound, and is
+        waited out in full when nothing changes.
+
+        Args:
+            name: 'after_click' or 'after_gesture'
+            point: Screen coordinates (x, y) the action happened at
+
+        Returns:
+            Seconds waited
+        """
+        limit = self.delay(name)
+        if limit <= 0:
+            return 0.0
+        if not self.profile.settle or self.analyzer is None:
+            self.pause(name)
+            return limit
+
+        with self.analyzer.tracer.span('settle', step=name, limit=limit):
+            waited = self._wait_settled(limit, self._settle_region(point))
+        self.slept += waited
+        self.saved += limit - waited
+        return waited
+
+    def _settle_region(self, point):
+        if point is None:
+            return None
+        radius = self.profile.settle_radius
+        x, y = int(point[0]), int(point[1])
+        try:
+            width, height = self.analyzer.capture.screen_size()
+        except Exception:
+            return None
+        # Keep the square on screen; clicks near an edge watch a smaller area
+        left, top = max(0, x - radius), max(0, y - radius)
+        right, bottom = min(width, x + radius), min(height, y + radius)
+        if right <= left or bottom <= top:
+            return None
+        return (left, top, right - left, bottom - top)
+
+    def _wait_settled(self, limit, region):
+        start = time.monotonic()
+        deadline = start + limit
+        quiet = self.profile.settle_quiet
+        grab = self.analyzer.capture.grab
+        try:
+            previous = frame_fingerprint(grab(region))
+            # Quiet time only counts once the action had a visible effect; a UI
+            # that has not reacted yet is not settled
+            quiet_since = None
+            while True:
+                now = time.monotonic()
+                if (quiet_since is not None and now - quiet_since >= quiet) or now >= deadline:
+                    return now - start
+                time.sleep(min(SETTLE_POLL_INTERVAL, deadline - now))
+                fingerprint = frame_fingerprint(grab(region))
+                if fingerprint_distance(fingerprint, previous) >= SETTLE_CHANGE_THRESHOLD:
+                    quiet_since = time.monotonic()
+                previous = fingerprint
+        except Exception as e:
+            # Capture unavailable: fall back to the fixed delay
+            print(f"Settle detection unavailable ({str(e)}), waiting out the {limit}s delay")
+            time.sleep(max(0.0, deadline - time.monotonic()))
+            return limit
+
+    @property
+    def stats(self):
+        """Seconds spent in built-in delays, and seconds settle detection saved over fixed delays"""
+        return {'profile': self.name, 'slept': self.slept, 'saved': self.saved}
@@ -0,0 +1,188 @@
+import itertools
+import logging
+import threading
+import time
+
+# Verbosity below DEBUG for hot inner helpers; not recorded by default
+TRACE = 5
+logging.addLevelName(TRACE, 'TRACE')
+
+_MAX_STR = 80
+_MAX_ITEMS = 5
+
+
+def summarize(value):
+    """Cheap, bounded string summary of an argument for log entries
+
+    Arrays and images are reduced to their shape instead of being printed.
+    """
+    if value is None or isinstance(value, (bool, int, float)):
+        return repr(value)
+    if isinstance(value, str):
+        return repr(value if len(value) <= _MAX_STR else value[:_MAX_STR] + '...')
+    shape = getattr(value, 'shape', None)
+    if shape is not None:
+        return f"<{type(value).__name__} shape={tuple(shape)} dtype={getattr(value, 'dtype', '?')}>"
+    size = getattr(value, 'size', None)
+    if hasattr(value, 'mode') and isinstance(size, tuple):
+        return f"<{type(value).__name__} size={size}>"
+    if isinstance(value, (list, tuple)):
+        items = ', '.join(summarize(item) for item in value[:_MAX_ITEMS])
+        more = ', ...' if len(value) > _MAX_ITEMS else ''
+        return f"[{items}{more}]" if isinstance(value, list) else f"({items}{more})"
+    if isinstance(value, dict):
+        items = ', '.join(f"{key}={summarize(item)}" for key, item in list(value.items())[:_MAX_ITEMS])
+        return '{' + items + '}'
+    return f"<{type(value).__name__}>"
+
+
+class Span:
+    """A timed, nested unit of work (action, capture, OCR, match...)"""
+    __slots__ = ('tracer', 'name', 'level', 'attrs', 'announce', 'logged',
+                 'span_id', 'parent_id', 'depth', 'start', 'duration')
+
+    def __init__(self, tracer, name, level, attrs, announce, logged=True):
+        self.tracer = tracer
+        self.name = name
+        self.level = level
+        self.attrs = attrs
+        self.announce = announce
+        self.logged = logged
+        self.span_id = None
+        self.parent_id = None
+        self.depth = 0
+        self.start = None
+        self.duration = None
+
+    def set(self, **attrs):
+        """Attach extra attributes, recorded when the span ends"""
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        self.tracer._start(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.duration = time.perf_counter() - self.start
+        self.tracer._finish(self, exc)
+        return False
+
+
+class _NullSpan:
+    """Shared no-op span returned when tracing is off for a name/level"""
+    __slots__ = ()
+
+    def set(self, **attrs):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Tracer:
+    """Hierarchical span tracer writing to a TestLogger
+
+    Each span records its duration, id, parent id and depth. Whether a span is
+    recorded depends on its level (or a per-name override) versus `threshold`:
+    actions log at INFO, stages (capture, OCR, match) at DEBUG, and hot helpers
+    at TRACE, which is below the default threshold.
+
+    When a MetricsRegistry is attached, spans at or above `metrics_threshold`
+    are also timed into it, even if logging is off for them.
+
+    Args:
+        logger: TestLogger receiving span entries
+        enabled: Master switch for logging spans
+        threshold: Minimum level logged
+        levels: Optional dict of span name -> level overrides
+        metrics: Optional MetricsRegistry receiving every finished span
+        metrics_threshold: Minimum level timed into the metrics registry
+    """
+
+    def __init__(self, logger, enabled=True, threshold=logging.DEBUG, levels=None, metrics=None,
+                 metrics_threshold=logging.DEBUG):
+        self.logger = logger
+        self.enabled = enabled
+        self.threshold = threshold
+        self.levels = dict(levels or {})
+        self.metrics = metrics
+        self.metrics_threshold = metrics_threshold
+        self._local = threading.local()
+        self._ids = itertools.count(1)
+
+    def set_level(self, name, level):
+        """Override the verbosity level of one span/function name"""
+        self.levels[name] = level
+
+    def logs(self, name, level):
+        """Whether a span with this name and default level is written to the log"""
+        return self.enabled and self.levels.get(name, level) >= self.threshold
+
+    def enabled_for(self, name, level):
+        """Whether a span with this name and default level would be recorded (logged or measured)"""
+        return self.logs(name, level) or \
+            (self.metrics is not None and self.levels.get(name, level) >= self.metrics_threshold)
+
+    def span(self, name, level=logging.DEBUG, **attrs):
+        """Context manager timing a stage; a no-op when not enabled for it"""
+        if not self.enabled_for(name, level):
+            return NULL_SPAN
+        return Span(self, name, self.levels.get(name, level), attrs, announce=False,
+                    logged=self.logs(name, level))
+
+    def action(self, name, args, kwargs, level=logging.INFO):
+        """Span for a framework action, logging its start as well as its end"""
+        if not self.enabled_for(name, level):
+            return NULL_SPAN
+        logged = self.logs(name, level)
+        attrs = {'args': summarize(args), 'kwargs': summarize(kwargs)} if logged else {}
+        return Span(self, name, self.levels.get(name, level), attrs, announce=True, logged=logged)
+
+    def current(self):
+        """Innermost active span on this thread, or None"""
+        stack = getattr(self._local, 'stack', None)
+        return stack[-1] if stack else None
+
+    def _start(self, span):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        parent = stack[-1] if stack else None
+        span.span_id = next(self._ids)
+        span.parent_id = parent.span_id if parent else None
+        span.depth = len(stack)
+        stack.append(span)
+        if span.announce and span.logged:
+            self.logger.log(span.level, f"Starting action: {span.name}",
+                            action=span.name, span_id=span.span_id, parent_id=span.parent_id,
+                            depth=span.depth, **span.attrs)
+        span.start = time.perf_counter()
+
+    def _finish(self, span, exc):
+        stack = self._local.stack
+        if stack and stack[-1] is span:
+            stack.pop()
+        if self.metrics is not None:
+            self.metrics.record_span(span, exc)
+        if not span.logged:
+            return
+        duration_ms = round(span.duration * 1000, 3)
+        ids = {'span_id': span.span_id, 'parent_id': span.parent_id, 'depth': span.depth}
+
+        if exc is not None:
+            self.logger.log(logging.ERROR, f"Error in {span.name}: {str(exc)}",
+                            action=span.name, status="error", error=str(exc),
+                            error_type=type(exc).__name__, duration_ms=duration_ms, **ids)
+        elif span.announce:
+            self.logger.log(span.level, f"Successfully completed: {span.name}",
+                            action=span.name, status="success", duration_ms=duration_ms, **ids)
+        else:
+            extra = {key: summarize(value) for key, value in span.attrs.items()}
+            self.logger.log(span.level, f"{span.name} took {duration_ms:.1f} ms",
+                            stage=span.name, duration_ms=duration_ms, **ids, **extra)
@@ -0,0 +1,81 @@
+import time
+from .lazy_import import lazy_import
+from .exceptions import WaitTimeoutError
+from .snapshot import Snapshot
+
+cv2 = lazy_import('cv2')
+np = lazy_import('numpy')
+
+# Fingerprint size: small enough to compute in well under a millisecond,
+# large enough to notice a button or dialog appearing
+FINGERPRINT_SIZE = (64, 36)
+
+
+def frame_fingerprint(frame, size=FINGERPRINT_SIZE):
+    """Cheap fingerprint of a frame: a tiny area-averaged thumbnail"""
+    return cv2.resize(frame, size, interpolation=cv2.INTER_AREA).astype(np.int16)
+
+
+def fingerprint_distance(a, b):
+    """Largest per-cell difference between two fingerprints (0-255)
+
+    The maximum (not the mean) is used so that a small element appearing in
+    one corner of a large region still registers as a change.
+    """
+    if a.shape != b.shape:
+        return 255.0
+    return float(np.max(np.abs(a - b)))
+
+
+def wait_until(analyzer, condition, timeout=10, region=None, poll_interval=0.05,
+               change_threshold=4, description='Condition'):
+    """Wait until `condition` holds, re-checking only when the screen changes
+
+    The condition is evaluated once on a full snapshot, then the region is
+    sampled every `poll_interval` seconds and reduced to a tiny fingerprint.
+    The (expensive) condition only runs again when the fingerprint differs
+    from the one of the frame it last ran on.
+
+    Args:
+        analyzer: ScreenAnalyzer used for capturing
+        condition: Callable taking a Snapshot, returning a truthy result when satisfied
+        timeout: Deadline in seconds
+        region: Tuple of (x, y, width, height) to watch, or None for full screen
+        poll_interval: Seconds between fingerprint samples
+        change_threshold: Minimum fingerprint difference (0-255) that counts as a change
+        description: Used in the timeout error message
+
+    Returns:
+        The condition's first truthy result
+
+    Raises:
+        WaitTimeoutError: If the deadline passes first
+    """
+    deadline = time.monotonic() + timeout
+    checked_fingerprint = None
+    checks = 0
+
+    while True:
+        frame = analyzer.capture.grab(region)
+        fingerprint = frame_fingerprint(frame)
+
+        if checked_fingerprint is None or \
+                fingerprint_distance(fingerprint, checked_fingerprint) >= change_threshold:
+            checked_fingerprint = fingerprint
+            checks += 1
+            snapshot = Snapshot(analyzer, frame, region)
+            try:
+                result = condition(snapshot)
+                if result:
+                    # Later queries (e.g. a plan's next step) may share the frame that satisfied the wait
+                    analyzer.last_snapshot = snapshot
+                    return result
+            except Exception as e:
+                print(f"Error on check {checks}: {str(e)}")
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        time.sleep(min(poll_interval, remaining))
+
+    raise WaitTimeoutError(f"{description} not found within {timeout} seconds ({checks} checks)")